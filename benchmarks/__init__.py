@@ -0,0 +1 @@
+"""Performance benchmarks for voter_tools. Run them with `make bench`."""
@@ -0,0 +1,92 @@
+"""Run the benchmark suite: `python -m benchmarks` (or `make bench`)."""
+
+import fnmatch
+import pathlib
+import subprocess
+
+import click
+
+from . import (  # noqa: F401
+    bench_check_csv,
+    bench_pa,
+    bench_results,
+    bench_tools,
+    bench_zipcodes,
+)
+from .harness import BENCHMARKS, BenchmarkResult, load_results, write_results
+
+
+def _default_output() -> pathlib.Path:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        name = completed.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        name = "results"
+    return pathlib.Path(".benchmarks") / f"{name}.json"
+
+
+def _describe(result: BenchmarkResult, baseline: BenchmarkResult | None) -> str:
+    line = (
+        f"{result.name:<40} {result.ops_per_sec:>14,.1f} {result.unit}/s"
+        f"  (median {result.median_s * 1000:,.2f} ms/round)"
+    )
+    if baseline is not None and baseline.ops_per_sec:
+        change = result.ops_per_sec / baseline.ops_per_sec - 1
+        line += f"  {change:+.1%} vs baseline"
+    return line
+
+
+@click.command()
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    default=None,
+    help="Where to write JSON results. Defaults to .benchmarks/<commit>.json",
+)
+@click.option(
+    "--filter",
+    "-k",
+    "patterns",
+    multiple=True,
+    help="Only run benchmarks whose names match this glob. May be repeated.",
+)
+@click.option("--quick", is_flag=True, help="Run fewer rounds, and skip warmup.")
+@click.option(
+    "--compare",
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+    default=None,
+    help="A previous results file to compare against.",
+)
+def main(
+    output: pathlib.Path | None,
+    patterns: tuple[str, ...],
+    quick: bool,
+    compare: pathlib.Path | None,
+):
+    """Run the voter-tools benchmark suite and write JSON results."""
+    baseline = load_results(compare) if compare else {}
+    selected = [
+        bench
+        for name, bench in BENCHMARKS.items()
+        if not patterns or any(fnmatch.fnmatch(name, p) for p in patterns)
+    ]
+    if not selected:
+        raise click.UsageError("No benchmarks matched.")
+    results = []
+    for bench in selected:
+        result = bench.run(quick=quick)
+        results.append(result)
+        click.echo(_describe(result, baseline.get(result.name)))
+    output = output or _default_output()
+    write_results(results, output)
+    click.echo(f"Wrote {output}", err=True)
+
+
+if __name__ == "__main__":
+    main()
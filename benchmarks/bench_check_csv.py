@@ -0,0 +1,69 @@
+import csv
+import io
+import pathlib
+import tempfile
+import threading
+
+from click.testing import CliRunner
+
+from voter_tools.cli import vote
+from voter_tools.emulate import (
+    Emulator,
+    EmulatorConfig,
+    EmulatorServer,
+    EndpointConfig,
+    LatencyConfig,
+)
+
+from .harness import benchmark
+
+ROWS = 400
+_ZIPS = ("30301", "48201", "53703", "19127", "10001")
+
+
+def _write_csv(path: pathlib.Path, rows: int) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["First Name", "Last Name", "Date of Birth", "Zipcode"])
+        for i in range(rows):
+            writer.writerow(
+                [f"First{i}", f"Last{i}", "1980-01-02", _ZIPS[i % len(_ZIPS)]]
+            )
+
+
+def _check_csv(config: EmulatorConfig, rows: int):
+    server = EmulatorServer(("127.0.0.1", 0), Emulator(config))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    directory = pathlib.Path(tempfile.mkdtemp())
+    csv_path = directory / "voters.csv"
+    _write_csv(csv_path, rows)
+    runner = CliRunner()
+
+    def run():
+        result = runner.invoke(
+            vote,
+            ["check-csv", str(csv_path), "--details", "--emulator", server.base_url],
+        )
+        if result.exit_code != 0:
+            raise RuntimeError(f"check-csv failed: {result.output}")
+        rows = list(csv.DictReader(io.StringIO(result.output)))
+        return {"registered": sum(r["Registered"] == "True" for r in rows)}
+
+    return run
+
+
+@benchmark("check_csv.emulated", unit="row", ops_per_round=ROWS, rounds=5, warmup=1)
+def bench_check_csv():
+    """Run `vote check-csv --details` end to end against a local emulator."""
+    return _check_csv(EmulatorConfig(seed=0), ROWS)
+
+
+@benchmark(
+    "check_csv.emulated_latency", unit="row", ops_per_round=ROWS, rounds=5, warmup=1
+)
+def bench_check_csv_latency():
+    """Like `check_csv.emulated`, but every response takes 20ms."""
+    latency = LatencyConfig.parse("fixed:20")
+    config = EmulatorConfig(default=EndpointConfig(latency=latency), seed=0)
+    return _check_csv(config, ROWS)
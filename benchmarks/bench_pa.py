@@ -0,0 +1,120 @@
+import datetime
+import io
+
+import httpx
+from PIL import Image, ImageDraw
+
+from voter_tools.pa import client as c
+from voter_tools.pa import errors as pa_errors
+
+from .harness import benchmark
+
+
+def _application() -> c.VoterApplication:
+    record = c.VoterApplicationRecord(
+        first_name="Bench",
+        last_name="Mark",
+        is_us_citizen=True,
+        will_be_18=True,
+        political_party=c.PoliticalPartyChoice.DEMOCRATIC,
+        gender=c.GenderChoice.FEMALE,
+        email="bench.mark@example.com",
+        birth_date=datetime.date(1980, 1, 1),
+        registration_kind=c.RegistrationKind.NEW,
+        confirm_declaration=True,
+        address="123 Main St",
+        city="Philadelphia",
+        zip5="19127",
+        drivers_license="12345678",
+    )
+    return c.VoterApplication(record=record)
+
+
+def _signature_png() -> bytes:
+    image = Image.new("RGB", (600, 200), "white")
+    draw = ImageDraw.Draw(image)
+    draw.line([(20, 150), (200, 40), (380, 160), (580, 50)], fill="black", width=6)
+    bio = io.BytesIO()
+    image.save(bio, format="PNG")
+    return bio.getvalue()
+
+
+@benchmark("pa.to_xml_tree", unit="application", ops_per_round=200)
+def bench_to_xml_tree():
+    """Serialize an application to an XML tree."""
+    application = _application()
+
+    def run():
+        for _ in range(200):
+            application.to_xml_tree()
+
+    return run
+
+
+@benchmark("pa.set_application.serialize", unit="application", ops_per_round=200)
+def bench_post_serialization():
+    """Serialize and 'send' applications; the transport answers instantly."""
+    application = _application()
+    response = httpx.Response(200, json="<RESPONSE><APPLICATIONID>1</APPLICATIONID>")
+    client = c.PennsylvaniaAPIClient(
+        "http://bench/SureOVRWebAPI/api/ovr",
+        "key",
+        _transport=httpx.MockTransport(lambda request: response),
+    )
+
+    def run():
+        for _ in range(200):
+            client._post(c.Action.SET_APPLICATION, application.to_xml_tree())
+
+    return run
+
+
+@benchmark("pa.validate_signature_image", unit="image", ops_per_round=50)
+def bench_validate_signature_image():
+    """Validate and re-encode a PNG signature."""
+    png = _signature_png()
+
+    def run():
+        for _ in range(50):
+            c.validate_signature_image(png)
+
+    return run
+
+
+# A registration-deadline mix: mostly exact codes, a few near misses from the
+# sandbox, and the odd code nobody has seen before.
+_ERROR_CODES = (
+    ("VR_WAPI_InvalidOVRDL",),
+    ("VR_WAPI_MissingOVRcity", "VR_WAPI_InvalidOVRzipcode"),
+    ("VR_WAPI_InvalidOVRemail",),
+    ("VRX_WAPI_InvalidDLformat",),
+    ("VR_WAPI_SystemError",),
+    ("VR_WAPI_Brand_New_Code",),
+)
+
+
+@benchmark("pa.build_error_for_codes", unit="response", ops_per_round=6_000)
+def bench_build_error_for_codes():
+    """Resolve API error codes to (fresh) errors."""
+    codes = _ERROR_CODES * 1_000
+
+    def run():
+        for response_codes in codes:
+            pa_errors.build_error_for_codes(response_codes)
+
+    return run
+
+
+@benchmark("pa.APIResponse.get_error", unit="response", ops_per_round=1_000)
+def bench_response_get_error():
+    """Parse an error response and build its error."""
+    xml = (
+        "<RESPONSE><ERROR>VR_WAPI_InvalidOVRDL,VR_WAPI_MissingOVRcity</ERROR>"
+        "</RESPONSE>"
+    )
+
+    def run():
+        for _ in range(1_000):
+            c.APIResponse.from_xml(xml).get_error()
+
+    return run
@@ -0,0 +1,79 @@
+import datetime
+import gc
+import tracemalloc
+import typing as t
+
+from voter_tools.tool import (
+    CheckRegistrationDetails,
+    CheckRegistrationResult,
+    ResultBatch,
+)
+
+from .harness import benchmark
+
+RESULTS = 1_000_000
+_STATUSES = ("Active", "Inactive", "Suspended")
+
+
+def _results(count: int) -> t.Iterator[CheckRegistrationResult]:
+    """Yield results, nine in ten with details, each with its own strings."""
+    for i in range(count):
+        if i % 10 == 0:
+            yield CheckRegistrationResult(registered=False)
+            continue
+        yield CheckRegistrationResult(
+            registered=True,
+            details=CheckRegistrationDetails(
+                state_id=f"{i:09d}",
+                registration_date=datetime.date.fromordinal(730_000 + i % 9_000),
+                status=_STATUSES[i % 3],
+            ),
+        )
+
+
+def _measure(build: t.Callable[[], t.Any]) -> dict[str, float]:
+    """
+    Return the memory retained by what `build` returns.
+
+    Tracing allocations slows `build` several times over, so these
+    benchmarks' timings say little; their `extra` memory numbers are the point.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = build()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return {
+        "retained_mb": current / 1e6,
+        "peak_mb": peak / 1e6,
+        "bytes_per_result": current / RESULTS,
+    }
+
+
+@benchmark(
+    "results.models_1m", unit="result", ops_per_round=RESULTS, rounds=1, warmup=0
+)
+def bench_results_models():
+    """Hold 1M results as pydantic models, and measure their memory."""
+    return lambda: _measure(lambda: list(_results(RESULTS)))
+
+
+@benchmark("results.batch_1m", unit="result", ops_per_round=RESULTS, rounds=1, warmup=0)
+def bench_results_batch():
+    """Hold 1M results in a `ResultBatch`, and measure its memory."""
+    return lambda: _measure(lambda: ResultBatch(_results(RESULTS)))
+
+
+@benchmark("results.batch_read", unit="result", ops_per_round=100_000)
+def bench_results_batch_read():
+    """Read results back out of a `ResultBatch`, as pydantic models."""
+    batch = ResultBatch(_results(100_000))
+
+    def run():
+        for _ in batch:
+            pass
+
+    return run
@@ -0,0 +1,94 @@
+import datetime
+import json
+
+from voter_tools import ga, wi
+from voter_tools.emulate import payloads
+from voter_tools.mi import parse_search_by_name_response
+
+from .harness import benchmark
+
+_VOTER = payloads.EmulatedVoter("bench", "voter")
+
+
+@benchmark("mi.parse.registered_details", unit="page", ops_per_round=100)
+def bench_mi_parse_registered():
+    """Parse an MVIC results page for a registered voter."""
+    page = payloads.mi_response(_VOTER, multiple=False).decode()
+
+    def run():
+        for _ in range(100):
+            parse_search_by_name_response(page, details=True)
+
+    return run
+
+
+@benchmark("mi.parse.not_found", unit="page", ops_per_round=100)
+def bench_mi_parse_not_found():
+    """Parse an MVIC results page with no matching voter."""
+    page = payloads.mi_response(None, multiple=False).decode()
+
+    def run():
+        for _ in range(100):
+            parse_search_by_name_response(page, details=False)
+
+    return run
+
+
+@benchmark("wi.validate", unit="response", ops_per_round=1_000)
+def bench_wi_validate():
+    """Validate an already-decoded MyVote search response."""
+    data = json.loads(payloads.wi_response(_VOTER, multiple=False))
+
+    def run():
+        for _ in range(1_000):
+            wi.SearchResponse.model_validate(data)
+
+    return run
+
+
+@benchmark("wi.validate_json", unit="response", ops_per_round=1_000)
+def bench_wi_validate_json():
+    """Decode and validate a MyVote search response."""
+    body = payloads.wi_response(_VOTER, multiple=False)
+
+    def run():
+        for _ in range(1_000):
+            wi.SearchResponse.model_validate(json.loads(body))
+
+    return run
+
+
+@benchmark("ga.request.build", unit="request", ops_per_round=1_000)
+def bench_ga_request_build():
+    """Build the form data for a GA `checkContactExist` request."""
+    birth_date = datetime.date(1980, 1, 2)
+
+    def run():
+        for _ in range(1_000):
+            action = ga.CheckContactExistAction(
+                first_name="Alice",
+                last_name="Smith",
+                zipcode="30301",
+                birth_date=birth_date,
+            )
+            ga.GARequest(actions=(action,)).to_data()
+
+    return run
+
+
+@benchmark("ga.response.decode", unit="response", ops_per_round=1_000)
+def bench_ga_response_decode():
+    """Decode a GA Aura response into action results."""
+    body = payloads.ga_response(
+        [
+            payloads.ga_check_contact_exist(
+                "CheckContactExistAction", _VOTER, multiple=False
+            )
+        ]
+    )
+
+    def run():
+        for _ in range(1_000):
+            ga.GAResponse.for_response_data(json.loads(body))
+
+    return run
@@ -0,0 +1,58 @@
+from voter_tools import zipcodes
+
+from .harness import benchmark
+
+_SAMPLE_ZIPS = ("30301", "48201", "53703", "19127", "10001", "99553", "00000")
+
+
+def _reset() -> None:
+    zipcodes._ZIP_TO_STATE.clear()
+    zipcodes._ZIP_TO_COUNTY.clear()
+
+
+@benchmark("zipcodes.get_state.cold", unit="load", rounds=10, warmup=0)
+def bench_get_state_cold():
+    """Load the ZIP-to-state table from disk."""
+
+    def run():
+        _reset()
+        zipcodes.get_state("30301")
+
+    return run
+
+
+@benchmark("zipcodes.get_county.cold", unit="load", rounds=10, warmup=0)
+def bench_get_county_cold():
+    """Load the ZIP-to-county table from disk."""
+
+    def run():
+        _reset()
+        zipcodes.get_county("30301")
+
+    return run
+
+
+@benchmark("zipcodes.get_state.warm", unit="lookup", ops_per_round=70_000)
+def bench_get_state_warm():
+    """Look up states once the table is loaded."""
+    zipcodes.get_state("30301")
+    zips = _SAMPLE_ZIPS * 10_000
+
+    def run():
+        for zipcode in zips:
+            zipcodes.get_state(zipcode)
+
+    return run
+
+
+@benchmark("zipcodes.get_county.warm", unit="lookup", ops_per_round=70_000)
+def bench_get_county_warm():
+    """Look up counties once the table is loaded."""
+    zipcodes.get_county("30301")
+    zips = _SAMPLE_ZIPS * 10_000
+
+    def run():
+        for zipcode in zips:
+            zipcodes.get_county(zipcode)
+
+    return run
@@ -0,0 +1,177 @@
+"""A tiny benchmark harness: registration, timing, and JSON results."""
+
+import datetime
+import gc
+import json
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import typing as t
+
+import pydantic as p
+
+
+class BenchmarkResult(p.BaseModel, frozen=True):
+    """Timing results for a single benchmark."""
+
+    name: str
+    unit: str
+    """What a single operation is (a 'row', a 'lookup', a 'call', ...)."""
+
+    ops_per_round: int
+    rounds: int
+    min_s: float
+    median_s: float
+    mean_s: float
+    max_s: float
+    """Times for a single round, in seconds."""
+
+    ops_per_sec: float
+    """Throughput, based on the median round."""
+
+    extra: dict[str, float] = p.Field(default_factory=dict)
+    """Additional measurements that some benchmarks report (memory, etc.)."""
+
+
+class Benchmark:
+    """A registered benchmark."""
+
+    name: str
+    func: t.Callable[[], t.Callable[[], t.Any]]
+    unit: str
+    ops_per_round: int
+    rounds: int
+    warmup: int
+
+    def __init__(
+        self,
+        name: str,
+        func: t.Callable[[], t.Callable[[], t.Any]],
+        *,
+        unit: str,
+        ops_per_round: int,
+        rounds: int,
+        warmup: int,
+    ):
+        """Create a new benchmark."""
+        self.name = name
+        self.func = func
+        self.unit = unit
+        self.ops_per_round = ops_per_round
+        self.rounds = rounds
+        self.warmup = warmup
+
+    def run(self, quick: bool = False) -> BenchmarkResult:
+        """
+        Run the benchmark and return its results.
+
+        The registered function is a *setup* function: it is called once,
+        untimed, and returns the function that is timed for each round. If the
+        timed function returns a dict, its values are reported as `extra`.
+        """
+        rounds = max(1, self.rounds // 5) if quick else self.rounds
+        round_func = self.func()
+        for _ in range(0 if quick else self.warmup):
+            round_func()
+        times: list[float] = []
+        extra: dict[str, float] = {}
+        gc_was_enabled = gc.isenabled()
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(rounds):
+                start = time.perf_counter()
+                returned = round_func()
+                times.append(time.perf_counter() - start)
+                if isinstance(returned, dict):
+                    extra = returned
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        median = statistics.median(times)
+        return BenchmarkResult(
+            name=self.name,
+            unit=self.unit,
+            ops_per_round=self.ops_per_round,
+            rounds=rounds,
+            min_s=min(times),
+            median_s=median,
+            mean_s=statistics.fmean(times),
+            max_s=max(times),
+            ops_per_sec=self.ops_per_round / median if median else float("inf"),
+            extra=extra,
+        )
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(
+    name: str,
+    *,
+    unit: str = "call",
+    ops_per_round: int = 1,
+    rounds: int = 20,
+    warmup: int = 2,
+) -> t.Callable:
+    """Register a benchmark setup function under the given name."""
+
+    def decorator(func: t.Callable[[], t.Callable[[], t.Any]]) -> t.Callable:
+        if name in BENCHMARKS:
+            raise ValueError(f"Duplicate benchmark name: {name}")
+        BENCHMARKS[name] = Benchmark(
+            name,
+            func,
+            unit=unit,
+            ops_per_round=ops_per_round,
+            rounds=rounds,
+            warmup=warmup,
+        )
+        return func
+
+    return decorator
+
+
+def _git_commit() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def metadata() -> dict[str, t.Any]:
+    """Describe the environment the benchmarks ran in."""
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.datetime.now(datetime.UTC).isoformat(),
+        "python": sys.version,
+        "platform": platform.platform(),
+    }
+
+
+def write_results(results: t.Iterable[BenchmarkResult], path: pathlib.Path) -> None:
+    """Write results (and environment metadata) to a JSON file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "meta": metadata(),
+        "results": {r.name: r.model_dump(mode="json") for r in results},
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def load_results(path: pathlib.Path) -> dict[str, BenchmarkResult]:
+    """Load results previously written by `write_results`."""
+    with open(path) as f:
+        data = json.load(f)
+    return {
+        name: BenchmarkResult.model_validate(result)
+        for name, result in data["results"].items()
+    }
@@ -0,0 +1,112 @@
+from unittest import TestCase
+
+from voter_tools.pa.address import (
+    UnitAddress,
+    get_unit_choices,
+    get_unit_type_number,
+    split_unit,
+)
+from voter_tools.pa.client import UnitTypeChoice
+
+from .test_preflight import _application
+
+
+class GetUnitTypeNumberTestCase(TestCase):
+    def test_no_unit(self):
+        self.assertEqual(get_unit_type_number("123 Main St", None), (None, None))
+        self.assertEqual(get_unit_type_number("5 Unit Dr", "c/o Ann"), (None, None))
+        self.assertEqual(get_unit_type_number("123 Plot 5", None), (None, None))
+
+    def test_street_named_like_unit(self):
+        self.assertEqual(
+            split_unit("10 N Front", None), UnitAddress("10 N Front", None, None, None)
+        )
+        self.assertEqual(
+            split_unit("1 Pier 39", None), UnitAddress("1 Pier 39", None, None, None)
+        )
+        self.assertEqual(get_unit_type_number("12 W Side", None), (None, None))
+        self.assertEqual(get_unit_type_number("5 Lower Rd", None), (None, None))
+        self.assertEqual(
+            split_unit("10 N Front Rear", None),
+            UnitAddress("10 N Front", None, "REA", None),
+        )
+        self.assertEqual(
+            split_unit("1 Pier 39", "Apt 2"), UnitAddress("1 Pier 39", None, "APT", "2")
+        )
+
+    def test_second_line(self):
+        self.assertEqual(get_unit_type_number("1 Main St", "Apt 4"), ("APT", "4"))
+        self.assertEqual(get_unit_type_number("1 Main St", "apt. 4b"), ("APT", "4B"))
+        self.assertEqual(get_unit_type_number("1 Main St", "Box # 7"), ("BOX", "7"))
+        self.assertEqual(
+            get_unit_type_number("1 Main St", "Student Mailing Center 12"),
+            ("SMC", "12"),
+        )
+        self.assertEqual(get_unit_type_number("1 Main St", "#12"), ("UNI", "12"))
+
+    def test_end_of_first_line(self):
+        self.assertEqual(
+            get_unit_type_number("1 Main St Ste. 200", None), ("STE", "200")
+        )
+        self.assertEqual(get_unit_type_number("1 Main St, Bldg C", None), ("BLD", "C"))
+        self.assertEqual(get_unit_type_number("1 Main St #4", None), ("UNI", "4"))
+
+    def test_no_number(self):
+        self.assertEqual(get_unit_type_number("1 Main St", "Rear"), ("REA", None))
+        self.assertEqual(get_unit_type_number("1 Main St", "BSMT"), ("BSM", None))
+        self.assertEqual(get_unit_type_number("1 Main St PH", None), ("PH", None))
+        self.assertEqual(get_unit_type_number("1 Main St, Lbby", None), ("LBB", None))
+        self.assertEqual(get_unit_type_number("1 Main St Uppr", None), ("UPP", None))
+        self.assertEqual(get_unit_type_number("1 Main St", "Apt"), (None, None))
+
+    def test_unit_removed(self):
+        self.assertEqual(
+            split_unit("1 Main St, Ste. 200", None),
+            UnitAddress("1 Main St", None, "STE", "200"),
+        )
+        self.assertEqual(
+            split_unit("1 Main St", "Apt 4"), UnitAddress("1 Main St", None, "APT", "4")
+        )
+        self.assertEqual(
+            split_unit("1 Main St Rear", "c/o Ann"),
+            UnitAddress("1 Main St", "c/o Ann", "REA", None),
+        )
+        self.assertEqual(
+            split_unit("1 Main St", "c/o Ann"),
+            UnitAddress("1 Main St", "c/o Ann", None, None),
+        )
+
+    def test_unit_choices(self):
+        self.assertEqual(
+            get_unit_choices(
+                [("1 Main St", "Apt 4"), ("1 Main St Trlr 9", None), ("1 Main", None)]
+            ),
+            [
+                ("1 Main St", None, UnitTypeChoice.APARTMENT, "4"),
+                ("1 Main St", None, UnitTypeChoice.TRAILER, "9"),
+                ("1 Main", None, None, None),
+            ],
+        )
+
+
+class RecordUnitTestCase(TestCase):
+    def test_address_left_alone(self):
+        record = _application(address="123 Main St Apt 4B").record
+        self.assertEqual(record.address, "123 Main St Apt 4B")
+        self.assertIsNone(record.unit_type)
+        self.assertIsNone(record.unit_number)
+
+    def test_with_unit_split(self):
+        record = _application(address="123 Main St Apt 4B").record.with_unit_split()
+        self.assertEqual(record.address, "123 Main St")
+        self.assertEqual(record.unit_type, UnitTypeChoice.APARTMENT)
+        self.assertEqual(record.unit_number, "4B")
+
+    def test_given_unit_kept(self):
+        record = _application(
+            address="123 Main St Apt 4B",
+            unit_type=UnitTypeChoice.SUITE,
+            unit_number="7",
+        ).record.with_unit_split()
+        self.assertEqual(record.address, "123 Main St Apt 4B")
+        self.assertEqual(record.unit_type, UnitTypeChoice.SUITE)
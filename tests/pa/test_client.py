@@ -1,6 +1,8 @@
 import datetime
 import io
 import pathlib
+import subprocess
+import sys
 from unittest import TestCase
 
 import httpx
@@ -924,3 +926,36 @@ class ClientTestCase(TestCase):
         client = self._client(handler)
         with self.assertRaises(UnparsableResponseError):
             _ = client.set_application(application)
+
+
+class LazyModelsTestCase(TestCase):
+    def _run(self, code: str) -> str:
+        """Run code in a fresh interpreter, where no model is built yet."""
+        completed = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        return completed.stdout.strip()
+
+    def test_built_on_first_use(self):
+        code = (
+            "from voter_tools.pa import client as c\n"
+            "built = lambda: sorted(\n"
+            "    m.__name__ for m in c._models() if m.__xml_serializer__\n"
+            ")\n"
+            "print(built())\n"
+            "c.MunicipalitiesResponse.from_xml("
+            "'<OVRLookupData><Municipality><MunicipalityType>1</MunicipalityType>"
+            "<MunicipalityID>MN01</MunicipalityID>"
+            "<MunicipalityIDname>X</MunicipalityIDname>"
+            "<CountyID>1</CountyID><CountyName>ADAMS</CountyName>"
+            "</Municipality></OVRLookupData>')\n"
+            "print(built())\n"
+        )
+        before, after = self._run(code).splitlines()
+        self.assertEqual(before, "[]")
+        self.assertEqual(after, "['MunicipalitiesResponse', 'Municipality']")
+
+    def test_warm(self):
+        c.warm()
+        for model in c._models():
+            self.assertIsNotNone(model.__xml_serializer__, model.__name__)
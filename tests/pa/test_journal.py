@@ -0,0 +1,142 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import httpx
+
+from voter_tools.emulate import Emulator, EmulatorConfig, EmulatorTransport
+from voter_tools.pa import client as c
+from voter_tools.pa.errors import APIValidationError, ServiceUnavailableError
+from voter_tools.pa.journal import (
+    AmbiguousSubmissionError,
+    SubmissionJournal,
+    SubmissionStatus,
+)
+
+from .test_preflight import _application
+
+
+class FlakyTransport(httpx.BaseTransport):
+    """Answer with an emulator, or time out, or reject applications."""
+
+    mode = "ok"
+
+    def __init__(self):
+        """Create a transport backed by a fresh emulator."""
+        self.inner = EmulatorTransport(Emulator(EmulatorConfig()), realtime=False)
+        self.submissions = 0
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self.mode == "refuse":
+            raise httpx.ConnectError("Refused.", request=request)
+        self.submissions += 1
+        if self.mode == "reject":
+            body = "<RESPONSE><ERROR>VR_WAPI_InvalidOVRDL</ERROR></RESPONSE>"
+            return httpx.Response(200, json=body)
+        response = self.inner.handle_request(request)
+        if self.mode == "timeout":
+            # The OVR got the application; we never hear back.
+            raise httpx.ReadTimeout("Too slow.", request=request)
+        return response
+
+
+class SubmissionJournalTestCase(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "journal.db")
+        self.journal = SubmissionJournal(self.path)
+        self.transport = FlakyTransport()
+        self.client = c.PennsylvaniaAPIClient.staging(
+            "key", journal=self.journal, _transport=self.transport
+        )
+
+    def tearDown(self):
+        self.journal.close()
+        self.dir.cleanup()
+
+    def test_succeeded_not_resent(self):
+        first = self.client.set_application(_application())
+        self.assertIsNotNone(first.application_id)
+        again = self.client.set_application(_application())
+        self.assertEqual(again.application_id, first.application_id)
+        self.assertEqual(self.transport.submissions, 1)
+
+    def test_succeeded_survives_reopening(self):
+        first = self.client.set_application(_application())
+        self.journal.close()
+        self.journal = SubmissionJournal(self.path)
+        client = c.PennsylvaniaAPIClient.staging(
+            "key", journal=self.journal, _transport=self.transport
+        )
+        again = client.set_application(_application())
+        self.assertEqual(again.application_id, first.application_id)
+        self.assertEqual(self.transport.submissions, 1)
+
+    def test_different_applications_sent(self):
+        self.client.set_application(_application())
+        self.client.set_application(_application(first_name="Other"))
+        self.assertEqual(self.transport.submissions, 2)
+
+    def test_failed_retried(self):
+        self.transport.mode = "reject"
+        with self.assertRaises(APIValidationError):
+            self.client.set_application(_application())
+        (submission,) = self._submissions()
+        self.assertEqual(submission.status, SubmissionStatus.FAILED)
+        self.transport.mode = "ok"
+        response = self.client.set_application(_application())
+        self.assertIsNotNone(response.application_id)
+        self.assertEqual(self.transport.submissions, 2)
+
+    def test_ambiguous_refused_until_resolved(self):
+        self.transport.mode = "timeout"
+        with self.assertRaises(TimeoutError):
+            self.client.set_application(_application())
+        self.transport.mode = "ok"
+        with self.assertRaises(AmbiguousSubmissionError):
+            self.client.set_application(_application())
+        self.assertEqual(self.transport.submissions, 1)
+
+        (submission,) = self.journal.ambiguous()
+        self.journal.resolve(submission.key)
+        self.assertEqual(self.journal.ambiguous(), [])
+        self.client.set_application(_application())
+        self.assertEqual(self.transport.submissions, 2)
+
+    def test_ambiguous_resolved_as_created(self):
+        self.transport.mode = "timeout"
+        with self.assertRaises(TimeoutError):
+            self.client.set_application(_application())
+        (submission,) = self.journal.ambiguous()
+        self.journal.resolve(submission.key, application_id="12345")
+        response = self.client.set_application(_application())
+        self.assertEqual(response.application_id, "12345")
+        self.assertEqual(self.transport.submissions, 1)
+
+    def test_refused_connection_retried(self):
+        self.transport.mode = "refuse"
+        with self.assertRaises(ServiceUnavailableError):
+            self.client.set_application(_application())
+        (submission,) = self._submissions()
+        self.assertEqual(submission.status, SubmissionStatus.FAILED)
+        self.assertEqual(self.journal.ambiguous(), [])
+        self.transport.mode = "ok"
+        self.client.set_application(_application())
+        self.assertEqual(self.transport.submissions, 1)
+
+    def test_ballot_application_sent(self):
+        self.client.set_application(_application())
+        self.client.set_ballot_application(_application())
+        self.assertEqual(self.transport.submissions, 2)
+
+    def test_other_api_sent(self):
+        self.client.set_application(_application())
+        production = c.PennsylvaniaAPIClient.production(
+            "key", journal=self.journal, _transport=self.transport
+        )
+        production.set_application(_application())
+        self.assertEqual(self.transport.submissions, 2)
+
+    def _submissions(self):
+        rows = self.journal._connection.execute("SELECT key FROM submissions")
+        return [self.journal.get(key) for (key,) in rows]
@@ -0,0 +1,133 @@
+import datetime
+import threading
+from unittest import TestCase
+
+import httpx
+
+from voter_tools.emulate import Emulator, EmulatorConfig, EmulatorTransport
+from voter_tools.pa import client as c
+from voter_tools.pa.errors import APIValidationError
+from voter_tools.pa.preflight import ReferenceCache, preflight
+
+
+class CountingTransport(httpx.BaseTransport):
+    """Answer with an emulator, counting requests by action."""
+
+    def __init__(self):
+        """Create a transport backed by a fresh emulator."""
+        self.inner = EmulatorTransport(Emulator(EmulatorConfig()), realtime=False)
+        self.actions: list[str] = []
+        self.failing = False
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.actions.append(request.url.params["sysparm_action"])
+        if self.failing:
+            raise httpx.ConnectError("Down.", request=request)
+        return self.inner.handle_request(request)
+
+
+def _application(**fields) -> c.VoterApplication:
+    record = c.VoterApplicationRecord(
+        **{
+            "first_name": "Test",
+            "last_name": "Applicant",
+            "is_us_citizen": True,
+            "will_be_18": True,
+            "political_party": c.PoliticalPartyChoice.DEMOCRATIC,
+            "birth_date": datetime.date(1980, 1, 1),
+            "registration_kind": c.RegistrationKind.NEW,
+            "confirm_declaration": True,
+            "address": "123 Main St",
+            "city": "Philadelphia",
+            "zip5": "19127",
+            "drivers_license": "12345678",
+            **fields,
+        }
+    )
+    return c.VoterApplication(record=record)
+
+
+class Clock:
+    now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class PreflightTestCase(TestCase):
+    def setUp(self):
+        self.transport = CountingTransport()
+        self.client = c.PennsylvaniaAPIClient.staging(
+            "key", preflight=True, _transport=self.transport
+        )
+
+    def test_valid_application(self):
+        assert self.client.reference is not None
+        application = _application(unit_type=c.UnitTypeChoice.TRAILER, unit_number="4")
+        self.assertIsNone(preflight(application, self.client.reference))
+        self.assertIsNone(preflight(application, self.client.reference))
+        # Reference data is fetched once.
+        self.assertEqual(
+            self.transport.actions, ["GETAPPLICATIONSETUP", "GETMUNICIPALITIES"]
+        )
+
+    def test_invalid_application_never_sent(self):
+        assert self.client.reference is not None
+        setup = self.client.reference.setup()
+        parties = tuple(
+            party for party in setup.political_parties if party.code != "GR"
+        )
+        self.client.reference._entries["setup"] = (
+            setup.model_copy(update={"political_parties": parties}),
+            0.0,
+        )
+        application = _application(political_party=c.PoliticalPartyChoice.GREEN)
+        with self.assertRaises(APIValidationError) as ctx:
+            self.client.set_application(application)
+        self.assertEqual(ctx.exception.errors()[0].loc, ("political_party",))
+        self.assertNotIn("SETAPPLICATION", self.transport.actions)
+
+    def test_valid_application_sent(self):
+        response = self.client.set_application(_application())
+        self.assertFalse(response.has_error())
+        self.assertEqual(self.transport.actions[-1], "SETAPPLICATION")
+
+    def test_ballot_application_checked_against_ballot_setup(self):
+        response = self.client.set_ballot_application(_application())
+        self.assertFalse(response.has_error())
+        self.assertEqual(
+            self.transport.actions,
+            ["GETBALLOTAPPLICATIONSETUP", "GETMUNICIPALITIES", "SETBALLOTAPPLICATION"],
+        )
+
+
+class ReferenceCacheTestCase(TestCase):
+    def test_refreshed_in_background(self):
+        transport = CountingTransport()
+        client = c.PennsylvaniaAPIClient.staging("key", _transport=transport)
+        clock = Clock()
+        cache = ReferenceCache(client, max_age=60, clock=clock)
+        first = cache.setup()
+        clock.now = 61
+        # The stale copy is returned while a new one is fetched.
+        self.assertIs(cache.setup(), first)
+        for thread in threading.enumerate():
+            if thread.name == "pa-reference":
+                thread.join()
+        self.assertIsNot(cache.setup(), first)
+        self.assertEqual(transport.actions, ["GETAPPLICATIONSETUP"] * 2)
+
+    def test_failed_refresh_keeps_old_copy(self):
+        transport = CountingTransport()
+        client = c.PennsylvaniaAPIClient.staging("key", _transport=transport)
+        clock = Clock()
+        cache = ReferenceCache(client, max_age=60, clock=clock)
+        first = cache.setup()
+        transport.failing = True
+        clock.now = 61
+        cache.setup()
+        for thread in threading.enumerate():
+            if thread.name == "pa-reference":
+                thread.join()
+        self.assertIs(cache.setup(), first)
+        self.assertIsNotNone(cache.last_error)
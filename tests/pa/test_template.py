@@ -0,0 +1,122 @@
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+from unittest import TestCase
+
+import httpx
+
+from voter_tools.emulate.payloads import PA_TEMPLATE_FIELDS, pa_xml_template
+from voter_tools.pa import client as c
+from voter_tools.pa.template import (
+    TemplateWatch,
+    fingerprint,
+    record_tags,
+    template_tags,
+)
+
+
+class TemplateTransport(httpx.BaseTransport):
+    """Serve a template with the given fields, counting fetches."""
+
+    fetches = 0
+
+    def __init__(self, fields=PA_TEMPLATE_FIELDS):
+        """Serve a template with `fields`."""
+        self.fields = tuple(fields)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.fetches += 1
+        return httpx.Response(200, json=pa_xml_template(self.fields))
+
+
+class Clock:
+    now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FingerprintTestCase(TestCase):
+    def test_whitespace_ignored(self):
+        template = ET.fromstring(pa_xml_template())
+        indented = ET.fromstring(pa_xml_template())
+        ET.indent(indented)
+        self.assertEqual(fingerprint(template), fingerprint(indented))
+
+    def test_fields_matter(self):
+        fields = list(PA_TEMPLATE_FIELDS)
+        template = ET.fromstring(pa_xml_template(fields))
+        reordered = ET.fromstring(pa_xml_template(fields[1:] + fields[:1]))
+        fewer = ET.fromstring(pa_xml_template(fields[1:]))
+        self.assertNotEqual(fingerprint(template), fingerprint(reordered))
+        self.assertNotEqual(fingerprint(template), fingerprint(fewer))
+
+    def test_template_tags(self):
+        template = ET.fromstring(pa_xml_template(["FirstName", "LastName"]))
+        self.assertEqual(template_tags(template), {"FirstName", "LastName"})
+
+    def test_record_tags(self):
+        tags = record_tags()
+        self.assertIn("FirstName", tags)
+        self.assertIn("batch", tags)  # Named for its field.
+        self.assertIn("county", tags)  # A computed element.
+        self.assertNotIn("first_name", tags)
+
+
+class TemplateWatchTestCase(TestCase):
+    def setUp(self):
+        self.fields = sorted(record_tags())
+        self.transport = TemplateTransport(self.fields)
+        self.clock = Clock()
+        self.client = c.PennsylvaniaAPIClient.staging("key", _transport=self.transport)
+        self.watch = TemplateWatch(self.client, interval=60, clock=self.clock)
+
+    def test_matching_template(self):
+        drift = self.watch.check()
+        self.assertTrue(drift.matches_record)
+        self.assertFalse(drift.changed)
+        self.assertIsNone(drift.previous_digest)
+
+    def test_fetched_only_when_due(self):
+        self.watch.check()
+        self.clock.now = 59
+        self.watch.check()
+        self.assertEqual(self.transport.fetches, 1)
+        self.clock.now = 60
+        self.watch.check()
+        self.assertEqual(self.transport.fetches, 2)
+        self.watch.check(force=True)
+        self.assertEqual(self.transport.fetches, 3)
+
+    def test_drift(self):
+        first = self.watch.check()
+        self.transport.fields = (*self.transport.fields, "newfield")
+        self.transport.fields = tuple(
+            f for f in self.transport.fields if f != "FirstName"
+        )
+        self.clock.now = 60
+        drift = self.watch.check()
+        self.assertTrue(drift.changed)
+        self.assertEqual(drift.previous_digest, first.digest)
+        self.assertEqual(drift.added, ("newfield",))
+        self.assertEqual(drift.removed, ("FirstName",))
+        self.assertFalse(drift.matches_record)
+
+    def test_check_all(self):
+        drifts = self.watch.check_all()
+        self.assertEqual([d.name for d in drifts], ["application", "ballot"])
+        self.assertEqual(self.transport.fetches, 2)
+
+    def test_persisted(self):
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, "templates.json")
+            watch = TemplateWatch(self.client, path=path, clock=self.clock)
+            first = watch.check()
+            self.transport.fields = self.transport.fields[1:]
+            watch = TemplateWatch(self.client, path=path, clock=self.clock)
+            fingerprint = watch.fingerprint("application")
+            assert fingerprint is not None
+            self.assertEqual(fingerprint.digest, first.digest)
+            drift = watch.check(force=True)
+            self.assertTrue(drift.changed)
+            self.assertEqual(drift.removed, (self.fields[0],))
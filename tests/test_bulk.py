@@ -0,0 +1,264 @@
+import asyncio
+import datetime
+import time
+from unittest import TestCase
+
+import httpx
+
+from voter_tools.aio import get_async_check_tool
+from voter_tools.bulk import (
+    BulkChecker,
+    CheckRequest,
+    InvalidRequest,
+    normalize_name,
+    normalize_zipcode,
+)
+from voter_tools.emulate import (
+    Emulator,
+    EmulatorConfig,
+    EmulatorTransport,
+    Endpoint,
+    EndpointConfig,
+    LatencyConfig,
+)
+from voter_tools.retry import NO_RETRIES, CircuitBreaker
+
+BIRTH_DATE = datetime.date(1980, 1, 2)
+
+
+def _transport(realtime: bool = False, **endpoint_config) -> EmulatorTransport:
+    config = EmulatorConfig(default=EndpointConfig(**endpoint_config), seed=42)
+    return EmulatorTransport(Emulator(config), realtime=realtime)
+
+
+def _request(zipcode: str, index: int = 0) -> CheckRequest:
+    return CheckRequest(
+        first_name=f"First{index}",
+        last_name="Last",
+        zipcode=zipcode,
+        birth_date=BIRTH_DATE,
+    )
+
+
+class FinishOrderTransport(EmulatorTransport):
+    """Note whether each request was answered or failed, as it finishes."""
+
+    finished: list[str]
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        finished = self.__dict__.setdefault("finished", [])
+        try:
+            response = super().handle_request(request)
+        except httpx.HTTPError:
+            finished.append("failed")
+            raise
+        finished.append("answered")
+        return response
+
+
+class NormalizationTestCase(TestCase):
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name("  Mary   Ann "), "mary ann")
+        self.assertEqual(normalize_name("STRASSE"), normalize_name("straße"))
+
+    def test_normalize_zipcode(self):
+        self.assertEqual(normalize_zipcode("48201-1234"), "48201")
+        self.assertEqual(normalize_zipcode(" 2134 "), "02134")
+        self.assertEqual(normalize_zipcode("30301"), "30301")
+        self.assertEqual(normalize_zipcode("21381234"), "02138")
+        self.assertIsNone(normalize_zipcode("abc"))
+
+    def test_invalid_zipcode_kept(self):
+        request = CheckRequest.normalized("Alice", "Smith", " abc ", BIRTH_DATE)
+        self.assertEqual(request.zipcode, "abc")
+        self.assertEqual(request.key[2], "abc")
+
+    def test_key_ignores_case_and_spacing(self):
+        first = CheckRequest.normalized("Alice ", "SMITH", "48201-0001", BIRTH_DATE)
+        second = CheckRequest.normalized("alice", " Smith", "48201", BIRTH_DATE)
+        self.assertEqual(first.key, second.key)
+        self.assertEqual(first.zipcode, "48201")
+
+    def test_key_distinguishes_birth_dates(self):
+        first = _request("48201")
+        second = first.model_copy(update={"birth_date": datetime.date(1990, 1, 1)})
+        self.assertNotEqual(first.key, second.key)
+
+
+class BulkCheckerTestCase(TestCase):
+    def test_every_request_answered(self):
+        checker = BulkChecker(max_workers=4, _transport=_transport())
+        zipcodes = ["30301", "48201", "53703", "19127", "10001"] * 10
+        items = [(i, _request(zipcode, i)) for i, zipcode in enumerate(zipcodes)]
+        outcomes = dict(checker.check_all(items))
+        self.assertEqual(sorted(outcomes), list(range(len(zipcodes))))
+        for i, request in items:
+            self.assertEqual(outcomes[i].request, request)
+
+    def test_skipped_requests_answered(self):
+        latency = LatencyConfig.parse("fixed:50")
+        checker = BulkChecker(_transport=_transport(realtime=True, latency=latency))
+        items = [
+            (0, _request("48201")),
+            (1, _request("10001")),
+            (2, InvalidRequest(reason="invalid date of birth")),
+            (3, _request("00000")),
+        ]
+        outcomes = list(checker.check_all(items))
+        self.assertEqual([key for key, _ in outcomes], [0, 1, 2, 3])
+        skipped = [outcome.skipped for _, outcome in outcomes]
+        self.assertEqual(
+            skipped,
+            [
+                None,
+                "unsupported state: NY",
+                "invalid date of birth",
+                "unknown ZIP code",
+            ],
+        )
+        self.assertEqual(checker.skipped, 3)
+
+    def test_input_order_kept(self):
+        class SmallWindowChecker(BulkChecker):
+            OUTPUT_WINDOW = 3
+
+        latency = LatencyConfig.parse("uniform:0:20")
+        checker = SmallWindowChecker(
+            max_workers=4, _transport=_transport(realtime=True, latency=latency)
+        )
+        zipcodes = ["30301", "48201", "53703", "10001", "19127"] * 8
+        items = [(i, _request(zipcode, i)) for i, zipcode in enumerate(zipcodes)]
+        items.insert(7, (len(items), InvalidRequest(reason="bad")))
+        keys = [key for key, _ in checker.check_all(items)]
+        self.assertEqual(keys, [key for key, _ in items])
+
+    def test_unexpected_tool_error_raised(self):
+        def broken(request: httpx.Request) -> httpx.Response:
+            raise RuntimeError("Tool bug.")
+
+        checker = BulkChecker(max_workers=2, _transport=httpx.MockTransport(broken))
+        items = [(i, _request("48201", i)) for i in range(5)]
+        with self.assertRaisesRegex(RuntimeError, "Tool bug."):
+            list(checker.check_all(items))
+
+    def test_states_do_not_block_each_other(self):
+        config = EmulatorConfig(
+            endpoints={Endpoint.MI: EndpointConfig(stall_rate=1.0, stall_seconds=0.5)},
+            seed=1,
+        )
+        transport = FinishOrderTransport(Emulator(config))
+        checker = BulkChecker(
+            max_workers=1,
+            retry=NO_RETRIES,
+            breaker=CircuitBreaker(),
+            timeout=0.3,
+            _transport=transport,
+        )
+        items = [(0, _request("48201")), (1, _request("53703"))]
+        outcomes = list(checker.check_all(items))
+        # WI answers while MI is still stalled.
+        self.assertEqual(transport.finished, ["answered", "failed"])
+        self.assertIsNotNone(outcomes[0][1].error)
+        self.assertIsNone(outcomes[1][1].error)
+
+    def test_dedupe(self):
+        transport = _transport()
+        checker = BulkChecker(_transport=transport)
+        requests = [
+            CheckRequest.normalized("Alice", "Smith", "53703", BIRTH_DATE),
+            CheckRequest.normalized("Bob", "Jones", "53703", BIRTH_DATE),
+            CheckRequest.normalized("ALICE", "smith ", "53703-1111", BIRTH_DATE),
+        ]
+        outcomes = dict(checker.check_all(enumerate(requests)))
+        self.assertEqual((checker.requested, checker.duplicates), (3, 1))
+        self.assertEqual(transport.emulator.stats()["wi"]["ok"], 2)
+        self.assertEqual(outcomes[0].result, outcomes[2].result)
+        # Each outcome carries its own row's request.
+        self.assertEqual(outcomes[2].request, requests[2])
+
+    def test_no_dedupe(self):
+        transport = _transport()
+        checker = BulkChecker(dedupe=False, _transport=transport)
+        request = _request("53703")
+        _ = list(checker.check_all([(0, request), (1, request)]))
+        self.assertEqual(checker.duplicates, 0)
+        self.assertEqual(transport.emulator.stats()["wi"]["ok"], 2)
+
+    def test_input_errors_propagate(self):
+        def items():
+            yield 0, _request("48201")
+            raise ValueError("Bad input.")
+
+        checker = BulkChecker(_transport=_transport())
+        with self.assertRaises(ValueError):
+            _ = list(checker.check_all(items()))
+
+    def test_input_read_lazily(self):
+        class SmallChecker(BulkChecker):
+            PLAN_CHUNK_SIZE = 10
+            RESULTS_QUEUE_SIZE = 10
+
+        read = 0
+
+        def items():
+            nonlocal read
+            while True:
+                read += 1
+                yield read, _request("10001", read)
+
+        checker = SmallChecker(_transport=_transport())
+        outcomes = checker.check_all(items())
+        for _ in range(5):
+            _ = next(outcomes)
+        time.sleep(0.05)
+        # Planning stalls once the results queue is full.
+        self.assertLessEqual(read, 5 + 10 + 10 + 1)
+        outcomes.close()
+
+    def test_unsupported_state(self):
+        checker = BulkChecker(_transport=_transport())
+        outcome = checker.check(_request("10001"))
+        self.assertEqual(outcome.state, "NY")
+        self.assertEqual(outcome.skipped, "unsupported state: NY")
+        self.assertIsNone(outcome.result)
+
+    def test_errors_are_captured(self):
+        checker = BulkChecker(
+            retry=NO_RETRIES,
+            breaker=CircuitBreaker(),
+            _transport=_transport(error_rate=1.0),
+        )
+        outcome = checker.check(_request("53703"))
+        self.assertIsNone(outcome.skipped)
+        self.assertIsNone(outcome.result)
+        self.assertIsNotNone(outcome.error)
+
+    def test_one_tool_per_state(self):
+        checker = BulkChecker(_transport=_transport())
+        self.assertIs(checker.tool_for("MI"), checker.tool_for("MI"))
+
+
+class AsyncCheckRegistrationToolTestCase(TestCase):
+    def test_concurrent_checks(self):
+        tool = get_async_check_tool(
+            zipcode="48201", _transport=_transport(registered_rate=1.0)
+        )
+        assert tool is not None
+        self.assertEqual(tool.state, "MI")
+
+        async def check_many():
+            return await asyncio.gather(
+                *(
+                    tool.check_registration(f"First{i}", "Last", "48201", BIRTH_DATE)
+                    for i in range(10)
+                )
+            )
+
+        try:
+            results = asyncio.run(check_many())
+        finally:
+            tool.close()
+        self.assertTrue(all(result.registered for result in results))
+
+    def test_unsupported_state(self):
+        self.assertIsNone(get_async_check_tool(state="NY"))
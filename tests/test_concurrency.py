@@ -0,0 +1,226 @@
+import threading
+import time
+from unittest import TestCase
+
+import httpx
+
+from voter_tools.concurrency import AIMDLimiter, LimitedTransport, Outcome, Priority
+from voter_tools.retry import DEADLINE
+
+
+class FakeClock:
+    """A clock that only moves when told to."""
+
+    def __init__(self):
+        """Start the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class AIMDLimiterTestCase(TestCase):
+    def _saturate(self, limiter: AIMDLimiter, clock: FakeClock, latency: float):
+        """Fill every slot, then complete each request with the given latency."""
+        starts = [limiter.acquire() for _ in range(limiter.limit)]
+        clock.now += latency
+        for started in starts:
+            limiter.release(started, Outcome.SUCCESS)
+
+    def test_additive_increase(self):
+        clock = FakeClock()
+        limiter = AIMDLimiter(4, max_limit=32, clock=clock)
+        for _ in range(10):
+            self._saturate(limiter, clock, 0.1)
+        # At most one more slot per round trip.
+        self.assertGreater(limiter.limit, 4)
+        self.assertLessEqual(limiter.limit, 14)
+
+    def test_increase_capped(self):
+        clock = FakeClock()
+        limiter = AIMDLimiter(4, max_limit=5, clock=clock)
+        for _ in range(20):
+            self._saturate(limiter, clock, 0.1)
+        self.assertEqual(limiter.limit, 5)
+
+    def test_holds_when_latency_rises(self):
+        clock = FakeClock()
+        limiter = AIMDLimiter(4, max_limit=32, clock=clock)
+        self._saturate(limiter, clock, 0.1)
+        before = limiter.limit
+        for _ in range(10):
+            self._saturate(limiter, clock, 1.0)
+        self.assertLessEqual(limiter.limit, before + 1)
+
+    def test_no_increase_when_underused(self):
+        clock = FakeClock()
+        limiter = AIMDLimiter(8, clock=clock)
+        for _ in range(50):
+            started = limiter.acquire()
+            clock.now += 0.1
+            limiter.release(started, Outcome.SUCCESS)
+        self.assertEqual(limiter.limit, 8)
+
+    def test_multiplicative_decrease(self):
+        clock = FakeClock()
+        limiter = AIMDLimiter(16, clock=clock)
+        started = limiter.acquire()
+        clock.now += 1
+        limiter.release(started, Outcome.OVERLOAD)
+        self.assertEqual(limiter.limit, 8)
+
+    def test_one_cut_per_round_trip(self):
+        clock = FakeClock()
+        limiter = AIMDLimiter(16, clock=clock)
+        starts = [limiter.acquire() for _ in range(8)]
+        clock.now += 1
+        for started in starts:
+            limiter.release(started, Outcome.OVERLOAD)
+        self.assertEqual(limiter.limit, 8)
+
+    def test_floor(self):
+        clock = FakeClock()
+        limiter = AIMDLimiter(2, min_limit=2, clock=clock)
+        for _ in range(5):
+            started = limiter.acquire()
+            clock.now += 1
+            limiter.release(started, Outcome.OVERLOAD)
+        self.assertEqual(limiter.limit, 2)
+
+    def test_acquire_blocks_at_limit(self):
+        limiter = AIMDLimiter(1, max_limit=1)
+        started = limiter.acquire()
+        with self.assertRaises(TimeoutError):
+            _ = limiter.acquire(timeout=0.01)
+        limiter.release(started, Outcome.IGNORE)
+        limiter.release(limiter.acquire(timeout=0.01), Outcome.IGNORE)
+
+    def _grant_order(
+        self, limiter: AIMDLimiter, lanes: list[tuple[str, Priority]]
+    ) -> list[str]:
+        """Queue up waiters in order behind a held slot; return who got in when."""
+        held = limiter.acquire(priority=Priority.BULK)
+        order = []
+
+        def wait(name: str, priority: Priority):
+            started = limiter.acquire(priority=priority)
+            order.append(name)
+            limiter.release(started, Outcome.IGNORE)
+
+        threads = []
+        for i, (name, priority) in enumerate(lanes):
+            thread = threading.Thread(target=wait, args=(name, priority))
+            thread.start()
+            threads.append(thread)
+            while limiter.waiting <= i:
+                time.sleep(0.001)
+        limiter.release(held, Outcome.IGNORE)
+        for thread in threads:
+            thread.join()
+        return order
+
+    def test_interactive_goes_first(self):
+        limiter = AIMDLimiter(1, max_limit=1)
+        lanes = [(f"b{i}", Priority.BULK) for i in range(3)]
+        lanes.append(("i", Priority.INTERACTIVE))
+        self.assertEqual(self._grant_order(limiter, lanes), ["i", "b0", "b1", "b2"])
+
+    def test_weighted_fair_queuing(self):
+        weights = {Priority.INTERACTIVE: 2.0, Priority.BULK: 1.0}
+        limiter = AIMDLimiter(1, max_limit=1, weights=weights)
+        lanes = [(f"b{i}", Priority.BULK) for i in range(3)]
+        lanes += [(f"i{i}", Priority.INTERACTIVE) for i in range(6)]
+        order = self._grant_order(limiter, lanes)
+        # Two interactive requests for every bulk one.
+        self.assertEqual(order, ["i0", "b0", "i1", "i2", "b1", "i3", "i4", "b2", "i5"])
+
+    def test_timed_out_waiter_leaves_queue(self):
+        limiter = AIMDLimiter(1, max_limit=1)
+        started = limiter.acquire()
+        with self.assertRaises(TimeoutError):
+            _ = limiter.acquire(timeout=0.01, priority=Priority.BULK)
+        self.assertEqual(limiter.snapshot()["waiting"], 0)
+        limiter.release(started, Outcome.IGNORE)
+        limiter.release(limiter.acquire(timeout=0.01), Outcome.IGNORE)
+
+    def test_invalid_limits(self):
+        with self.assertRaises(ValueError):
+            _ = AIMDLimiter(10, max_limit=5)
+
+
+class LimitedTransportTestCase(TestCase):
+    def test_overload_statuses_cut_limit(self):
+        limiter = AIMDLimiter(8)
+        transport = LimitedTransport(
+            httpx.MockTransport(lambda request: httpx.Response(429)), limiter
+        )
+        _ = httpx.Client(transport=transport).get("http://x/")
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_timeouts_cut_limit(self):
+        def timeout(request: httpx.Request) -> httpx.Response:
+            raise httpx.ReadTimeout("Too slow.", request=request)
+
+        limiter = AIMDLimiter(8)
+        transport = LimitedTransport(httpx.MockTransport(timeout), limiter)
+        with self.assertRaises(httpx.ReadTimeout):
+            _ = httpx.Client(transport=transport).get("http://x/")
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_deadline_timeouts_ignored(self):
+        def timeout(request: httpx.Request) -> httpx.Response:
+            time.sleep(0.02)
+            raise httpx.ReadTimeout("Out of time.", request=request)
+
+        limiter = AIMDLimiter(8)
+        client = httpx.Client(
+            transport=LimitedTransport(httpx.MockTransport(timeout), limiter)
+        )
+        with self.assertRaises(httpx.ReadTimeout):
+            _ = client.get("http://x/", extensions={DEADLINE: time.monotonic() + 0.01})
+        self.assertEqual(limiter.limit, 8)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_bounds_concurrency(self):
+        limiter = AIMDLimiter(2, max_limit=2)
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+        gate = threading.Event()
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            gate.wait(0.05)
+            with lock:
+                in_flight -= 1
+            return httpx.Response(200)
+
+        client = httpx.Client(
+            transport=LimitedTransport(httpx.MockTransport(handler), limiter)
+        )
+        threads = [
+            threading.Thread(target=client.get, args=("http://x/",)) for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(peak, 2)
+
+    def test_deadline_bounds_wait(self):
+        limiter = AIMDLimiter(1, max_limit=1)
+        held = limiter.acquire()
+        client = httpx.Client(
+            transport=LimitedTransport(
+                httpx.MockTransport(lambda request: httpx.Response(200)), limiter
+            )
+        )
+        with self.assertRaises(httpx.PoolTimeout):
+            _ = client.get("http://x/", extensions={DEADLINE: time.monotonic() + 0.01})
+        limiter.release(held, Outcome.IGNORE)
+        self.assertEqual(limiter.in_flight, 0)
@@ -0,0 +1,144 @@
+import datetime
+import random
+from unittest import TestCase
+
+import httpx
+
+from voter_tools import get_check_tool
+from voter_tools.emulate import (
+    Emulator,
+    EmulatorConfig,
+    EmulatorTransport,
+    Endpoint,
+    EndpointConfig,
+    LatencyConfig,
+)
+from voter_tools.emulate.app import route
+from voter_tools.emulate.config import LatencyDistribution
+from voter_tools.errors import CheckRegistrationError
+from voter_tools.pa.client import PennsylvaniaAPIClient
+from voter_tools.retry import CircuitBreaker, RetryPolicy
+
+
+def _transport(**endpoint_config) -> EmulatorTransport:
+    config = EmulatorConfig(default=EndpointConfig(**endpoint_config), seed=42)
+    return EmulatorTransport(Emulator(config), realtime=False)
+
+
+class LatencyConfigTestCase(TestCase):
+    def test_parse_none(self):
+        config = LatencyConfig.parse("none")
+        self.assertEqual(config.distribution, LatencyDistribution.NONE)
+
+    def test_parse_lognormal(self):
+        config = LatencyConfig.parse("lognormal:250:0.6")
+        self.assertEqual(config.distribution, LatencyDistribution.LOGNORMAL)
+        self.assertEqual(config.median_ms, 250)
+        self.assertEqual(config.sigma, 0.6)
+
+    def test_parse_uniform(self):
+        config = LatencyConfig.parse("uniform:50:400")
+        rng = random.Random(0)
+        for _ in range(100):
+            self.assertTrue(0.05 <= config.sample(rng) <= 0.4)
+
+    def test_parse_invalid(self):
+        with self.assertRaises(ValueError):
+            _ = LatencyConfig.parse("uniform:50")
+        with self.assertRaises(ValueError):
+            _ = LatencyConfig.parse("burrito:1")
+
+
+class RouteTestCase(TestCase):
+    def test_routes(self):
+        self.assertEqual(route("/s/sfsites/aura"), Endpoint.GA)
+        self.assertEqual(route("/Voter/SearchByName"), Endpoint.MI)
+        self.assertEqual(
+            route("/DesktopModules/GabMyVoteModules/api/voter/search"), Endpoint.WI
+        )
+        self.assertEqual(
+            route("/Pages/voterregistrationstatus.aspx"), Endpoint.PA_STATUS
+        )
+        self.assertEqual(route("/SureOVRWebAPI/api/ovr"), Endpoint.PA_OVR)
+        self.assertIsNone(route("/nope"))
+
+
+class EmulatedToolsTestCase(TestCase):
+    BIRTH_DATE = datetime.date(1980, 1, 2)
+
+    def _check(self, zipcode: str, transport: EmulatorTransport, **kwargs):
+        tool = get_check_tool(zipcode=zipcode, _transport=transport)
+        assert tool is not None
+        return tool.check_registration(
+            "Alice", "Smith", zipcode, self.BIRTH_DATE, **kwargs
+        )
+
+    def test_everyone_registered(self):
+        transport = _transport(registered_rate=1.0)
+        for zipcode in ("30301", "48201", "53703", "19127"):
+            result = self._check(zipcode, transport, details=True)
+            self.assertTrue(result.registered)
+
+    def test_details(self):
+        transport = _transport(registered_rate=1.0)
+        for zipcode in ("30301", "48201", "53703"):
+            result = self._check(zipcode, transport, details=True)
+            self.assertIsNotNone(result.details)
+
+    def test_nobody_registered(self):
+        transport = _transport(registered_rate=0.0)
+        for zipcode in ("30301", "48201", "53703", "19127"):
+            result = self._check(zipcode, transport)
+            self.assertFalse(result.registered)
+
+    def test_deterministic(self):
+        first = self._check("48201", _transport(registered_rate=0.5), details=True)
+        second = self._check("48201", _transport(registered_rate=0.5), details=True)
+        self.assertEqual(first, second)
+
+    def test_injected_errors(self):
+        transport = _transport(error_rate=1.0)
+        tool = get_check_tool(
+            zipcode="53703",
+            retry=RetryPolicy(max_attempts=3, base_delay=0),
+            breaker=CircuitBreaker(),
+            _transport=transport,
+        )
+        assert tool is not None
+        with self.assertRaises(CheckRegistrationError):
+            _ = tool.check_registration("Alice", "Smith", "53703", self.BIRTH_DATE)
+        stats = transport.emulator.stats()
+        self.assertEqual(stats["wi"]["error"], 3)
+
+    def test_stall_times_out(self):
+        transport = _transport(stall_rate=1.0)
+        client = httpx.Client(transport=transport)
+        with self.assertRaises(httpx.ReadTimeout):
+            _ = client.post("http://emulated/Voter/SearchByName")
+
+    def test_throttling(self):
+        transport = _transport(rate_limit=0.001, burst=2)
+        client = httpx.Client(transport=transport)
+        statuses = [
+            client.post(
+                "http://emulated/DesktopModules/GabMyVoteModules/api/voter/search",
+                json={"firstName": "A", "lastName": "B", "birthDate": "01/01/1980"},
+            )
+            for _ in range(3)
+        ]
+        self.assertEqual([r.status_code for r in statuses], [200, 200, 429])
+        self.assertIn("Retry-After", statuses[2].headers)
+
+
+class EmulatedPennsylvaniaAPITestCase(TestCase):
+    def _client(self) -> PennsylvaniaAPIClient:
+        return PennsylvaniaAPIClient.staging("key", _transport=_transport())
+
+    def test_setup(self):
+        setup = self._client().get_application_setup()
+        self.assertEqual(len(setup.counties), 67)
+
+    def test_municipalities(self):
+        response = self._client().get_municipalities("ADAMS")
+        self.assertTrue(response.municipalities)
+        self.assertEqual(response.municipalities[0].county_id, 2290)
@@ -166,3 +166,35 @@ class BuildErrorForCodesTestCase(TestCase):
             )
         )
         self.assertIsInstance(err, pa_errors.ProgrammingError)
+
+    def test_near_miss_code(self):
+        err = pa_errors.build_error_for_codes(("VR_WAPIX_InvalidDLformat",))
+        assert isinstance(err, pa_errors.APIValidationError)
+        self.assertEqual(err.errors()[0].loc, ("drivers_license",))
+
+    def test_errors_are_fresh(self):
+        codes = ("VR_WAPI_InvalidOVRDL",)
+        self.assertIsNot(
+            pa_errors.build_error_for_codes(codes),
+            pa_errors.build_error_for_codes(codes),
+        )
+        err = pa_errors.build_error_for_codes(("VR_WAPI_InvalidAccessKey",))
+        self.assertIsNot(err, pa_errors.BASE_ERROR_MAP["VR_WAPI_InvalidAccessKey"])
+        self.assertEqual(
+            str(err), str(pa_errors.BASE_ERROR_MAP["VR_WAPI_InvalidAccessKey"])
+        )
+
+    def test_same_as_merged(self):
+        codes = ("VR_WAPI_InvalidOVRDL", "bogus", "VR_WAPI_MissingOVRcity")
+        err = pa_errors.build_error_for_codes(codes)
+        merged = pa_errors.merge_errors(
+            [
+                pa_errors.BASE_ERROR_MAP["VR_WAPI_InvalidOVRDL"],
+                pa_errors.APIValidationError.unexpected("bogus"),
+                pa_errors.BASE_ERROR_MAP["VR_WAPI_MissingOVRcity"],
+            ]
+        )
+        assert isinstance(err, pa_errors.APIValidationError)
+        assert isinstance(merged, pa_errors.APIValidationError)
+        self.assertEqual(err.errors(), merged.errors())
+        self.assertEqual(str(err), str(merged))
@@ -0,0 +1,100 @@
+import datetime
+from unittest import TestCase
+
+import httpx
+
+from voter_tools.emulate import (
+    Emulator,
+    EmulatorConfig,
+    EmulatorTransport,
+    EndpointConfig,
+)
+from voter_tools.errors import CheckRegistrationError
+from voter_tools.ga import GeorgiaCheckRegistrationTool
+from voter_tools.retry import CircuitBreaker, RetryPolicy
+
+BIRTH_DATE = datetime.date(1980, 1, 2)
+
+
+class SlowDetailsTransport(httpx.BaseTransport):
+    """Find every voter, but time out looking up their details."""
+
+    def __init__(self):
+        """Answer existence checks with an emulator."""
+        endpoint = EndpointConfig(registered_rate=1.0)
+        emulator = Emulator(EmulatorConfig(default=endpoint, seed=1))
+        self.inner = EmulatorTransport(emulator, realtime=False)
+        self.detail_timeouts: list[float] = []
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if b"getPersonalInformation" in request.read():
+            self.detail_timeouts.append(request.extensions["timeout"]["read"])
+            raise httpx.ReadTimeout("Too slow.", request=request)
+        return self.inner.handle_request(request)
+
+
+class CountyTransport(httpx.BaseTransport):
+    """Find voters only when searching one county."""
+
+    def __init__(self, county: str):
+        """Find voters in `county`, and nobody anywhere else."""
+        self.county = county.upper().encode()
+        self.found, self.missing = (
+            EmulatorTransport(
+                Emulator(EmulatorConfig(default=EndpointConfig(registered_rate=rate))),
+                realtime=False,
+            )
+            for rate in (1.0, 0.0)
+        )
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        body = request.read()
+        if b"getPersonalInformation" in body or self.county in body:
+            return self.found.handle_request(request)
+        return self.missing.handle_request(request)
+
+
+class GeorgiaBudgetTestCase(TestCase):
+    def _tool(self, transport: httpx.BaseTransport, **kwargs):
+        return GeorgiaCheckRegistrationTool(
+            retry=RetryPolicy(base_delay=0),
+            breaker=CircuitBreaker(),
+            _transport=transport,
+            **kwargs,
+        )
+
+    def test_details_dropped_when_budget_runs_out(self):
+        transport = SlowDetailsTransport()
+        tool = self._tool(transport, budget=2.0)
+        result = tool.check_registration("Jane", "Doe", "30301", BIRTH_DATE, True)
+        self.assertTrue(result.registered)
+        self.assertIsNone(result.details)
+        # Each attempt at the second hop only gets what's left of the budget.
+        self.assertTrue(transport.detail_timeouts)
+        self.assertTrue(all(t <= 2.0 for t in transport.detail_timeouts))
+
+    def test_details_found_within_budget(self):
+        endpoint = EndpointConfig(registered_rate=1.0)
+        emulator = Emulator(EmulatorConfig(default=endpoint, seed=1))
+        tool = self._tool(EmulatorTransport(emulator, realtime=False), budget=2.0)
+        result = tool.check_registration("Jane", "Doe", "30301", BIRTH_DATE, True)
+        self.assertTrue(result.registered)
+        self.assertIsNotNone(result.details)
+
+    def test_without_budget_timeouts_fail(self):
+        tool = self._tool(SlowDetailsTransport())
+        with self.assertRaises(CheckRegistrationError):
+            _ = tool.check_registration("Jane", "Doe", "30301", BIRTH_DATE, True)
+
+
+class GeorgiaCountyTestCase(TestCase):
+    def test_voter_found_in_neighboring_county(self):
+        tool = GeorgiaCheckRegistrationTool(_transport=CountyTransport("Cobb"))
+        result = tool.check_registration("Jane", "Doe", "30301", BIRTH_DATE, True)
+        self.assertTrue(result.registered)
+        self.assertIsNotNone(result.details)
+
+    def test_voter_found_nowhere(self):
+        tool = GeorgiaCheckRegistrationTool(_transport=CountyTransport("Dekalb"))
+        result = tool.check_registration("Jane", "Doe", "30301", BIRTH_DATE)
+        self.assertFalse(result.registered)
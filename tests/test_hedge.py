@@ -0,0 +1,135 @@
+import datetime
+import threading
+import time
+from unittest import TestCase
+
+import httpx
+
+from voter_tools import get_check_tool
+from voter_tools.emulate import Emulator, EmulatorConfig, EmulatorTransport
+from voter_tools.hedge import (
+    HedgeBudget,
+    HedgePolicy,
+    HedgingTransport,
+    LatencyTracker,
+)
+
+
+class SlowFirstTransport(httpx.BaseTransport):
+    """Answer the first request slowly, and every later one immediately."""
+
+    def __init__(self, slow: float = 0.5, status: int = 200):
+        """Create a transport whose first answer takes `slow` seconds."""
+        self.slow = slow
+        self.status = status
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if call == 1:
+            time.sleep(self.slow)
+            return httpx.Response(self.status, text="slow", request=request)
+        return httpx.Response(self.status, text="fast", request=request)
+
+
+class LatencyTrackerTestCase(TestCase):
+    def test_percentile(self):
+        tracker = LatencyTracker()
+        for i in range(100):
+            tracker.record(i / 100)
+        self.assertEqual(tracker.percentile(95), 0.95)
+        self.assertEqual(tracker.percentile(50), 0.5)
+
+    def test_empty(self):
+        self.assertIsNone(LatencyTracker().percentile(95))
+
+    def test_window(self):
+        tracker = LatencyTracker(window=3)
+        for latency in (10.0, 1.0, 2.0, 3.0):
+            tracker.record(latency)
+        self.assertEqual(len(tracker), 3)
+        self.assertEqual(tracker.percentile(99), 3.0)
+
+
+class HedgeBudgetTestCase(TestCase):
+    def test_budget_caps_fraction(self):
+        budget = HedgeBudget(ratio=0.25, burst=1.0)
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+        for _ in range(3):
+            budget.record_request()
+        self.assertFalse(budget.try_spend())
+        budget.record_request()
+        self.assertTrue(budget.try_spend())
+
+
+class HedgingTransportTestCase(TestCase):
+    def _client(self, inner: httpx.BaseTransport, budget: HedgeBudget):
+        policy = HedgePolicy(initial_delay=0.02)
+        transport = HedgingTransport(inner, policy, budget=budget)
+        return httpx.Client(transport=transport), transport
+
+    def test_hedge_wins(self):
+        inner = SlowFirstTransport()
+        client, transport = self._client(inner, HedgeBudget())
+        started = time.monotonic()
+        response = client.post("http://x/", content=b"lookup")
+        # Well under the slow answer's 0.5s.
+        self.assertLess(time.monotonic() - started, 0.25)
+        self.assertEqual(response.text, "fast")
+        self.assertEqual(inner.calls, 2)
+        self.assertEqual((transport.hedged, transport.hedge_wins), (1, 1))
+
+    def test_hedge_answers_timed_out_request(self):
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            if len(calls) == 1:
+                time.sleep(0.2)
+                raise httpx.ReadTimeout("Stalled.", request=request)
+            return httpx.Response(200, text="fast")
+
+        client, transport = self._client(httpx.MockTransport(handler), HedgeBudget())
+        response = client.get("http://x/")
+        self.assertEqual(response.text, "fast")
+        self.assertEqual(transport.hedge_wins, 1)
+
+    def test_no_hedge_when_fast(self):
+        inner = SlowFirstTransport(slow=0.0)
+        client, transport = self._client(inner, HedgeBudget())
+        response = client.get("http://x/")
+        self.assertEqual(response.text, "slow")
+        self.assertEqual(inner.calls, 1)
+        self.assertEqual(transport.hedged, 0)
+
+    def test_no_hedge_without_budget(self):
+        inner = SlowFirstTransport(slow=0.1)
+        client, transport = self._client(inner, HedgeBudget(ratio=0, burst=0))
+        response = client.get("http://x/")
+        self.assertEqual(response.text, "slow")
+        self.assertEqual(inner.calls, 1)
+
+    def test_delay_tracks_percentile(self):
+        policy = HedgePolicy(percentile=90, min_samples=10, initial_delay=5.0)
+        transport = HedgingTransport(httpx.MockTransport(lambda r: None), policy)
+        self.assertEqual(transport.hedge_delay(), 5.0)
+        for i in range(10):
+            transport.tracker.record(i / 10)
+        self.assertEqual(transport.hedge_delay(), 0.9)
+
+
+class HedgedToolTestCase(TestCase):
+    def test_hedged_lookup(self):
+        transport = EmulatorTransport(Emulator(EmulatorConfig(seed=1)), realtime=False)
+        tool = get_check_tool(
+            zipcode="48201", hedge=HedgePolicy(), _transport=transport
+        )
+        assert tool is not None
+        result = tool.check_registration(
+            "Alice", "Smith", "48201", datetime.date(1980, 1, 2)
+        )
+        self.assertIsNotNone(result)
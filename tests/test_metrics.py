@@ -0,0 +1,152 @@
+import datetime
+import io
+import math
+from unittest import TestCase
+
+import httpx
+
+from voter_tools.bulk import BulkChecker, CheckRequest, InvalidRequest
+from voter_tools.emulate import Emulator, EmulatorConfig, EmulatorTransport
+from voter_tools.metrics import (
+    Histogram,
+    MeteredTransport,
+    Metrics,
+    ProgressReporter,
+    StateMetrics,
+    serve_metrics,
+)
+from voter_tools.retry import CircuitBreaker, RetryPolicy, RetryTransport
+
+BIRTH_DATE = datetime.date(1980, 1, 2)
+
+
+class HistogramTestCase(TestCase):
+    def test_cumulative(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value)
+        pairs, count, total = histogram.cumulative()
+        self.assertEqual(pairs, [(0.1, 2), (1.0, 3), (math.inf, 4)])
+        self.assertEqual(count, 4)
+        self.assertAlmostEqual(total, 5.65)
+
+    def test_quantile(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        self.assertIsNone(histogram.quantile(0.5))
+        for _ in range(9):
+            histogram.observe(0.05)
+        histogram.observe(0.5)
+        self.assertEqual(histogram.quantile(0.5), 0.1)
+        self.assertEqual(histogram.quantile(0.99), 1.0)
+
+
+class MetricsTestCase(TestCase):
+    def test_totals(self):
+        metrics = Metrics()
+        metrics.state("mi").increment("registered")
+        metrics.state("WI").increment("registered", 2)
+        metrics.state(None).increment("skipped")
+        self.assertEqual(metrics.total("registered"), 3)
+        self.assertEqual(metrics.rows, 4)
+        self.assertEqual([m.state for m in metrics.states()], ["MI", "WI", "unknown"])
+
+    def test_prometheus(self):
+        metrics = Metrics()
+        metrics.state("MI").increment("requests")
+        metrics.state("MI").request_latency.observe(0.2)
+        text = metrics.render_prometheus()
+        self.assertIn('voter_tools_requests_total{state="MI"} 1\n', text)
+        self.assertIn(
+            'voter_tools_request_duration_seconds_bucket{state="MI",le="0.25"} 1\n',
+            text,
+        )
+        self.assertIn(
+            'voter_tools_request_duration_seconds_bucket{state="MI",le="+Inf"} 1\n',
+            text,
+        )
+
+    def test_serve(self):
+        metrics = Metrics()
+        metrics.state("GA").increment("errors")
+        server = serve_metrics(metrics, port=0)
+        try:
+            port = server.server_address[1]
+            response = httpx.get(f"http://127.0.0.1:{port}/metrics")
+            missing = httpx.get(f"http://127.0.0.1:{port}/other")
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertIn('voter_tools_errors_total{state="GA"} 1', response.text)
+        self.assertEqual(missing.status_code, 404)
+
+
+class TransportMetricsTestCase(TestCase):
+    def test_requests_and_retries_counted(self):
+        statuses = iter([503, 200])
+        inner = httpx.MockTransport(lambda r: httpx.Response(next(statuses)))
+        metrics = StateMetrics("MI")
+        transport = RetryTransport(
+            MeteredTransport(inner, metrics),
+            RetryPolicy(base_delay=0),
+            CircuitBreaker(),
+            metrics=metrics,
+            sleep=lambda _: None,
+        )
+        response = httpx.Client(transport=transport).get("http://x/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((metrics["requests"], metrics["retries"]), (2, 1))
+        self.assertEqual(metrics.request_latency.count, 2)
+
+
+class BulkMetricsTestCase(TestCase):
+    def test_outcomes_counted(self):
+        emulator = Emulator(EmulatorConfig(seed=1))
+        metrics = Metrics()
+        checker = BulkChecker(
+            metrics=metrics, _transport=EmulatorTransport(emulator, realtime=False)
+        )
+        request = CheckRequest.normalized("Alice", "Smith", "53703", BIRTH_DATE)
+        items = [
+            (0, request),
+            (1, request),
+            (2, InvalidRequest(reason="missing name")),
+            (3, CheckRequest.normalized("Bob", "Jones", "10001", BIRTH_DATE)),
+        ]
+        _ = list(checker.check_all(items))
+        wi = metrics.state("WI")
+        self.assertEqual(wi["registered"] + wi["not_registered"], 2)
+        self.assertEqual(wi["cache_hits"], 1)
+        self.assertEqual(wi["requests"], 1)
+        self.assertEqual(wi.check_latency.count, 1)
+        self.assertEqual(metrics.state("NY")["skipped"], 1)
+        self.assertEqual(metrics.state(None)["skipped"], 1)
+        self.assertEqual(metrics.rows, 4)
+
+
+class ProgressReporterTestCase(TestCase):
+    def test_line_and_eta(self):
+        metrics = Metrics()
+        metrics.started -= 10
+        metrics.state("MI").increment("registered", 50)
+        reporter = ProgressReporter(
+            metrics, fraction_read=lambda: 0.5, rows_read=lambda: 100
+        )
+        # A quarter done in ten seconds leaves thirty to go.
+        eta = reporter.eta()
+        assert eta is not None
+        self.assertAlmostEqual(eta, 30, delta=0.5)
+        self.assertIn("50 rows", reporter.line())
+        self.assertIn("ETA 0:00:", reporter.line())
+
+    def test_no_eta_without_input_size(self):
+        reporter = ProgressReporter(Metrics())
+        self.assertIsNone(reporter.eta())
+        self.assertNotIn("ETA", reporter.line())
+
+    def test_final_line(self):
+        stream = io.StringIO()
+        reporter = ProgressReporter(Metrics(), interval=60, stream=stream)
+        reporter.start()
+        reporter.stop()
+        self.assertEqual(stream.getvalue().count("\n"), 1)
+        self.assertTrue(stream.getvalue().startswith("0 rows"))
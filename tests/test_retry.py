@@ -0,0 +1,221 @@
+import datetime
+import random
+import time
+from unittest import TestCase
+
+import httpx
+
+from voter_tools.errors import CircuitOpenError
+from voter_tools.retry import (
+    DEADLINE,
+    CircuitBreaker,
+    CircuitState,
+    RetryPolicy,
+    RetryTransport,
+    get_breaker,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    """A clock that only moves when told to."""
+
+    def __init__(self):
+        """Start the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ScriptedTransport(httpx.BaseTransport):
+    """Answer requests from a script of statuses (or exceptions)."""
+
+    def __init__(
+        self, *script: int | type[httpx.TransportError], headers: dict | None = None
+    ):
+        """Create a transport that plays back the given script."""
+        self.script = list(script)
+        self.headers = headers or {}
+        self.calls = 0
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        step = self.script[min(self.calls, len(self.script) - 1)]
+        self.calls += 1
+        if isinstance(step, int):
+            return httpx.Response(step, headers=self.headers, request=request)
+        raise step("Scripted failure.", request=request)
+
+
+class RetryPolicyTestCase(TestCase):
+    def test_backoff_grows_and_caps(self):
+        policy = RetryPolicy(base_delay=1.0, multiplier=2.0, max_delay=5.0, jitter=0)
+        delays = [policy.backoff(retry) for retry in range(1, 6)]
+        self.assertEqual(delays, [1.0, 2.0, 4.0, 5.0, 5.0])
+
+    def test_full_jitter_within_bounds(self):
+        policy = RetryPolicy(base_delay=1.0, jitter=1.0)
+        rng = random.Random(0)
+        for _ in range(100):
+            self.assertTrue(0.0 <= policy.backoff(2, rng) <= 2.0)
+
+    def test_parse_retry_after_seconds(self):
+        self.assertEqual(parse_retry_after("7"), 7.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+
+    def test_parse_retry_after_date(self):
+        now = datetime.datetime(2024, 1, 1, 12, 0, 0, tzinfo=datetime.UTC)
+        seconds = parse_retry_after("Mon, 01 Jan 2024 12:00:30 GMT", now)
+        self.assertEqual(seconds, 30.0)
+
+
+class CircuitBreakerTestCase(TestCase):
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_half_open_single_trial(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10.0
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_failed_trial_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10.0
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.retry_in(), 10.0)
+
+    def test_shared_per_state(self):
+        self.assertIs(get_breaker("mi"), get_breaker("MI"))
+        self.assertIsNot(get_breaker("MI"), get_breaker("WI"))
+
+
+class RetryTransportTestCase(TestCase):
+    def _client(self, inner: httpx.BaseTransport, **kwargs) -> httpx.Client:
+        self.sleeps: list[float] = []
+        kwargs.setdefault("policy", RetryPolicy(max_attempts=3, jitter=0))
+        transport = RetryTransport(inner, sleep=self.sleeps.append, **kwargs)
+        return httpx.Client(transport=transport)
+
+    def test_retries_server_errors(self):
+        inner = ScriptedTransport(503, 502, 200)
+        response = self._client(inner).post("http://x/", content=b"body")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(inner.calls, 3)
+        self.assertEqual(self.sleeps, [0.5, 1.0])
+
+    def test_gives_up_after_max_attempts(self):
+        inner = ScriptedTransport(500)
+        response = self._client(inner).get("http://x/")
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(inner.calls, 3)
+
+    def test_does_not_retry_client_errors(self):
+        inner = ScriptedTransport(404)
+        response = self._client(inner).get("http://x/")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(inner.calls, 1)
+
+    def test_retries_transport_errors(self):
+        inner = ScriptedTransport(httpx.ConnectError, httpx.ReadTimeout, 200)
+        response = self._client(inner).get("http://x/")
+        self.assertEqual(response.status_code, 200)
+
+    def test_raises_last_transport_error(self):
+        inner = ScriptedTransport(httpx.ConnectError)
+        with self.assertRaises(httpx.ConnectError):
+            _ = self._client(inner).get("http://x/")
+        self.assertEqual(inner.calls, 3)
+
+    def test_honors_retry_after(self):
+        inner = ScriptedTransport(429, 200, headers={"Retry-After": "3"})
+        response = self._client(inner).get("http://x/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.sleeps, [3.0])
+
+    def test_retry_after_too_long(self):
+        inner = ScriptedTransport(429, 200, headers={"Retry-After": "3600"})
+        response = self._client(inner).get("http://x/")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(inner.calls, 1)
+
+    def test_breaker_fails_fast(self):
+        breaker = CircuitBreaker(failure_threshold=3, clock=FakeClock())
+        inner = ScriptedTransport(500)
+        client = self._client(inner, breaker=breaker)
+        _ = client.get("http://x/")
+        with self.assertRaises(CircuitOpenError):
+            _ = client.get("http://x/")
+        self.assertEqual(inner.calls, 3)
+
+    def test_throttling_does_not_open_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=1, clock=FakeClock())
+        inner = ScriptedTransport(429, 429, 200)
+        response = self._client(inner, breaker=breaker).get("http://x/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+
+    def test_deadline_caps_timeouts(self):
+        seen = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.extensions["timeout"])
+            return httpx.Response(200)
+
+        client = self._client(httpx.MockTransport(handler))
+        _ = client.get("http://x/", extensions={DEADLINE: time.monotonic() + 1.0})
+        timeouts = seen[0]
+        self.assertTrue(all(0 < value <= 1.0 for value in timeouts.values()))
+
+    def test_no_retries_past_deadline(self):
+        inner = ScriptedTransport(503, 200)
+        client = self._client(inner)
+        response = client.get(
+            "http://x/", extensions={DEADLINE: time.monotonic() + 0.1}
+        )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(inner.calls, 1)
+        self.assertEqual(self.sleeps, [])
+
+    def test_pool_timeout_frees_trial(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=1, clock=clock)
+        breaker.record_failure()
+        clock.now = 2
+        client = self._client(ScriptedTransport(httpx.PoolTimeout), breaker=breaker)
+        with self.assertRaises(httpx.PoolTimeout):
+            _ = client.get("http://x/")
+        # The trial was given up on, so another may be made.
+        self.assertTrue(breaker.allow())
+
+    def test_deadline_timeout_frees_trial(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=1, clock=clock)
+        breaker.record_failure()
+        clock.now = 2
+
+        def timeout(request: httpx.Request) -> httpx.Response:
+            time.sleep(0.02)
+            raise httpx.ReadTimeout("Out of time.", request=request)
+
+        client = self._client(httpx.MockTransport(timeout), breaker=breaker)
+        with self.assertRaises(httpx.ReadTimeout):
+            _ = client.get("http://x/", extensions={DEADLINE: time.monotonic() + 0.01})
+        # The caller ran out of time; the portal isn't to blame.
+        self.assertEqual(breaker.state, CircuitState.HALF_OPEN)
+        self.assertTrue(breaker.allow())
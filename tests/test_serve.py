@@ -0,0 +1,176 @@
+import asyncio
+import datetime
+import json
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+import httpx
+
+from voter_tools.bulk import CheckOutcome, CheckRequest
+from voter_tools.emulate import (
+    Emulator,
+    EmulatorConfig,
+    EmulatorTransport,
+    EndpointConfig,
+    LatencyConfig,
+)
+from voter_tools.metrics import Metrics
+from voter_tools.serve import (
+    CheckService,
+    RateLimiter,
+    ResultCache,
+    ServiceApp,
+)
+
+ALICE = {
+    "first_name": "Alice",
+    "last_name": "Smith",
+    "zipcode": "53703",
+    "birth_date": "1980-01-02",
+}
+
+
+class Clock:
+    now: float = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ResultCacheTestCase(TestCase):
+    def test_expiry_and_eviction(self):
+        clock = Clock()
+        cache = ResultCache(max_size=2, ttl=10, clock=clock)
+        outcome = CheckOutcome(request=None, skipped="test")
+        for name in ("a", "b", "c"):
+            request = CheckRequest.normalized(
+                name, "Smith", "53703", datetime.date(1980, 1, 2)
+            )
+            cache.put((request.key, False), outcome)
+        self.assertEqual(len(cache), 2)
+        c = CheckRequest.normalized("c", "Smith", "53703", datetime.date(1980, 1, 2))
+        self.assertIs(cache.get((c.key, False)), outcome)
+        clock.now = 10
+        self.assertIsNone(cache.get((c.key, False)))
+
+
+class RateLimiterTestCase(TestCase):
+    def test_take(self):
+        clock = Clock()
+        limiter = RateLimiter(rate=2, burst=3, clock=clock)
+        self.assertEqual(limiter.take("a", 3), 0)
+        self.assertEqual(limiter.take("a"), 0.5)
+        self.assertEqual(limiter.take("b"), 0)
+        clock.now = 0.5
+        self.assertEqual(limiter.take("a"), 0)
+        self.assertEqual(limiter.take("a", 4), float("inf"))
+
+
+class ServiceAppTestCase(IsolatedAsyncioTestCase):
+    def setUp(self):
+        latency = LatencyConfig.parse("fixed:20")
+        endpoint = EndpointConfig(registered_rate=1.0, latency=latency)
+        self.emulator = Emulator(EmulatorConfig(default=endpoint, seed=1))
+        self.service = CheckService(
+            metrics=Metrics(),
+            _transport=EmulatorTransport(self.emulator),
+        )
+        self.service.warm()
+
+    def tearDown(self):
+        self.service.close()
+
+    def client(self, limiter: RateLimiter | None = None) -> httpx.AsyncClient:
+        app = ServiceApp(self.service, limiter)
+        return httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        )
+
+    async def test_check_cached(self):
+        async with self.client() as client:
+            first = await client.post("/check", json={**ALICE, "id": 7})
+            second = await client.post("/check", json={**ALICE, "first_name": "ALICE"})
+        self.assertEqual(first.status_code, 200)
+        body = first.json()
+        self.assertEqual((body["id"], body["state"]), (7, "WI"))
+        self.assertTrue(body["registered"])
+        self.assertFalse(body["cached"])
+        self.assertTrue(second.json()["cached"])
+        self.assertEqual(self.emulator.stats()["wi"]["ok"], 1)
+        self.assertEqual(self.service.metrics.state("WI")["cache_hits"], 1)
+
+    async def test_concurrent_checks_coalesced(self):
+        async with self.client() as client:
+            responses = await asyncio.gather(
+                *(client.post("/check", json=ALICE) for _ in range(3))
+            )
+        self.assertEqual([r.json()["registered"] for r in responses], [True] * 3)
+        self.assertEqual(self.service.coalesced, 2)
+        self.assertEqual(self.emulator.stats()["wi"]["ok"], 1)
+
+    async def test_abandoned_check_cancelled(self):
+        request = CheckRequest.normalized(
+            "Alice", "Smith", "53703", datetime.date(1980, 1, 2)
+        )
+        caller = asyncio.ensure_future(self.service.check(request))
+        await asyncio.sleep(0)
+        (task,) = self.service._in_flight.values()
+        caller.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await caller
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)  # Let its done callback run.
+        self.assertEqual(self.service._in_flight, {})
+
+    async def test_shared_check_not_cancelled(self):
+        request = CheckRequest.normalized(
+            "Alice", "Smith", "53703", datetime.date(1980, 1, 2)
+        )
+        first = asyncio.ensure_future(self.service.check(request))
+        second = asyncio.ensure_future(self.service.check(request))
+        await asyncio.sleep(0)
+        first.cancel()
+        outcome, shared = await second
+        self.assertTrue(shared)
+        assert outcome.result is not None
+        self.assertTrue(outcome.result.registered)
+
+    async def test_batch(self):
+        lines = [
+            json.dumps({**ALICE, "id": "a"}),
+            "",
+            json.dumps({**ALICE, "zipcode": "10001", "id": "ny"}),
+            "not json",
+        ]
+        async with self.client() as client:
+            response = await client.post("/check/batch", content="\n".join(lines))
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        results = {r["index"]: r for r in map(json.loads, response.text.splitlines())}
+        self.assertEqual(sorted(results), [0, 2, 3])
+        self.assertTrue(results[0]["registered"])
+        self.assertEqual(results[2]["skipped"], "unsupported state: NY")
+        self.assertIn("Invalid check", results[3]["error"])
+
+    async def test_invalid_check(self):
+        async with self.client() as client:
+            response = await client.post("/check", json={"first_name": "Alice"})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_rate_limited(self):
+        async with self.client(RateLimiter(rate=0.5, burst=2)) as client:
+            statuses = [(await client.post("/check", json=ALICE)) for _ in range(3)]
+            batch = await client.post("/check/batch", content=json.dumps(ALICE) * 3)
+        self.assertEqual([r.status_code for r in statuses], [200, 200, 429])
+        self.assertEqual(statuses[2].headers["retry-after"], "2")
+        self.assertEqual(batch.status_code, 429)
+
+    async def test_metrics_and_routes(self):
+        async with self.client() as client:
+            await client.post("/check", json=ALICE)
+            metrics = await client.get("/metrics")
+            missing = await client.get("/other")
+            wrong_method = await client.get("/check")
+        self.assertIn('voter_tools_registered_total{state="WI"} 1', metrics.text)
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(wrong_method.status_code, 405)
+        self.assertEqual(wrong_method.headers["allow"], "POST")
@@ -0,0 +1,85 @@
+import csv
+import datetime
+import io
+import pathlib
+import tempfile
+from unittest import TestCase, mock
+
+from click.testing import CliRunner
+
+from voter_tools.bulk import CheckRequest, InvalidRequest
+from voter_tools.cli import vote
+from voter_tools.shard import Shard, merge_by_row_number, shard_for
+
+BIRTH_DATE = datetime.date(1980, 1, 2)
+
+
+class ShardTestCase(TestCase):
+    def test_parse(self):
+        self.assertEqual(Shard.parse("2/3"), Shard(index=1, total=3))
+        self.assertEqual(str(Shard.parse("2/3")), "2/3")
+        for text in ("0/3", "4/3", "3", "a/b", "1/2/3"):
+            with self.assertRaises(ValueError):
+                Shard.parse(text)
+
+    def test_each_voter_in_one_shard(self):
+        shards = [Shard(index=i, total=4) for i in range(4)]
+        for i in range(200):
+            request = CheckRequest.normalized(f"Voter{i}", "Smith", "53703", BIRTH_DATE)
+            self.assertEqual(sum(s.contains(i, request) for s in shards), 1)
+
+    def test_stable_across_spelling(self):
+        a = CheckRequest.normalized("Alice", "Smith", "53703", BIRTH_DATE)
+        b = CheckRequest.normalized(" ALICE ", "smith", "53703-1234", BIRTH_DATE)
+        self.assertEqual(shard_for(a.key, 7), shard_for(b.key, 7))
+        # The hash doesn't depend on the process (no PYTHONHASHSEED).
+        self.assertEqual(shard_for(a.key, 1_000_003), shard_for(a.key, 1_000_003))
+
+    def test_invalid_rows_by_row_number(self):
+        invalid = InvalidRequest(reason="missing name")
+        self.assertTrue(Shard(index=1, total=2).contains(3, invalid))
+        self.assertFalse(Shard(index=0, total=2).contains(3, invalid))
+
+
+class MergeTestCase(TestCase):
+    def test_merge_by_row_number(self):
+        shards = [
+            [{"n": "5"}, {"n": "1"}, {"n": "3"}],
+            [{"n": "4"}, {"n": "2"}, {"n": "6"}],
+        ]
+        merged = list(merge_by_row_number(shards, "n", run_size=2))
+        self.assertEqual([number for number, _ in merged], [1, 2, 3, 4, 5, 6])
+        self.assertEqual(merged[0][1], {"n": "1"})
+
+    def test_abandoned_merge_closes_runs(self):
+        spills = []
+        open_temporary_file = tempfile.TemporaryFile
+
+        def temporary_file(*args, **kwargs):
+            spill = open_temporary_file(*args, **kwargs)
+            spills.append(spill)
+            return spill
+
+        shards = [[{"n": str(n)} for n in range(10, 0, -1)]]
+        with mock.patch("voter_tools.shard.tempfile.TemporaryFile", temporary_file):
+            merged = merge_by_row_number(shards, "n", run_size=3)
+            self.assertEqual(next(merged)[0], 1)
+            merged.close()
+        self.assertEqual(len(spills), 4)
+        self.assertTrue(all(spill.closed for spill in spills))
+
+    def test_merge_shards_command(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i, rows in enumerate([[("3", "c"), ("1", "a")], [("2", "b")]]):
+                path = pathlib.Path(tmp) / f"shard{i}.csv"
+                with path.open("w", newline="") as f:
+                    writer = csv.writer(f)
+                    writer.writerow(["Row Number", "Name"])
+                    writer.writerows(rows)
+                paths.append(str(path))
+            result = CliRunner().invoke(vote, ["merge-shards", *paths])
+        self.assertEqual(result.exit_code, 0, result.output)
+        rows = list(csv.reader(io.StringIO(result.stdout)))
+        self.assertEqual(rows, [["Name"], ["a"], ["b"], ["c"]])
+        self.assertIn("Merged 3 rows from 2 shards", result.stderr)
@@ -0,0 +1,224 @@
+import datetime
+import io
+import pathlib
+import tempfile
+from unittest import TestCase
+
+from voter_tools.bulk import BulkChecker, CheckOutcome, CheckRequest
+from voter_tools.emulate import (
+    Emulator,
+    EmulatorConfig,
+    EmulatorTransport,
+    EndpointConfig,
+    LatencyConfig,
+)
+from voter_tools.metrics import Metrics
+from voter_tools.store import ResultStore, StoredResult, encode_key, utc_now
+from voter_tools.tool import CheckRegistrationDetails, CheckRegistrationResult
+from voter_tools.writers import ChangesWriter, ResultColumns
+
+BIRTH_DATE = datetime.date(1980, 1, 2)
+
+DETAILS = CheckRegistrationDetails(
+    state_id="123", registration_date=datetime.date(2020, 3, 4), status="active"
+)
+
+
+def _request(first_name: str, zipcode: str = "53703") -> CheckRequest:
+    return CheckRequest.normalized(first_name, "Smith", zipcode, BIRTH_DATE)
+
+
+class StoreTestCase(TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = str(pathlib.Path(self._dir.name) / "results.db")
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+
+class ResultStoreTestCase(StoreTestCase):
+    def test_round_trip(self):
+        checked_at = datetime.datetime(2024, 5, 6, 7, 8, tzinfo=datetime.UTC)
+        result = CheckRegistrationResult(registered=True, details=DETAILS)
+        with ResultStore(self.path) as store:
+            store.put(_request("Alice").key, "WI", result, checked_at)
+        with ResultStore(self.path) as store:
+            stored = store.get(_request("ALICE ").key)
+            self.assertIsNone(store.get(_request("Bob").key))
+        self.assertEqual(
+            stored, StoredResult(state="WI", result=result, checked_at=checked_at)
+        )
+
+    def test_latest_result_wins(self):
+        with ResultStore(self.path) as store:
+            key = _request("Alice").key
+            store.put(key, "WI", CheckRegistrationResult(registered=False))
+            store.put(key, "WI", CheckRegistrationResult(registered=True))
+            self.assertEqual(len(store), 1)
+            stored = store.get(key)
+            assert stored is not None
+            self.assertTrue(stored.result.registered)
+
+    def test_get_many(self):
+        with ResultStore(self.path) as store:
+            for i in range(700):
+                store.put(
+                    _request(f"Voter{i}").key,
+                    "WI",
+                    CheckRegistrationResult(registered=True),
+                )
+            keys = [_request(f"Voter{i}").key for i in range(0, 1400, 2)]
+            self.assertEqual(len(store.get_many(keys)), 350)
+
+    def test_get_many_results(self):
+        checked_at = datetime.datetime(2024, 5, 6, 7, 8, 9, tzinfo=datetime.UTC)
+        alice, bob, carol = (_request(name).key for name in ("Alice", "Bob", "Carol"))
+        with ResultStore(self.path) as store:
+            store.put(
+                alice,
+                "WI",
+                CheckRegistrationResult(registered=True, details=DETAILS),
+                checked_at,
+            )
+            store.put(bob, "MI", CheckRegistrationResult(registered=False), checked_at)
+            found = store.get_many([alice, bob, carol])
+        self.assertEqual(set(found), {alice, bob})
+        self.assertNotIn(carol, found)
+        self.assertEqual(
+            found[alice],
+            StoredResult(
+                state="WI",
+                result=CheckRegistrationResult(registered=True, details=DETAILS),
+                checked_at=checked_at,
+            ),
+        )
+        self.assertEqual(found[bob].state, "MI")
+        self.assertFalse(found[bob].result.registered)
+
+
+def _checker(
+    store: ResultStore, latency: LatencyConfig | None = None, **kwargs
+) -> tuple[BulkChecker, Emulator]:
+    endpoint = EndpointConfig(registered_rate=1.0, latency=latency or LatencyConfig())
+    emulator = Emulator(EmulatorConfig(default=endpoint, seed=1))
+    checker = BulkChecker(
+        store=store,
+        metrics=Metrics(),
+        _transport=EmulatorTransport(emulator, realtime=latency is not None),
+        **kwargs,
+    )
+    return checker, emulator
+
+
+class IncrementalCheckTestCase(StoreTestCase):
+    def test_results_saved(self):
+        with ResultStore(self.path) as store:
+            checker, _ = _checker(store)
+            outcomes = dict(checker.check_all(enumerate([_request("Alice")])))
+            self.assertIsNone(outcomes[0].previous)
+            self.assertEqual(len(store), 1)
+
+    def test_recent_results_reused(self):
+        old = utc_now() - datetime.timedelta(days=30)
+        with ResultStore(self.path) as store:
+            registered = CheckRegistrationResult(registered=True)
+            store.put(_request("Fresh").key, "WI", registered)
+            store.put(_request("Stale").key, "WI", registered, checked_at=old)
+            store.put(
+                _request("Unregistered").key,
+                "WI",
+                CheckRegistrationResult(registered=False),
+            )
+            checker, emulator = _checker(store, max_age=datetime.timedelta(days=7))
+            requests = [_request(name) for name in ("Fresh", "Stale", "Unregistered")]
+            outcomes = dict(checker.check_all(enumerate(requests)))
+        self.assertTrue(outcomes[0].reused)
+        self.assertFalse(outcomes[1].reused)
+        self.assertFalse(outcomes[2].reused)
+        self.assertEqual(checker.reused, 1)
+        self.assertEqual(emulator.stats()["wi"]["ok"], 2)
+        self.assertEqual(checker.metrics.state("WI")["cache_hits"], 1)
+        # The unregistered voter is registered now.
+        self.assertTrue(outcomes[2].changed)
+        self.assertFalse(outcomes[1].changed)
+
+    def test_reuse_not_registered(self):
+        with ResultStore(self.path) as store:
+            store.put(
+                _request("Alice").key, "WI", CheckRegistrationResult(registered=False)
+            )
+            checker, _ = _checker(
+                store,
+                max_age=datetime.timedelta(days=7),
+                recheck_not_registered=False,
+            )
+            outcomes = dict(checker.check_all(enumerate([_request("Alice")])))
+        self.assertTrue(outcomes[0].reused)
+
+    def test_not_registered_checked_first(self):
+        old = utc_now() - datetime.timedelta(days=30)
+        with ResultStore(self.path) as store:
+            for i in range(20):
+                store.put(
+                    _request(f"Stale{i}").key,
+                    "WI",
+                    CheckRegistrationResult(registered=True),
+                    checked_at=old,
+                )
+            store.put(
+                _request("Unregistered").key,
+                "WI",
+                CheckRegistrationResult(registered=False),
+            )
+            checker, _ = _checker(
+                store,
+                max_age=datetime.timedelta(days=7),
+                max_workers=1,
+                latency=LatencyConfig.parse("fixed:10"),
+            )
+            requests = [_request(f"Stale{i}") for i in range(20)]
+            requests.append(_request("Unregistered"))
+            keys = [key for key, _ in checker.check_all(enumerate(requests))]
+            # Outcomes come back in input order, but the store saw the checks
+            # in the order they were made.
+            self.assertEqual(keys, list(range(21)))
+            store.flush()
+            rows = store._connection.execute(
+                "SELECT key FROM results ORDER BY checked_at"
+            ).fetchall()
+        order = [key for (key,) in rows]
+        # The single worker may already have picked up the first few.
+        self.assertLess(order.index(encode_key(requests[20].key)), 5)
+
+
+class ChangesWriterTestCase(TestCase):
+    def test_only_changes_written(self):
+        checked_at = datetime.datetime(2024, 5, 6, tzinfo=datetime.UTC)
+        previous = StoredResult(
+            state="WI",
+            result=CheckRegistrationResult(registered=False),
+            checked_at=checked_at,
+        )
+        request = _request("Alice")
+        unchanged = CheckOutcome(
+            request=request,
+            state="WI",
+            result=CheckRegistrationResult(registered=False),
+            previous=previous,
+        )
+        changed = unchanged.model_copy(
+            update={"result": CheckRegistrationResult(registered=True)}
+        )
+        out = io.StringIO()
+        writer = ChangesWriter(out, ["First Name"], ResultColumns(), False)
+        row = {"First Name": "Alice"}
+        writer.write([(row, unchanged), (row, changed)])
+        self.assertEqual(
+            out.getvalue().splitlines(),
+            [
+                "First Name,State,Previously Registered,Registered,"
+                "Previous Status,Status,Previously Checked At",
+                "Alice,WI,False,True,,,2024-05-06T00:00:00+00:00",
+            ],
+        )
@@ -0,0 +1,69 @@
+import gzip
+import importlib.util
+import pathlib
+import tempfile
+from unittest import TestCase, skipUnless
+
+from voter_tools.streams import Compression, open_input, open_output
+
+HAS_ZSTANDARD = importlib.util.find_spec("zstandard") is not None
+
+CSV_TEXT = "First Name,Last Name\nAlice,Smith\nBob,Jones\n"
+
+
+class CompressionTestCase(TestCase):
+    def test_for_path(self):
+        self.assertEqual(Compression.for_path("out.csv.gz"), Compression.GZIP)
+        self.assertEqual(Compression.for_path("out.csv.ZST"), Compression.ZSTD)
+        self.assertEqual(Compression.for_path("out.csv"), Compression.NONE)
+
+    def test_for_header(self):
+        self.assertEqual(
+            Compression.for_header(gzip.compress(b"hello")), Compression.GZIP
+        )
+        self.assertEqual(Compression.for_header(b"\x28\xb5\x2f\xfd"), Compression.ZSTD)
+        self.assertEqual(Compression.for_header(b"First"), Compression.NONE)
+        self.assertEqual(Compression.for_header(b""), Compression.NONE)
+
+
+class StreamsTestCase(TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.dir = pathlib.Path(self._dir.name)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _round_trip(self, name: str, compression: Compression | None = None) -> str:
+        path = self.dir / name
+        with open_output(path, compression) as out:
+            out.write(CSV_TEXT)
+        with open_input(path) as f:
+            return f.read()
+
+    def test_plain(self):
+        self.assertEqual(self._round_trip("out.csv"), CSV_TEXT)
+        self.assertEqual((self.dir / "out.csv").read_text(), CSV_TEXT)
+
+    def test_gzip_by_suffix(self):
+        self.assertEqual(self._round_trip("out.csv.gz"), CSV_TEXT)
+        compressed = (self.dir / "out.csv.gz").read_bytes()
+        self.assertEqual(gzip.decompress(compressed).decode(), CSV_TEXT)
+
+    def test_input_detected_regardless_of_name(self):
+        self.assertEqual(self._round_trip("out.csv", Compression.GZIP), CSV_TEXT)
+
+    def test_byte_order_mark_dropped(self):
+        path = self.dir / "bom.csv"
+        path.write_bytes(b"\xef\xbb\xbf" + CSV_TEXT.encode())
+        with open_input(path) as f:
+            self.assertEqual(f.read(), CSV_TEXT)
+
+    @skipUnless(HAS_ZSTANDARD, "zstandard is not installed")
+    def test_zstd(self):
+        self.assertEqual(self._round_trip("out.csv.zst"), CSV_TEXT)
+
+    @skipUnless(not HAS_ZSTANDARD, "zstandard is installed")
+    def test_zstd_requires_zstandard(self):
+        with self.assertRaises(ValueError):
+            _ = open_output(self.dir / "out.csv.zst")
@@ -0,0 +1,87 @@
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from voter_tools.tool import (
+    CheckRegistrationDetails,
+    CheckRegistrationResult,
+    ResultBatch,
+    first_found,
+)
+
+
+class FirstFoundTestCase(TestCase):
+    def test_first_found_wins(self):
+        release = threading.Event()
+
+        def slow() -> int:
+            release.wait(5)
+            return 1
+
+        try:
+            result = first_found([slow, lambda: 0, lambda: 2], lambda n: n > 0)
+        finally:
+            release.set()
+        self.assertEqual(result, 2)
+
+    def test_nothing_found(self):
+        self.assertEqual(first_found([lambda: 0, lambda: -1], lambda n: n > 0), 0)
+
+    def test_failure_raised_when_nothing_found(self):
+        def fail() -> int:
+            raise ValueError("Boom.")
+
+        with self.assertRaises(ValueError):
+            first_found([lambda: 0, fail], lambda n: n > 0)
+        self.assertEqual(first_found([fail, lambda: 3], lambda n: n > 0), 3)
+
+    def test_given_executor(self):
+        with ThreadPoolExecutor(2, thread_name_prefix="lookups") as executor:
+            names = first_found(
+                [lambda: threading.current_thread().name] * 2,
+                lambda _: False,
+                executor,
+            )
+        self.assertTrue(names.startswith("lookups"))
+
+    def test_single_lookup_runs_inline(self):
+        thread = first_found([threading.current_thread], lambda _: False)
+        self.assertIs(thread, threading.current_thread())
+
+
+class ResultBatchTestCase(TestCase):
+    def _details(self, state_id: str, status: str) -> CheckRegistrationDetails:
+        return CheckRegistrationDetails(
+            state_id=state_id,
+            registration_date=datetime.date(2001, 2, 3),
+            status=status,
+        )
+
+    def test_round_trip(self):
+        results = [
+            CheckRegistrationResult(registered=False),
+            CheckRegistrationResult(registered=True),
+            CheckRegistrationResult(
+                registered=True, details=self._details("1", "Active")
+            ),
+            CheckRegistrationResult(
+                registered=True, details=self._details("2", "Inactive")
+            ),
+            CheckRegistrationResult(
+                registered=True, details=self._details("3", "Active")
+            ),
+        ]
+        batch = ResultBatch(results)
+        self.assertEqual(len(batch), 5)
+        self.assertEqual(list(batch), results)
+        self.assertEqual(batch[-1], results[-1])
+        self.assertEqual(batch.statuses, ["Active", "Inactive"])
+
+    def test_append(self):
+        batch = ResultBatch()
+        result = CheckRegistrationResult(
+            registered=True, details=self._details("1", "Active")
+        )
+        batch.append(result)
+        self.assertEqual(batch[0].model_dump_json(), result.model_dump_json())
@@ -0,0 +1,124 @@
+import datetime
+import importlib.util
+import io
+import json
+import pathlib
+import tempfile
+from unittest import TestCase, skipUnless
+
+from voter_tools.bulk import CheckOutcome, CheckRequest
+from voter_tools.streams import Compression
+from voter_tools.tool import CheckRegistrationDetails, CheckRegistrationResult
+from voter_tools.writers import (
+    CSVResultWriter,
+    JSONLResultWriter,
+    ParquetResultWriter,
+    ResultColumns,
+)
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+REQUEST = CheckRequest(
+    first_name="Alice",
+    last_name="Smith",
+    zipcode="53703",
+    birth_date=datetime.date(1980, 1, 2),
+)
+
+DETAILS = CheckRegistrationDetails(
+    state_id="123",
+    registration_date=datetime.date(2020, 3, 4),
+    status="active",
+)
+
+OUTCOMES = [
+    CheckOutcome(
+        request=REQUEST,
+        state="WI",
+        result=CheckRegistrationResult(registered=True, details=DETAILS),
+    ),
+    CheckOutcome(request=REQUEST, state="WI", error="Timed out."),
+    CheckOutcome(request=None, skipped="invalid date of birth"),
+]
+
+INPUT_FIELDS = ["First Name", "Zipcode"]
+
+
+def _batch():
+    return [({"First Name": "Alice", "Zipcode": "53703"}, o) for o in OUTCOMES]
+
+
+class CSVResultWriterTestCase(TestCase):
+    def test_stringified_values(self):
+        out = io.StringIO()
+        with CSVResultWriter(out, INPUT_FIELDS, ResultColumns(), details=True) as w:
+            w.write(_batch())
+        lines = out.getvalue().splitlines()
+        self.assertEqual(
+            lines,
+            [
+                "First Name,Zipcode,Registered,Registration Date,"
+                "Registration Status,State Voter ID",
+                "Alice,53703,True,2020-03-04,active,123",
+                "Alice,53703,(error),,,",
+                "Alice,53703,(invalid date of birth),,,",
+            ],
+        )
+
+    def test_without_details(self):
+        out = io.StringIO()
+        with CSVResultWriter(out, INPUT_FIELDS, ResultColumns(), details=False) as w:
+            w.write(_batch()[:1])
+        self.assertEqual(out.getvalue().splitlines()[1], "Alice,53703,True")
+
+
+class JSONLResultWriterTestCase(TestCase):
+    def test_typed_values(self):
+        out = io.StringIO()
+        with JSONLResultWriter(out, INPUT_FIELDS, ResultColumns(), details=True) as w:
+            w.write(_batch())
+            w.write([])
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(records), 3)
+        self.assertIs(records[0]["Registered"], True)
+        self.assertEqual(records[0]["Registration Date"], "2020-03-04")
+        self.assertIsNone(records[0]["Error"])
+        self.assertIsNone(records[1]["Registered"])
+        self.assertEqual(records[1]["Error"], "Timed out.")
+        self.assertEqual(records[2]["Error"], "invalid date of birth")
+
+    def test_custom_columns(self):
+        out = io.StringIO()
+        columns = ResultColumns(registered="ok", error="why")
+        with JSONLResultWriter(out, INPUT_FIELDS, columns, details=False) as w:
+            w.write(_batch()[1:2])
+        self.assertEqual(
+            json.loads(out.getvalue()),
+            {
+                "First Name": "Alice",
+                "Zipcode": "53703",
+                "ok": None,
+                "why": "Timed out.",
+            },
+        )
+
+
+@skipUnless(HAS_PYARROW, "pyarrow is not installed")
+class ParquetResultWriterTestCase(TestCase):
+    def test_row_groups(self):
+        import pyarrow.parquet as pq
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(pathlib.Path(tmp) / "out.parquet")
+            with ParquetResultWriter(
+                path, INPUT_FIELDS, ResultColumns(), True, Compression.GZIP
+            ) as w:
+                w.write(_batch())
+                w.write(_batch()[:1])
+            parquet = pq.ParquetFile(path)
+            self.assertEqual(parquet.metadata.num_row_groups, 2)
+            self.assertEqual(str(parquet.schema_arrow.field("Registered").type), "bool")
+            records = parquet.read().to_pylist()
+        self.assertEqual(len(records), 4)
+        self.assertEqual(records[0]["Registration Date"], datetime.date(2020, 3, 4))
+        self.assertIsNone(records[2]["Registered"])
@@ -0,0 +1,99 @@
+import importlib.util
+from unittest import TestCase, mock, skipUnless
+
+from voter_tools import zipcodes
+from voter_tools.zipcodes import (
+    MAX_COUNTIES,
+    get_counties,
+    get_county,
+    get_state,
+    get_states,
+    nearest_zip,
+    normalize_zipcode,
+    resolve_many,
+    resolve_with_fallback,
+)
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+ZIPCODES = ["30301", "30301-1234", " 2134 ", "021340000", 2134, 303011234, "x", ""]
+STATES = ["GA", "GA", "MA", "MA", "MA", "GA", None, None]
+
+
+class GetCountiesTestCase(TestCase):
+    def test_listed_county_first(self):
+        for zipcode in ("30301", "19127", "53703"):
+            counties = get_counties(zipcode)
+            self.assertEqual(counties[0], get_county(zipcode))
+            self.assertLessEqual(len(counties), MAX_COUNTIES)
+            self.assertEqual(len(set(counties)), len(counties))
+
+    def test_nearby_counties(self):
+        self.assertEqual(get_counties("30301"), ("Fulton", "Cobb"))
+        self.assertEqual(get_counties("19127"), ("Philadelphia", "Montgomery"))
+
+    def test_unknown_zipcode(self):
+        self.assertEqual(get_counties("00000"), ())
+        self.assertEqual(get_counties("30300")[0], "Fulton")
+
+
+class NormalizeZipcodeTestCase(TestCase):
+    def test_normalize(self):
+        self.assertEqual(normalize_zipcode("30301"), "30301")
+        self.assertEqual(normalize_zipcode(" 30301-1234"), "30301")
+        self.assertEqual(normalize_zipcode("303011234"), "30301")
+        self.assertEqual(normalize_zipcode("2134"), "02134")
+        self.assertEqual(normalize_zipcode(2134), "02134")
+        self.assertEqual(normalize_zipcode(21340000), "02134")
+
+    def test_not_zipcodes(self):
+        for value in ("", "ABCDE", "-1234", "1234567890", -1, 10**10):
+            with self.subTest(value=value):
+                self.assertIsNone(normalize_zipcode(value))
+
+
+class ResolveManyTestCase(TestCase):
+    def test_without_numpy(self):
+        with mock.patch.object(zipcodes, "_numpy", return_value=None):
+            states, counties = resolve_many(iter(ZIPCODES))
+        self.assertEqual(states, STATES)
+        self.assertEqual(counties[:2], ["Fulton", "Fulton"])
+
+    @skipUnless(HAS_NUMPY, "numpy is not installed")
+    def test_with_numpy(self):
+        import numpy
+
+        states, counties = resolve_many(ZIPCODES)
+        self.assertEqual(list(states), STATES)
+        states, counties = resolve_many(numpy.array([30301, 2134, 21340000, -1]))
+        self.assertEqual(list(states), ["GA", "MA", "MA", None])
+        self.assertEqual(list(counties), ["Fulton", "Suffolk", "Suffolk", None])
+        states, _ = resolve_many(numpy.array(["19127-0001", "19127", "nope"]))
+        self.assertEqual(list(states), ["PA", "PA", None])
+
+
+class FallbackTestCase(TestCase):
+    def test_nearest_zip(self):
+        self.assertEqual(nearest_zip((33.75, -84.39)), "30302")
+        self.assertEqual(get_state(nearest_zip((39.95, -75.17), "NJ") or ""), "NJ")
+
+    def test_known_zipcode(self):
+        self.assertEqual(resolve_with_fallback("30301"), ("GA", ("Fulton", "Cobb")))
+        self.assertEqual(resolve_with_fallback("30301-1234")[0], "GA")
+
+    def test_unknown_zipcode(self):
+        # Neither is in the bundled data; both are between known zip codes.
+        self.assertEqual(resolve_with_fallback("30300")[0], "GA")
+        state, counties = resolve_with_fallback("19156")
+        self.assertEqual((state, counties[0]), ("PA", "Philadelphia"))
+
+    def test_nothing_to_go_on(self):
+        self.assertEqual(resolve_with_fallback("00000"), (None, ()))
+        self.assertEqual(resolve_with_fallback("nope"), (None, ()))
+
+    def test_get_state(self):
+        self.assertIsNone(get_state("30300"))
+        self.assertEqual(get_state("30300", fallback=True), "GA")
+        self.assertEqual(
+            get_states(["30300", "30301", "00000"], fallback=True), ["GA", "GA", None]
+        )
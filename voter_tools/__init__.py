@@ -1,5 +1,7 @@
 """Tools for working with voter registration data."""
 
+import typing as t
+
 from .ga import GeorgiaCheckRegistrationTool
 from .mi import MichiganCheckRegistrationTool
 from .pa.check import PennsylvaniaCheckRegistrationTool
@@ -17,19 +19,23 @@ _CHECK_TOOLS: dict[str, type[CheckRegistrationTool]] = {
 
 
 def get_check_tool(
-    *, zipcode: str | None = None, state: str | None = None
+    *, zipcode: str | None = None, state: str | None = None, **tool_kwargs: t.Any
 ) -> CheckRegistrationTool | None:
-    """Return a voter registration tool for the given ZIP code or state."""
+    """
+    Return a voter registration tool for the given ZIP code or state.
+
+    Any extra keyword arguments are passed along to the tool's constructor.
+    """
     if state is None:
         if zipcode is None:
             raise ValueError("Must provide either a ZIP code or state")
-        state = get_state(zipcode)
+        state = get_state(zipcode, fallback=True)
 
     if state is None:
         return None
 
     tool_class = _CHECK_TOOLS.get(state)
-    return tool_class() if tool_class else None
+    return tool_class(**tool_kwargs) if tool_class else None
 
 
 # TODO FUTURE: consider whether there's *any* kind of common interface
@@ -0,0 +1,92 @@
+"""
+An asyncio interface to the voter registration check tools.
+
+The check tools are synchronous. `AsyncCheckRegistrationTool` runs a tool's
+checks on a dedicated thread pool, so that many checks can be awaited at once
+without blocking the event loop. The tool's adaptive concurrency limiter
+decides how many of those checks actually reach the state's portal at a time;
+the rest wait their turn in the pool.
+"""
+
+import asyncio
+import datetime
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+
+from . import get_check_tool
+from .tool import CheckRegistrationResult, CheckRegistrationTool, SupportedFeatures
+
+
+class AsyncCheckRegistrationTool:
+    """Run a `CheckRegistrationTool`'s checks without blocking the event loop."""
+
+    tool: CheckRegistrationTool
+    _executor: ThreadPoolExecutor
+
+    def __init__(self, tool: CheckRegistrationTool, *, max_workers: int = 32):
+        """
+        Wrap a synchronous check tool.
+
+        `max_workers` bounds the number of checks that may be running or
+        waiting on the state's concurrency limiter at once.
+        """
+        self.tool = tool
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"check-{tool.state}"
+        )
+
+    @property
+    def state(self) -> str:
+        """The two-letter state abbreviation for this tool."""
+        return self.tool.state
+
+    @property
+    def features(self) -> SupportedFeatures:
+        """Features supported by this tool."""
+        return self.tool.features
+
+    async def check_registration(
+        self,
+        first_name: str,
+        last_name: str,
+        zipcode: str,
+        birth_date: datetime.date,
+        details: bool = False,
+    ) -> CheckRegistrationResult:
+        """
+        Check whether a voter is registered to vote.
+
+        Raises a CheckRegistrationError if there is an unexpected failure.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            self.tool.check_registration,
+            first_name,
+            last_name,
+            zipcode,
+            birth_date,
+            details,
+        )
+
+    def close(self) -> None:
+        """Stop the tool's worker threads once pending checks finish."""
+        self._executor.shutdown(wait=False)
+
+
+def get_async_check_tool(
+    *,
+    zipcode: str | None = None,
+    state: str | None = None,
+    max_workers: int = 32,
+    **tool_kwargs: t.Any,
+) -> AsyncCheckRegistrationTool | None:
+    """
+    Return an async voter registration tool for the given ZIP code or state.
+
+    Any extra keyword arguments are passed along to the tool's constructor.
+    """
+    tool = get_check_tool(zipcode=zipcode, state=state, **tool_kwargs)
+    if tool is None:
+        return None
+    return AsyncCheckRegistrationTool(tool, max_workers=max_workers)
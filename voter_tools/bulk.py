@@ -0,0 +1,622 @@
+"""Check the registration status of many voters at once."""
+
+import datetime
+import heapq
+import itertools
+import math
+import queue
+import threading
+import time
+import typing as t
+from collections import OrderedDict
+
+import pydantic as p
+
+from . import get_check_tool
+from .concurrency import Priority
+from .errors import CheckRegistrationError
+from .metrics import Metrics, get_metrics
+from .store import ResultStore, StoredResult, utc_now
+from .tool import CheckRegistrationResult, CheckRegistrationTool
+from .zipcodes import get_state, get_states, normalize_zipcode
+
+# -----------------------------------------------------------------------------
+# Requests and outcomes
+# -----------------------------------------------------------------------------
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a name for comparison: collapse whitespace and fold case."""
+    return " ".join(name.split()).casefold()
+
+
+def _zipcode(zipcode: str) -> str:
+    """Return the five-digit ZIP code, or the value as given if it isn't one."""
+    return normalize_zipcode(zipcode) or zipcode.strip()
+
+
+CheckKey = tuple[str, str, str, datetime.date]
+"""Identifies a check: two requests with the same key get the same answer."""
+
+
+class CheckRequest(p.BaseModel, frozen=True):
+    """The information needed to check a single voter's registration."""
+
+    first_name: str
+    last_name: str
+    zipcode: str
+    birth_date: datetime.date
+
+    @classmethod
+    def normalized(
+        cls, first_name: str, last_name: str, zipcode: str, birth_date: datetime.date
+    ) -> "CheckRequest":
+        """Create a request with tidied-up names and a five-digit ZIP code."""
+        return cls(
+            first_name=" ".join(first_name.split()),
+            last_name=" ".join(last_name.split()),
+            zipcode=_zipcode(zipcode),
+            birth_date=birth_date,
+        )
+
+    @property
+    def key(self) -> CheckKey:
+        """Return the identity of this check, ignoring case and spacing."""
+        return (
+            normalize_name(self.first_name),
+            normalize_name(self.last_name),
+            _zipcode(self.zipcode),
+            self.birth_date,
+        )
+
+
+class InvalidRequest(p.BaseModel, frozen=True):
+    """Stands in for a request that couldn't be read from its source."""
+
+    reason: str
+    """Why the request is invalid."""
+
+
+class CheckOutcome(p.BaseModel, frozen=True):
+    """
+    The outcome of checking a single voter's registration.
+
+    Exactly one of `result`, `error`, and `skipped` is set.
+    """
+
+    request: CheckRequest | None
+    """The request that was checked; None if the request was invalid."""
+
+    state: str | None = None
+    """The state the voter's ZIP code is in, if known."""
+
+    result: CheckRegistrationResult | None = None
+    """The result of the check, if it was made and succeeded."""
+
+    error: str | None = None
+    """A description of what went wrong, if the check failed."""
+
+    skipped: str | None = None
+    """Why no check was attempted (invalid request, unsupported state, ...)."""
+
+    previous: StoredResult | None = None
+    """The voter's result from an earlier run, if there's a result store."""
+
+    reused: bool = False
+    """True if `result` is `previous.result`, reused rather than re-checked."""
+
+    @property
+    def changed(self) -> bool:
+        """Return True if the result differs from the earlier run's."""
+        if self.reused or self.previous is None or self.result is None:
+            return False
+        before, after = self.previous.result, self.result
+        if before.registered != after.registered:
+            return True
+        # Only compare statuses when both runs asked for them.
+        if before.details is None or after.details is None:
+            return False
+        return before.details.status != after.details.status
+
+
+def record_outcome(
+    metrics: Metrics, outcome: CheckOutcome, cache_hit: bool = False
+) -> None:
+    """Count an outcome in its state's metrics."""
+    state_metrics = metrics.state(outcome.state)
+    if cache_hit:
+        state_metrics.increment("cache_hits")
+    if outcome.result is not None:
+        registered = outcome.result.registered
+        state_metrics.increment("registered" if registered else "not_registered")
+    elif outcome.error is not None:
+        state_metrics.increment("errors")
+    else:
+        state_metrics.increment("skipped")
+
+
+# -----------------------------------------------------------------------------
+# Bulk checker
+# -----------------------------------------------------------------------------
+
+T = t.TypeVar("T")
+
+_DONE = object()
+
+
+class _Shared(t.Generic[T]):
+    """Rows waiting on the same (deduplicated) check."""
+
+    outcome: CheckOutcome | None
+    waiters: list[tuple[int, T, CheckRequest]]
+
+    def __init__(self):
+        self.outcome = None
+        self.waiters = []
+
+
+class BulkChecker:
+    """
+    Check many voters concurrently.
+
+    Checking runs in two stages. A planning pass reads requests in chunks,
+    resolves each chunk's states from the ZIP code index in one go, and
+    answers invalid requests and unsupported states straight away. Every
+    other request goes into its state's queue, which is drained by that
+    state's own pool of worker threads. A slow or failing portal thus never
+    holds up checks for other states.
+
+    A single tool is built for each state and shared by the state's workers,
+    so connections are pooled. Worker threads are only a ceiling: the number
+    of requests actually in flight to each state's portal is governed by
+    that state's adaptive concurrency limiter (see `voter_tools.concurrency`).
+
+    Outcomes are yielded in input order. Memory use is bounded however long
+    the input is: every queue between the stages has a maximum size, and
+    planning stays at most `OUTPUT_WINDOW` rows ahead of the earliest row
+    not yet yielded, so a slow consumer (or a slow state) pushes back on
+    planning, which in turn stops reading input. Only the most recent
+    `DEDUPE_WINDOW` completed checks are remembered for deduplication.
+    """
+
+    details: bool
+    max_workers: int
+    dedupe: bool
+    metrics: Metrics
+    store: ResultStore | None
+    max_age: datetime.timedelta | None
+    recheck_not_registered: bool
+    priority: Priority
+
+    requested: int
+    """How many checks `check_all` has been asked to make."""
+
+    duplicates: int
+    """How many of those were duplicates, answered without a network call."""
+
+    skipped: int
+    """How many of those were answered without a check (invalid, unsupported)."""
+
+    reused: int
+    """How many of those were answered from the result store."""
+
+    PLAN_CHUNK_SIZE: t.ClassVar[int] = 1_000
+
+    QUEUE_SIZE_PER_WORKER: t.ClassVar[int] = 4
+    """Each state's queue holds at most this many requests per worker."""
+
+    RESULTS_QUEUE_SIZE: t.ClassVar[int] = 10_000
+    """At most this many outcomes wait for the consumer."""
+
+    OUTPUT_WINDOW: t.ClassVar[int] = 20_000
+    """
+    At most this many rows are planned past the earliest one not yet yielded.
+
+    Outcomes that finish ahead of that row wait (at most this many of them)
+    to be yielded in input order.
+    """
+
+    REORDER_WINDOW: t.ClassVar[int] = 10_000
+    """
+    With a result store, each state's queue holds up to this many requests,
+    so that higher-priority checks can jump ahead of that many others.
+    """
+
+    DEDUPE_WINDOW: t.ClassVar[int] = 100_000
+    """How many completed checks are remembered for deduplication."""
+
+    _tool_kwargs: dict[str, t.Any]
+    _tools: dict[str, CheckRegistrationTool | None]
+    _tools_lock: threading.Lock
+
+    def __init__(
+        self,
+        *,
+        details: bool = False,
+        max_workers: int = 16,
+        dedupe: bool = True,
+        metrics: Metrics | None = None,
+        store: ResultStore | None = None,
+        max_age: datetime.timedelta | None = None,
+        recheck_not_registered: bool = True,
+        priority: Priority = Priority.BULK,
+        **tool_kwargs: t.Any,
+    ):
+        """
+        Create a new bulk checker.
+
+        `max_workers` is the number of worker threads for *each* state.
+
+        If `dedupe` is True, requests with the same `CheckRequest.key` are
+        only checked once, and share the outcome.
+
+        Outcomes, dedupe cache hits, and check latencies are recorded in
+        `metrics` (by default, the process-wide `get_metrics()`), as are the
+        tools' requests and retries.
+
+        If a result `store` is given, every successful check is saved in it,
+        and each outcome carries the voter's `previous` result. Results
+        checked within `max_age` are reused rather than checked again,
+        except for voters who weren't registered (if `recheck_not_registered`
+        is set). Voters who weren't registered, or have no previous result,
+        are checked before registered voters whose results are stale (within
+        a window of `REORDER_WINDOW` queued requests per state).
+
+        The checker's requests wait in the `priority` lane of each state's
+        concurrency limiter, so by default interactive checks made in the
+        same process go ahead of them.
+
+        Any extra keyword arguments are passed along to each tool's constructor.
+        """
+        self.details = details
+        self.max_workers = max_workers
+        self.dedupe = dedupe
+        self.metrics = metrics or get_metrics()
+        self.store = store
+        self.max_age = max_age
+        self.recheck_not_registered = recheck_not_registered
+        self.priority = priority
+        self.requested = 0
+        self.duplicates = 0
+        self.skipped = 0
+        self.reused = 0
+        self._tool_kwargs = tool_kwargs
+        self._tools = {}
+        self._tools_lock = threading.Lock()
+
+    def tool_for(self, state: str) -> CheckRegistrationTool | None:
+        """Return the (shared) tool for a state, or None if it's unsupported."""
+        with self._tools_lock:
+            if state not in self._tools:
+                self._tools[state] = get_check_tool(
+                    state=state,
+                    metrics=self.metrics.state(state),
+                    priority=self.priority,
+                    **self._tool_kwargs,
+                )
+            return self._tools[state]
+
+    def _skip_reason(self, state: str | None) -> str | None:
+        """Return why a request for the given state can't be checked, if so."""
+        if state is None:
+            return "unknown ZIP code"
+        if self.tool_for(state) is None:
+            return f"unsupported state: {state}"
+        return None
+
+    def _can_reuse(self, previous: StoredResult, now: datetime.datetime) -> bool:
+        """Return True if a stored result may stand in for a new check."""
+        if self.max_age is None or previous.age(now) > self.max_age:
+            return False
+        result = previous.result
+        if not result.registered:
+            return not self.recheck_not_registered
+        if self.details and result.details is None:
+            tool = self.tool_for(previous.state)
+            return tool is None or not tool.features.details
+        return True
+
+    def _priority(self, previous: StoredResult | None) -> int:
+        """Return a check's priority: lower numbers are checked first."""
+        return 1 if previous is not None and previous.result.registered else 0
+
+    def record(self, outcome: CheckOutcome, cache_hit: bool = False) -> None:
+        """Count an outcome in the state's metrics."""
+        record_outcome(self.metrics, outcome, cache_hit)
+
+    def check(self, request: CheckRequest, state: str | None = None) -> CheckOutcome:
+        """
+        Check a single voter, capturing (rather than raising) failures.
+
+        The voter is always checked, even if the result store has a recent
+        result; the new result is saved there.
+        """
+        previous = self.store.get(request.key) if self.store is not None else None
+        return self._check_and_record(request, state, previous)
+
+    def _check_and_record(
+        self,
+        request: CheckRequest,
+        state: str | None,
+        previous: StoredResult | None,
+    ) -> CheckOutcome:
+        outcome = self._check(request, state)
+        if previous is not None:
+            outcome = outcome.model_copy(update={"previous": previous})
+        if self.store is not None and outcome.result is not None and outcome.state:
+            self.store.put(request.key, outcome.state, outcome.result)
+        self.record(outcome)
+        return outcome
+
+    def _check(self, request: CheckRequest, state: str | None) -> CheckOutcome:
+        state = state or get_state(request.zipcode, fallback=True)
+        skipped = self._skip_reason(state)
+        tool = self.tool_for(state) if state else None
+        if skipped or tool is None:
+            return CheckOutcome(request=request, state=state, skipped=skipped)
+        started = time.monotonic()
+        try:
+            result = tool.check_registration(
+                request.first_name,
+                request.last_name,
+                request.zipcode,
+                request.birth_date,
+                self.details,
+            )
+        except CheckRegistrationError as e:
+            return CheckOutcome(request=request, state=state, error=str(e))
+        finally:
+            self.metrics.state(state).check_latency.observe(time.monotonic() - started)
+        return CheckOutcome(request=request, state=state, result=result)
+
+    def check_all(
+        self, items: t.Iterable[tuple[T, CheckRequest | InvalidRequest]]
+    ) -> t.Iterator[tuple[T, CheckOutcome]]:
+        """
+        Check every request, yielding `(key, outcome)` pairs in input order.
+
+        Keys are passed through untouched; use them to carry along whatever
+        the request came from (a CSV row, say). Checks run concurrently and
+        finish in any order; outcomes that finish early are held back (at
+        most `OUTPUT_WINDOW` of them) until every earlier one is yielded.
+
+        Duplicate requests (if `dedupe` is set) are not sent again: they wait
+        on the first request's outcome. Duplicates more than `DEDUPE_WINDOW`
+        checks apart may be checked again.
+
+        `items` is consumed lazily, only as fast as outcomes are consumed.
+        """
+        run = _BulkRun(self, items)
+        try:
+            yield from run.results()
+        finally:
+            run.stop()
+
+
+class _BulkRun(t.Generic[T]):
+    """The machinery for a single call to `BulkChecker.check_all`."""
+
+    checker: BulkChecker
+    _items: t.Iterable[tuple[T, CheckRequest | InvalidRequest]]
+    _results: "queue.Queue[t.Any]"
+    _queues: dict[str, "queue.Queue[t.Any]"]
+    _workers: list[threading.Thread]
+    _shared: dict[CheckKey, _Shared[T]]
+    _completed: "OrderedDict[CheckKey, None]"
+    _sequence: t.Iterator[int]
+    _rows: t.Iterator[int]
+    _window: threading.Semaphore
+    _lock: threading.Lock
+    _stopping: threading.Event
+    _planner: threading.Thread
+
+    def __init__(
+        self,
+        checker: BulkChecker,
+        items: t.Iterable[tuple[T, CheckRequest | InvalidRequest]],
+    ):
+        self.checker = checker
+        self._items = items
+        self._results = queue.Queue(maxsize=checker.RESULTS_QUEUE_SIZE)
+        self._queues = {}
+        self._workers = []
+        self._shared = {}
+        self._completed = OrderedDict()
+        self._sequence = itertools.count()
+        self._rows = itertools.count()
+        self._window = threading.Semaphore(checker.OUTPUT_WINDOW)
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._planner = threading.Thread(target=self._plan, daemon=True)
+        self._planner.start()
+
+    def results(self) -> t.Iterator[tuple[T, CheckOutcome]]:
+        """Yield outcomes, in input order, until every request is answered."""
+        # Outcomes that finished ahead of `next_row`. Row numbers are unique,
+        # so the heap never compares keys or outcomes.
+        waiting: list[tuple[int, T, CheckOutcome]] = []
+        next_row = 0
+        while True:
+            item = self._results.get()
+            if item is _DONE:
+                assert not waiting, "Outcomes left over at the end of a run."
+                return
+            if isinstance(item, BaseException):
+                raise item
+            heapq.heappush(waiting, item)
+            while waiting and waiting[0][0] == next_row:
+                _, key, outcome = heapq.heappop(waiting)
+                next_row += 1
+                self._window.release()
+                yield key, outcome
+
+    def stop(self) -> None:
+        """Abandon the run: stop planning, and let workers drain quickly."""
+        self._stopping.set()
+
+    # Queues -------------------------------------------------------------------
+
+    _POLL_INTERVAL: t.ClassVar[float] = 0.1
+
+    def _put(self, q: "queue.Queue[t.Any]", item: t.Any) -> None:
+        """Put an item on a bounded queue, unless the run is abandoned."""
+        while not self._stopping.is_set():
+            try:
+                q.put(item, timeout=self._POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+    def _reserve_row(self) -> int | None:
+        """Wait for room in the output window; return the next row number."""
+        while not self._stopping.is_set():
+            if self._window.acquire(timeout=self._POLL_INTERVAL):
+                return next(self._rows)
+        return None
+
+    def _get(self, q: "queue.Queue[t.Any]") -> t.Any:
+        """Get an item from a queue, or `_DONE` if the run is abandoned."""
+        while not self._stopping.is_set():
+            try:
+                return q.get(timeout=self._POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    # Planning -----------------------------------------------------------------
+
+    def _plan(self) -> None:
+        try:
+            items = iter(self._items)
+            while not self._stopping.is_set():
+                chunk = list(itertools.islice(items, self.checker.PLAN_CHUNK_SIZE))
+                if not chunk:
+                    break
+                self._plan_chunk(chunk)
+        except BaseException as e:  # noqa: B036 -- handed to the consumer
+            self._put(self._results, e)
+        finally:
+            for state_queue in self._queues.values():
+                for _ in range(self.checker.max_workers):
+                    # Sorts after every real request.
+                    self._put(state_queue, (math.inf, next(self._sequence), _DONE))
+            for worker in self._workers:
+                worker.join()
+            self._put(self._results, _DONE)
+
+    def _plan_chunk(self, chunk: list[tuple[T, CheckRequest | InvalidRequest]]):
+        checker = self.checker
+        valid = [r for _, r in chunk if isinstance(r, CheckRequest)]
+        states = iter(get_states([r.zipcode for r in valid], fallback=True))
+        stored = (
+            checker.store.get_many(r.key for r in valid)
+            if checker.store is not None
+            else {}
+        )
+        now = utc_now()
+        for key, request in chunk:
+            row = self._reserve_row()
+            if row is None:
+                return
+            checker.requested += 1
+            if isinstance(request, InvalidRequest):
+                checker.skipped += 1
+                outcome = CheckOutcome(request=None, skipped=request.reason)
+                checker.record(outcome)
+                self._put(self._results, (row, key, outcome))
+                continue
+            state = next(states)
+            skipped = checker._skip_reason(state)
+            if skipped is not None:
+                checker.skipped += 1
+                outcome = CheckOutcome(request=request, state=state, skipped=skipped)
+                checker.record(outcome)
+                self._put(self._results, (row, key, outcome))
+                continue
+            assert state is not None
+            previous = stored.get(request.key)
+            if previous is not None and checker._can_reuse(previous, now):
+                checker.reused += 1
+                outcome = CheckOutcome(
+                    request=request,
+                    state=state,
+                    result=previous.result,
+                    previous=previous,
+                    reused=True,
+                )
+                checker.record(outcome, cache_hit=True)
+                self._put(self._results, (row, key, outcome))
+                continue
+            if checker.dedupe and self._share(row, key, request):
+                checker.duplicates += 1
+                continue
+            priority = checker._priority(previous)
+            item = (priority, next(self._sequence), (row, key, request, previous))
+            self._put(self._queue_for(state), item)
+
+    def _share(self, row: int, key: T, request: CheckRequest) -> bool:
+        """Wait on an earlier, identical check if there is one."""
+        with self._lock:
+            shared = self._shared.get(request.key)
+            if shared is None:
+                self._shared[request.key] = _Shared()
+                return False
+            if shared.outcome is None:
+                shared.waiters.append((row, key, request))
+                return True
+            outcome = shared.outcome
+        outcome = outcome.model_copy(update={"request": request})
+        self.checker.record(outcome, cache_hit=True)
+        self._put(self._results, (row, key, outcome))
+        return True
+
+    def _queue_for(self, state: str) -> "queue.Queue[t.Any]":
+        state_queue = self._queues.get(state)
+        if state_queue is None:
+            checker = self.checker
+            maxsize = checker.max_workers * checker.QUEUE_SIZE_PER_WORKER
+            if checker.store is not None:
+                maxsize = max(maxsize, checker.REORDER_WINDOW)
+            state_queue = self._queues[state] = queue.PriorityQueue(maxsize=maxsize)
+            for i in range(self.checker.max_workers):
+                worker = threading.Thread(
+                    target=self._work,
+                    args=(state, state_queue),
+                    name=f"check-{state}-{i}",
+                    daemon=True,
+                )
+                worker.start()
+                self._workers.append(worker)
+        return state_queue
+
+    # Checking -----------------------------------------------------------------
+
+    def _work(self, state: str, state_queue: "queue.Queue[t.Any]") -> None:
+        try:
+            while (item := self._get(state_queue)) is not _DONE:
+                _, _, payload = item
+                if payload is _DONE:
+                    return
+                row, key, request, previous = payload
+                outcome = self.checker._check_and_record(request, state, previous)
+                self._put(self._results, (row, key, outcome))
+                if self.checker.dedupe:
+                    self._finish_shared(request, outcome)
+        except BaseException as e:  # noqa: B036 -- handed to the consumer
+            self._put(self._results, e)
+
+    def _finish_shared(self, request: CheckRequest, outcome: CheckOutcome) -> None:
+        with self._lock:
+            shared = self._shared[request.key]
+            shared.outcome = outcome
+            waiters, shared.waiters = shared.waiters, []
+            # Forget the oldest completed checks; pending ones are never
+            # forgotten, as rows are waiting on them.
+            self._completed[request.key] = None
+            while len(self._completed) > self.checker.DEDUPE_WINDOW:
+                forgotten, _ = self._completed.popitem(last=False)
+                del self._shared[forgotten]
+        for row, key, waiter in waiters:
+            copy = outcome.model_copy(update={"request": waiter})
+            self.checker.record(copy, cache_hit=True)
+            self._put(self._results, (row, key, copy))
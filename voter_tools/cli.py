@@ -1,7 +1,9 @@
 #!/usr/bin/env python
 
+import contextlib
 import csv
 import datetime
+import json
 import os
 import pathlib
 import sys
@@ -11,7 +13,23 @@ from xml.etree import ElementTree as ET
 import click
 
 from . import PennsylvaniaAPIClient, get_check_tool
+from .bulk import BulkChecker, CheckRequest, InvalidRequest
+from .hedge import HedgePolicy
+from .metrics import Metrics, ProgressReporter, serve_metrics
 from .pa.debug import CurlDebugTransport
+from .shard import Shard, merge_by_row_number
+from .store import ResultStore
+from .streams import Compression, open_input, open_output, read_fraction
+from .writers import (
+    ChangesWriter,
+    CSVResultWriter,
+    JSONLResultWriter,
+    OutputFormat,
+    ParquetResultWriter,
+    ResultColumns,
+    ResultWriter,
+)
+from .zipcodes import normalize_zipcode
 
 
 @click.group()
@@ -21,6 +39,27 @@ def vote():
     pass
 
 
+def _emulator_option(f: t.Callable) -> t.Callable:
+    """Add an --emulator option that sends all requests to a local emulator."""
+    return click.option(
+        "--emulator",
+        "emulator_url",
+        type=str,
+        default=None,
+        envvar="VOTER_TOOLS_EMULATOR_URL",
+        help="Send requests to a local emulator (python -m voter_tools.emulate).",
+    )(f)
+
+
+def _tool_kwargs(emulator_url: str | None) -> dict[str, t.Any]:
+    """Return extra keyword arguments for building check tools."""
+    if emulator_url is None:
+        return {}
+    from .emulate import RedirectTransport
+
+    return {"_transport": RedirectTransport(emulator_url)}
+
+
 @vote.command()
 @click.argument("first_name", type=str, required=True)
 @click.argument("last_name", type=str, required=True)
@@ -29,15 +68,27 @@ def vote():
 @click.option(
     "--details", is_flag=True, default=False, help="Return detailed information."
 )
+@click.option(
+    "--hedge",
+    is_flag=True,
+    default=False,
+    help="If the state's site is slow to answer, send a second request.",
+)
+@_emulator_option
 def check(
     first_name: str,
     last_name: str,
     zipcode: str,
     birthday: datetime.date,
     details: bool = False,
+    hedge: bool = False,
+    emulator_url: str | None = None,
 ) -> None:
     """Check if a single person is registered to vote."""
-    tool = get_check_tool(zipcode=zipcode)
+    tool_kwargs = _tool_kwargs(emulator_url)
+    if hedge:
+        tool_kwargs["hedge"] = HedgePolicy()
+    tool = get_check_tool(zipcode=zipcode, **tool_kwargs)
     if tool is None:
         print(f"Error: unsupported state for zipcode {zipcode}.")
         sys.exit(1)
@@ -50,8 +101,114 @@ def check(
         print(f"{first_name} {last_name} is not registered to vote in {tool.state}.")
 
 
+def _read_check_requests(
+    reader: csv.DictReader,
+    first_name_header: str,
+    last_name_header: str,
+    dob_header: str,
+    zipcode_header: str,
+) -> t.Iterator[tuple[dict, CheckRequest | InvalidRequest]]:
+    """
+    Read a check request from each row of a CSV file.
+
+    Rows that can't be checked are read as an `InvalidRequest` with a reason;
+    a header row that lacks a required column is a hard error.
+    """
+    headers = (first_name_header, last_name_header, dob_header, zipcode_header)
+    missing = [h for h in headers if h not in (reader.fieldnames or ())]
+    if missing:
+        raise ValueError(f"Invalid CSV format: missing columns {', '.join(missing)}.")
+    for row in reader:
+        first_name, last_name, dob_str, zipcode = (row[h] or "" for h in headers)
+        if not first_name.strip() or not last_name.strip():
+            yield row, InvalidRequest(reason="missing name")
+            continue
+        if not zipcode.strip():
+            yield row, InvalidRequest(reason="missing ZIP code")
+            continue
+        if normalize_zipcode(zipcode) is None:
+            yield row, InvalidRequest(reason="invalid ZIP code")
+            continue
+        try:
+            dob = datetime.datetime.strptime(dob_str.strip(), "%Y-%m-%d").date()
+        except ValueError:
+            yield row, InvalidRequest(reason="invalid date of birth")
+            continue
+        yield row, CheckRequest.normalized(first_name, last_name, zipcode, dob)
+
+
+def _parse_shard(
+    ctx: click.Context, param: click.Parameter, value: str | None
+) -> Shard | None:
+    if value is None:
+        return None
+    try:
+        return Shard.parse(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from None
+
+
+def _select_shard(
+    items: t.Iterable[tuple[dict, CheckRequest | InvalidRequest]],
+    shard: Shard,
+    row_column: str,
+) -> t.Iterator[tuple[dict, CheckRequest | InvalidRequest]]:
+    """Keep only the rows in `shard`, numbering each (from 1) as in the input."""
+    for number, (row, request) in enumerate(items, 1):
+        if shard.contains(number, request):
+            row[row_column] = str(number)
+            yield row, request
+
+
+def _result_writer(
+    stack: contextlib.ExitStack,
+    output_format: OutputFormat,
+    output_path: str,
+    compression: Compression | None,
+    input_fields: list[str],
+    columns: ResultColumns,
+    details: bool,
+) -> ResultWriter:
+    """Open the output, closing it with `stack`, and return a writer for it."""
+    if output_format == OutputFormat.PARQUET:
+        # Parquet compresses column chunks itself; the file isn't wrapped.
+        return ParquetResultWriter(
+            output_path, input_fields, columns, details, compression
+        )
+    out = stack.enter_context(open_output(output_path, compression))
+    if output_format == OutputFormat.JSONL:
+        return JSONLResultWriter(out, input_fields, columns, details)
+    return CSVResultWriter(out, input_fields, columns, details)
+
+
+def _report_metrics(
+    stack: contextlib.ExitStack,
+    checker: BulkChecker,
+    input_stream: t.TextIO,
+    progress: bool | None,
+    metrics_port: int | None,
+) -> None:
+    """Start any live metrics reporting, stopping it with `stack`."""
+    if progress is None:
+        progress = sys.stderr.isatty()
+    if progress:
+        reporter = ProgressReporter(
+            checker.metrics,
+            fraction_read=read_fraction(input_stream),
+            rows_read=lambda: checker.requested,
+        )
+        reporter.start()
+        stack.callback(reporter.stop)
+    if metrics_port is not None:
+        server = serve_metrics(checker.metrics, metrics_port)
+        stack.callback(server.server_close)
+        stack.callback(server.shutdown)
+
+
 @vote.command()
-@click.argument("csv_path", type=click.Path(exists=True))
+@click.argument(
+    "csv_path", type=click.Path(exists=True, dir_okay=False, allow_dash=True)
+)
 @click.option(
     "--details", is_flag=True, default=False, help="Return detailed information."
 )
@@ -116,6 +273,126 @@ def check(
     default="State Voter ID",
     help="Name of the 'State Voter ID' column.",
 )
+@click.option(
+    "--error-column",
+    "error_header",
+    type=str,
+    default="Error",
+    help="Name of the 'Error' column (JSON Lines and Parquet only).",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=16,
+    show_default=True,
+    help="Maximum number of concurrent checks per state. Each state's portal "
+    "gets as many of these as it can currently handle.",
+)
+@click.option(
+    "--dedupe/--no-dedupe",
+    default=True,
+    show_default=True,
+    help="Check each distinct voter (by name, ZIP, and birth date) only once.",
+)
+@click.option(
+    "-o",
+    "--output",
+    "output_path",
+    type=click.Path(allow_dash=True, dir_okay=False, writable=True),
+    default="-",
+    show_default=True,
+    help="Where to write the output.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice([f.value for f in OutputFormat]),
+    default=OutputFormat.CSV.value,
+    show_default=True,
+    help="Output format. JSON Lines and Parquet have typed result columns.",
+)
+@click.option(
+    "--compression",
+    type=click.Choice(["auto", *(c.value for c in Compression)]),
+    default="auto",
+    show_default=True,
+    help="Compress the output. 'auto' picks gzip or zstd by the output's "
+    "suffix (.gz, .zst). Compressed input is always detected.",
+)
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Write output rows in batches of this many; each Parquet batch is a "
+    "row group. [default: 1000, or 50000 for Parquet]",
+)
+@click.option(
+    "--progress/--no-progress",
+    default=None,
+    help="Show rows/s, errors, and an ETA on stderr as the run goes. "
+    "[default: if stderr is a terminal]",
+)
+@click.option(
+    "--metrics-port",
+    type=click.IntRange(min=1, max=65535),
+    default=None,
+    help="Serve Prometheus metrics at http://127.0.0.1:PORT/metrics during the run.",
+)
+@click.option(
+    "--metrics-json",
+    "metrics_json_path",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="When done, write a JSON summary of per-state metrics to this file.",
+)
+@click.option(
+    "--store",
+    "store_path",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="Keep every result in this SQLite database, to reuse or compare "
+    "against on later runs.",
+)
+@click.option(
+    "--max-age",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="Reuse stored results checked within this many days instead of "
+    "checking again. Requires --store.",
+)
+@click.option(
+    "--recheck-not-registered/--reuse-not-registered",
+    default=True,
+    show_default=True,
+    help="Whether voters who weren't registered are checked again, however "
+    "recent their stored result.",
+)
+@click.option(
+    "--changes",
+    "changes_path",
+    type=click.Path(dir_okay=False, writable=True, allow_dash=True),
+    default=None,
+    help="Write a CSV of rows whose registration changed since they were "
+    "last checked. Requires --store.",
+)
+@click.option(
+    "--shard",
+    type=str,
+    default=None,
+    callback=_parse_shard,
+    metavar="K/N",
+    help="Only check the Kth of N shards of the input (1 <= K <= N). Each "
+    "voter always lands on the same shard. Merge the outputs with "
+    "`vote merge-shards`.",
+)
+@click.option(
+    "--row-column",
+    type=str,
+    default="Row Number",
+    show_default=True,
+    help="With --shard, name of the column holding each row's input row number.",
+)
+@_emulator_option
 def check_csv(
     csv_path: pathlib.Path,
     details: bool = False,
@@ -127,6 +404,23 @@ def check_csv(
     registration_date_header: str = "Registration Date",
     registration_status_header: str = "Registration Status",
     state_voter_id_header: str = "State Voter ID",
+    error_header: str = "Error",
+    workers: int = 16,
+    dedupe: bool = True,
+    output_path: str = "-",
+    output_format: str = "csv",
+    compression: str = "auto",
+    batch_size: int | None = None,
+    progress: bool | None = None,
+    metrics_port: int | None = None,
+    metrics_json_path: str | None = None,
+    store_path: str | None = None,
+    max_age: float | None = None,
+    recheck_not_registered: bool = True,
+    changes_path: str | None = None,
+    shard: Shard | None = None,
+    row_column: str = "Row Number",
+    emulator_url: str | None = None,
 ) -> None:
     """
     Check if multiple people are registered to vote.
@@ -136,74 +430,301 @@ def check_csv(
 
     If `details` is True, additional columns are added including registration
     date and state voter ID, if known.
+
+    Rows are written in input order. Rows that can't be checked (bad data,
+    unsupported states) get the reason in the registered column.
+
+    Rows for the same voter (same name, ZIP code, and birth date, ignoring
+    case and spacing) are only checked once, unless `--no-dedupe` is given.
+
+    CSV_PATH may be `-` to read from stdin. Input and output are streamed, so
+    memory use stays flat however large the file is.
+
+    With `--format jsonl` or `--format parquet`, result columns are typed
+    (registered is a boolean, registration date a date), and the reason a row
+    wasn't checked goes in a separate error column.
+
+    With `--store`, results are saved between runs. Add `--max-age` to skip
+    voters checked recently (voters who weren't registered are checked again
+    first, unless `--reuse-not-registered` is given), and `--changes` to list
+    whose registration changed.
+
+    With `--shard K/N`, only the Kth of N shards of the input is checked, and
+    each row's input row number is added as the first column.
     """
-    extra_fields = [registered_header]
-    if details:
-        extra_fields += [
-            registration_date_header,
-            registration_status_header,
-            state_voter_id_header,
-        ]
-
-    with open(csv_path, "r") as f:
-        # Read the CSV file and begin the new output CSV
-        reader = csv.DictReader(f)
+    if store_path is None and (max_age is not None or changes_path is not None):
+        raise click.UsageError("--max-age and --changes require --store.")
+    columns = ResultColumns(
+        registered_header,
+        registration_date_header,
+        registration_status_header,
+        state_voter_id_header,
+        error_header,
+    )
+    output_compression = None if compression == "auto" else Compression(compression)
+    with contextlib.ExitStack() as stack:
+        checker = BulkChecker(
+            details=details,
+            max_workers=workers,
+            dedupe=dedupe,
+            metrics=Metrics(),
+            store=stack.enter_context(ResultStore(store_path)) if store_path else None,
+            max_age=datetime.timedelta(days=max_age) if max_age is not None else None,
+            recheck_not_registered=recheck_not_registered,
+            **_tool_kwargs(emulator_url),
+        )
+
+        # Read the CSV file and begin the output
+        input_stream = stack.enter_context(open_input(csv_path))
+        reader = csv.DictReader(input_stream)
         if not reader.fieldnames:
             raise ValueError("Invalid CSV format: missing header row.")
-        field_names = list(reader.fieldnames) + extra_fields
-        writer = csv.DictWriter(sys.stdout, fieldnames=field_names)
-        writer.writeheader()
-
-        for row in reader:
-            # Read the relevant cells from the row
-            try:
-                first_name, last_name, dob_str, zipcode = (
-                    row[first_name_header],
-                    row[last_name_header],
-                    row[dob_header],
-                    row[zipcode_header],
+        input_fields = list(reader.fieldnames)
+        requests = _read_check_requests(
+            reader, first_name_header, last_name_header, dob_header, zipcode_header
+        )
+        if shard is not None:
+            input_fields.insert(0, row_column)
+            requests = _select_shard(requests, shard, row_column)
+        writer = stack.enter_context(
+            _result_writer(
+                stack,
+                OutputFormat(output_format),
+                output_path,
+                output_compression,
+                input_fields,
+                columns,
+                details,
+            )
+        )
+        batch_size = batch_size or writer.DEFAULT_BATCH_SIZE
+        writers = [writer]
+        if changes_path is not None:
+            writers.append(
+                ChangesWriter(
+                    stack.enter_context(open_output(changes_path)),
+                    input_fields,
+                    columns,
+                    details,
                 )
-                dob = datetime.datetime.strptime(dob_str, "%Y-%m-%d").date()
-            except (KeyError, ValueError) as e:
-                raise ValueError(
-                    "Invalid CSV format: unable to parse required fields."
-                ) from e
-
-            # Add default values for the new details columns, if needed
-            if details:
-                row[registration_date_header] = ""
-                row[registration_status_header] = ""
-                row[state_voter_id_header] = ""
-
-            # Get the registration tool for the given ZIP code
-            tool = get_check_tool(zipcode=zipcode)
-
-            # Handle unsupported states
-            if tool is None:
-                row["Registered"] = "(unsupported state)"
-                continue
-
-            # Check the registration status for this voter
-            result = tool.check_registration(
-                first_name, last_name, zipcode, dob, details
             )
+        _report_metrics(stack, checker, input_stream, progress, metrics_port)
+        _write_outcomes(checker, requests, writers, batch_size)
+
+    click.echo(
+        f"{checker.requested} rows: {checker.skipped} not checked, "
+        f"{checker.duplicates} duplicates (network calls saved)"
+        + (f", {checker.reused} reused from earlier runs." if store_path else "."),
+        err=True,
+    )
+    if metrics_json_path is not None:
+        with open(metrics_json_path, "w") as f:
+            json.dump(checker.metrics.to_dict(), f, indent=2)
 
-            # Finish quickly if the voter is not registered
-            if not result.registered:
-                row[registered_header] = False
-                writer.writerow(row)
-                continue
-
-            # Update the row with the registration status and details if requested
-            row[registered_header] = True
-            if details and result.details:
-                row[registration_date_header] = (
-                    result.details.registration_date.strftime("%Y-%m-%d")
-                )
-                row[registration_status_header] = result.details.status
-                row[state_voter_id_header] = result.details.state_id
 
-            writer.writerow(row)
+def _write_outcomes(
+    checker: BulkChecker,
+    requests: t.Iterable[tuple[dict, CheckRequest | InvalidRequest]],
+    writers: list[ResultWriter],
+    batch_size: int,
+) -> None:
+    """Check every request, writing the outcomes in batches."""
+    # Outcomes come back in input order, however the checks finish.
+    batch = []
+    for row, outcome in checker.check_all(requests):
+        if outcome.error is not None:
+            # Failures (after retries) are recorded in the output rather
+            # than ending the run.
+            request = outcome.request
+            assert request is not None
+            click.echo(
+                f"Error checking {request.first_name} {request.last_name}: "
+                f"{outcome.error}",
+                err=True,
+            )
+        batch.append((row, outcome))
+        if len(batch) >= batch_size:
+            for w in writers:
+                w.write(batch)
+            batch.clear()
+    for w in writers:
+        w.write(batch)
+
+
+def _read_shard_records(
+    stack: contextlib.ExitStack, path: str, output_format: OutputFormat
+) -> tuple[list[str] | None, t.Iterator[dict]]:
+    """Open a shard output, closing it with `stack`; return its header and records."""
+    stream = stack.enter_context(open_input(path))
+    if output_format == OutputFormat.JSONL:
+        return None, (json.loads(line) for line in stream if line.strip())
+    reader = csv.DictReader(stream)
+    return list(reader.fieldnames or ()), iter(reader)
+
+
+@vote.command()
+@click.argument(
+    "shard_paths",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, allow_dash=True),
+)
+@click.option(
+    "-o",
+    "--output",
+    "output_path",
+    type=click.Path(allow_dash=True, dir_okay=False, writable=True),
+    default="-",
+    show_default=True,
+    help="Where to write the merged output.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice([OutputFormat.CSV.value, OutputFormat.JSONL.value]),
+    default=OutputFormat.CSV.value,
+    show_default=True,
+    help="Format of the shard outputs (and the merged output).",
+)
+@click.option(
+    "--row-column",
+    type=str,
+    default="Row Number",
+    show_default=True,
+    help="Name of the column holding each row's input row number.",
+)
+@click.option(
+    "--keep-row-numbers",
+    is_flag=True,
+    default=False,
+    help="Keep the row number column in the merged output.",
+)
+def merge_shards(
+    shard_paths: tuple[str, ...],
+    output_path: str = "-",
+    output_format: str = "csv",
+    row_column: str = "Row Number",
+    keep_row_numbers: bool = False,
+) -> None:
+    """
+    Merge the outputs of `check-csv --shard` runs back into input order.
+
+    Pass every shard's output. Rows are sorted by their row number in
+    bounded memory (spilling to temporary files), whatever their number.
+    """
+    format_ = OutputFormat(output_format)
+    with contextlib.ExitStack() as stack:
+        headers, shards = zip(
+            *(_read_shard_records(stack, path, format_) for path in shard_paths),
+            strict=True,
+        )
+        if any(header != headers[0] for header in headers):
+            raise click.UsageError("Shard outputs have different columns.")
+
+        rows = 0
+        expected = 1
+        missing = 0
+        out = stack.enter_context(open_output(output_path))
+        writer = None
+        if format_ == OutputFormat.CSV:
+            assert headers[0] is not None
+            if row_column not in headers[0]:
+                raise click.UsageError(f"Shard outputs have no '{row_column}' column.")
+            fields = [f for f in headers[0] if keep_row_numbers or f != row_column]
+            writer = csv.DictWriter(out, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+        for number, record in merge_by_row_number(shards, row_column):
+            missing += max(0, number - expected)
+            expected = number + 1
+            rows += 1
+            if not keep_row_numbers:
+                del record[row_column]
+            if writer is not None:
+                writer.writerow(record)
+            else:
+                out.write(json.dumps(record) + "\n")
+
+    click.echo(f"Merged {rows} rows from {len(shard_paths)} shards.", err=True)
+    if missing:
+        click.echo(
+            f"Warning: {missing} row numbers are missing; is a shard absent?",
+            err=True,
+        )
+
+
+@vote.command()
+@click.option("--host", type=str, default="127.0.0.1", show_default=True)
+@click.option("--port", type=int, default=8000, show_default=True)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=32,
+    show_default=True,
+    help="Maximum checks running at once for each state.",
+)
+@click.option(
+    "--cache-size",
+    type=click.IntRange(min=0),
+    default=10_000,
+    show_default=True,
+    help="How many recent results to cache (0 to disable).",
+)
+@click.option(
+    "--cache-ttl",
+    type=click.FloatRange(min=0),
+    default=3600.0,
+    show_default=True,
+    help="How long, in seconds, a cached result is kept.",
+)
+@click.option(
+    "--rate",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Limit each client to this many checks per second. Unlimited by default.",
+)
+@click.option(
+    "--burst",
+    type=click.FloatRange(min=1),
+    default=100.0,
+    show_default=True,
+    help="With --rate, how many checks a client may make at once.",
+)
+@click.option(
+    "--hedge",
+    is_flag=True,
+    default=False,
+    help="If a state's site is slow to answer, send a second request.",
+)
+@_emulator_option
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    workers: int = 32,
+    cache_size: int = 10_000,
+    cache_ttl: float = 3600.0,
+    rate: float | None = None,
+    burst: float = 100.0,
+    hedge: bool = False,
+    emulator_url: str | None = None,
+) -> None:
+    """
+    Serve registration checks over HTTP.
+
+    POST a JSON object to /check, or newline-delimited JSON objects to
+    /check/batch for a streamed NDJSON response; metrics are at /metrics.
+    Requires uvicorn (`pip install 'voter-tools[serve]'`).
+    """
+    from .serve import CheckService, RateLimiter, ResultCache, ServiceApp, run
+
+    tool_kwargs = _tool_kwargs(emulator_url)
+    if hedge:
+        tool_kwargs["hedge"] = HedgePolicy()
+    service = CheckService(
+        cache=ResultCache(cache_size, cache_ttl), max_workers=workers, **tool_kwargs
+    )
+    limiter = RateLimiter(rate, burst) if rate is not None else None
+    click.echo(f"Serving registration checks at http://{host}:{port}/", err=True)
+    run(ServiceApp(service, limiter), host=host, port=port)
 
 
 @vote.group()
@@ -0,0 +1,321 @@
+"""
+Adaptive (AIMD) concurrency control for requests to state portals.
+
+No fixed number of concurrent requests is right for a state portal for long:
+Michigan slows down at certain hours, and Georgia's Salesforce instance sheds
+load unpredictably. An `AIMDLimiter` discovers the right number as it goes.
+While latency stays flat, it raises its limit on in-flight requests
+additively (by about one per round trip); when the portal signals overload
+with a timeout, a 429, or a 503, it cuts the limit multiplicatively.
+
+Every `CheckRegistrationTool` sends its requests through a `LimitedTransport`
+that shares its state's limiter, so bulk runs and the async tool layer are
+both throttled to what each portal can currently handle.
+
+When bulk runs and interactive checks share a state's limit, each tool's
+`Priority` decides who gets the next free slot. Waiting requests are served
+by weighted fair queuing: interactive checks, weighted far more heavily,
+take the next free slot whenever they're waiting, and bulk checks soak up
+what's left (but are never starved outright).
+"""
+
+import heapq
+import itertools
+import threading
+import time
+import typing as t
+from enum import Enum
+
+import httpx
+
+from .retry import DEADLINE, past_deadline
+
+# -----------------------------------------------------------------------------
+# AIMD limiter
+# -----------------------------------------------------------------------------
+
+
+class Outcome(str, Enum):
+    """How a request fared, as far as concurrency control is concerned."""
+
+    SUCCESS = "success"
+    """The request completed; its latency is a useful signal."""
+
+    OVERLOAD = "overload"
+    """The portal signalled overload (timeout, 429, or 503)."""
+
+    IGNORE = "ignore"
+    """The request failed in a way that says nothing about load."""
+
+
+class Priority(str, Enum):
+    """Which lane a request waits in for a concurrency slot."""
+
+    INTERACTIVE = "interactive"
+    """Someone is waiting on the answer."""
+
+    BULK = "bulk"
+    """Part of a bulk run; uses whatever capacity is left over."""
+
+
+DEFAULT_WEIGHTS: t.Mapping[Priority, float] = {
+    Priority.INTERACTIVE: 100.0,
+    Priority.BULK: 1.0,
+}
+"""
+Share of slots each lane gets while both are waiting.
+
+An interactive request takes the next free slot unless a hundred others
+have gone ahead of a waiting bulk request.
+"""
+
+
+class AIMDLimiter:
+    """
+    A thread-safe additive-increase/multiplicative-decrease concurrency limit.
+
+    Call `acquire()` before sending a request, and `release()` with the value
+    it returned and the request's `Outcome` afterwards.
+
+    Latency is tracked as a short-term moving average and a slowly-rising
+    baseline (the best latency seen recently). The limit only grows while the
+    short-term average stays within `latency_tolerance` times the baseline;
+    when latency climbs, the limit holds steady. Overload signals cut the
+    limit by `backoff_ratio`, at most once per round trip: requests that were
+    already in flight when the limit was cut don't cut it again.
+
+    Requests waiting for a slot are granted one by weighted fair queuing
+    across `Priority` lanes: each waiter is tagged with a virtual finish
+    time that advances by `1 / weight` for each request in its lane, and
+    the smallest tag goes next. Within a lane, waiters go first come, first
+    served.
+    """
+
+    min_limit: int
+    max_limit: int
+    backoff_ratio: float
+    latency_tolerance: float
+    weights: t.Mapping[Priority, float]
+    _clock: t.Callable[[], float]
+    _condition: threading.Condition
+    _limit: float
+    _in_flight: int
+    _baseline: float | None
+    _recent: float | None
+    _last_cut: float
+    _waiters: list[tuple[float, int]]
+    _sequence: t.Iterator[int]
+    _virtual_time: float
+    _last_finish: dict[Priority, float]
+
+    # Weight of each new sample in the short-term latency average.
+    RECENT_ALPHA: t.ClassVar[float] = 0.2
+
+    # How quickly the latency baseline is allowed to drift upwards, per sample.
+    BASELINE_DRIFT: t.ClassVar[float] = 0.01
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        *,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: float = 2.0,
+        weights: t.Mapping[Priority, float] = DEFAULT_WEIGHTS,
+        clock: t.Callable[[], float] = time.monotonic,
+    ):
+        """Create a new limiter."""
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Require 1 <= min_limit <= initial_limit <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.weights = weights
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._baseline = None
+        self._recent = None
+        self._last_cut = float("-inf")
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._last_finish = {}
+
+    @property
+    def limit(self) -> int:
+        """Return the current limit on in-flight requests."""
+        with self._condition:
+            return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Return the number of requests currently in flight."""
+        with self._condition:
+            return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        """Return the number of requests waiting for a slot."""
+        with self._condition:
+            return len(self._waiters)
+
+    def acquire(
+        self,
+        timeout: float | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> float:
+        """
+        Wait for a free slot and claim it.
+
+        Return the time the request started, which must be passed back to
+        `release()`. Raise TimeoutError if no slot frees up within `timeout`.
+        """
+        with self._condition:
+            start = max(self._virtual_time, self._last_finish.get(priority, 0.0))
+            finish = start + 1 / self.weights[priority]
+            self._last_finish[priority] = finish
+            waiter = (finish, next(self._sequence))
+            heapq.heappush(self._waiters, waiter)
+            if not self._condition.wait_for(
+                lambda: (
+                    self._waiters[0] == waiter and self._in_flight < int(self._limit)
+                ),
+                timeout,
+            ):
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+                # We may have been holding up the waiter behind us.
+                self._condition.notify_all()
+                raise TimeoutError("Timed out waiting for a concurrency slot.")
+            heapq.heappop(self._waiters)
+            self._virtual_time = finish
+            self._in_flight += 1
+            # The next waiter may be able to go too.
+            self._condition.notify_all()
+            return self._clock()
+
+    def release(self, started: float, outcome: Outcome) -> None:
+        """Give back a slot, and adjust the limit based on the outcome."""
+        with self._condition:
+            in_flight = self._in_flight
+            self._in_flight -= 1
+            if outcome == Outcome.SUCCESS:
+                self._on_success(self._clock() - started, in_flight)
+            elif outcome == Outcome.OVERLOAD:
+                self._on_overload(started)
+            self._condition.notify_all()
+
+    def _on_success(self, latency: float, in_flight: int) -> None:
+        if self._baseline is None or self._recent is None:
+            self._baseline = self._recent = latency
+            return
+        self._baseline = min(latency, self._baseline * (1 + self.BASELINE_DRIFT))
+        self._recent += self.RECENT_ALPHA * (latency - self._recent)
+        # Only grow while we're actually using the limit we have, and while
+        # latency stays flat; rising latency means queues are building.
+        if in_flight < self._limit / 2:
+            return
+        if self._recent > self._baseline * self.latency_tolerance:
+            return
+        self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+
+    def _on_overload(self, started: float) -> None:
+        if started < self._last_cut:
+            return
+        self._limit = max(float(self.min_limit), self._limit * self.backoff_ratio)
+        self._last_cut = self._clock()
+
+    def snapshot(self) -> dict[str, float | int | None]:
+        """Return the limiter's current state, for metrics and debugging."""
+        with self._condition:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "baseline_s": self._baseline,
+                "recent_s": self._recent,
+                "waiting": len(self._waiters),
+            }
+
+
+_LIMITERS: dict[str, AIMDLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_limiter(state: str) -> AIMDLimiter:
+    """
+    Return the shared concurrency limiter for a given state's portal.
+
+    All tools for a state share a limiter, so that the limit reflects
+    everything this process is asking of that portal.
+    """
+    state = state.upper()
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(state)
+        if limiter is None:
+            limiter = _LIMITERS[state] = AIMDLimiter()
+        return limiter
+
+
+# -----------------------------------------------------------------------------
+# Limited transport
+# -----------------------------------------------------------------------------
+
+OVERLOAD_STATUSES: frozenset[int] = frozenset({429, 503})
+"""HTTP status codes that signal that a portal is overloaded."""
+
+
+class LimitedTransport(httpx.BaseTransport):
+    """An httpx transport that holds an `AIMDLimiter` slot for each request."""
+
+    _transport: httpx.BaseTransport
+    limiter: AIMDLimiter
+    priority: Priority
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport,
+        limiter: AIMDLimiter,
+        priority: Priority = Priority.INTERACTIVE,
+    ):
+        """Wrap `transport` so that it respects `limiter`, in `priority`'s lane."""
+        self._transport = transport
+        self.limiter = limiter
+        self.priority = priority
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """
+        Wait for a slot, then send the request.
+
+        If the request has a deadline, raise `httpx.PoolTimeout` if no slot
+        frees up before it.
+        """
+        deadline = request.extensions.get(DEADLINE)
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            started = self.limiter.acquire(timeout, priority=self.priority)
+        except TimeoutError as e:
+            raise httpx.PoolTimeout(str(e), request=request) from e
+        outcome = Outcome.IGNORE
+        try:
+            response = self._transport.handle_request(request)
+        except httpx.TimeoutException:
+            # A timeout cut short by the request's deadline isn't overload.
+            if not past_deadline(request):
+                outcome = Outcome.OVERLOAD
+            raise
+        else:
+            if response.status_code in OVERLOAD_STATUSES:
+                outcome = Outcome.OVERLOAD
+            elif response.status_code < 500:
+                outcome = Outcome.SUCCESS
+            return response
+        finally:
+            self.limiter.release(started, outcome)
+
+    def close(self) -> None:
+        """Close the wrapped transport."""
+        self._transport.close()
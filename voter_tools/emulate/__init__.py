@@ -0,0 +1,27 @@
+"""
+A local emulator for the state systems that voter_tools talks to.
+
+The emulator serves stand-ins for Georgia's Aura endpoint, Michigan's MVIC
+search, Wisconsin's MyVote search API, Pennsylvania's status page, and the
+Pennsylvania OVR web API. Responses are realistic enough for the real tools
+to parse, and latency, throttling, and failures are all configurable. It is
+meant for load testing; see `python -m voter_tools.emulate --help`.
+"""
+
+from .app import EmulatedRequest, EmulatedResponse, Emulator
+from .config import EmulatorConfig, Endpoint, EndpointConfig, LatencyConfig
+from .server import EmulatorServer
+from .transport import EmulatorTransport, RedirectTransport
+
+__all__ = [
+    "EmulatedRequest",
+    "EmulatedResponse",
+    "Emulator",
+    "EmulatorConfig",
+    "EmulatorServer",
+    "EmulatorTransport",
+    "Endpoint",
+    "EndpointConfig",
+    "LatencyConfig",
+    "RedirectTransport",
+]
@@ -0,0 +1,75 @@
+import sys
+import typing as t
+
+import click
+
+from .app import Emulator
+from .config import EmulatorConfig, LatencyConfig
+from .server import EmulatorServer
+
+
+def _parse_latency(ctx, param, value: str | None) -> LatencyConfig | None:
+    if value is None:
+        return None
+    try:
+        return LatencyConfig.parse(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from e
+
+
+@click.command()
+@click.option("--host", type=str, default="127.0.0.1", help="Address to bind.")
+@click.option("--port", type=int, default=8765, help="Port to listen on.")
+@click.option(
+    "--config",
+    "config_path",
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON file with an EmulatorConfig, including per-endpoint overrides.",
+)
+@click.option(
+    "--latency",
+    callback=_parse_latency,
+    help="Latency for all endpoints, like 'lognormal:250:0.6' (milliseconds).",
+)
+@click.option("--rate-limit", type=float, help="Requests per second per endpoint.")
+@click.option("--burst", type=int, help="Burst size for the rate limit.")
+@click.option("--error-rate", type=float, help="Fraction of 500 responses.")
+@click.option("--unavailable-rate", type=float, help="Fraction of 503 responses.")
+@click.option("--stall-rate", type=float, help="Fraction of stalled requests.")
+@click.option("--reset-rate", type=float, help="Fraction of dropped connections.")
+@click.option("--registered-rate", type=float, help="Fraction of registered voters.")
+@click.option("--seed", type=int, help="Random seed, for reproducible runs.")
+@click.option("--verbose", is_flag=True, default=False, help="Log every request.")
+def emulate(
+    host: str,
+    port: int,
+    config_path: str | None,
+    latency: LatencyConfig | None,
+    seed: int | None,
+    verbose: bool,
+    **overrides: float | int | None,
+) -> None:
+    """Serve stand-ins for the GA, MI, WI, and PA state systems."""
+    config = EmulatorConfig.from_file(config_path) if config_path else EmulatorConfig()
+    updates: dict[str, t.Any] = {k: v for k, v in overrides.items() if v is not None}
+    if latency is not None:
+        updates["latency"] = latency
+    if updates:
+        default = config.default.model_copy(update=updates)
+        default = type(default).model_validate(default.model_dump())
+        config = config.model_copy(update={"default": default})
+    if seed is not None:
+        config = config.model_copy(update={"seed": seed})
+
+    server = EmulatorServer((host, port), Emulator(config), verbose=verbose)
+    print(f"Emulating state systems at {server.base_url}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    emulate()
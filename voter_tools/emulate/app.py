@@ -0,0 +1,405 @@
+import datetime
+import json
+import math
+import random
+import threading
+import time
+import typing as t
+from enum import Enum
+from urllib.parse import parse_qs
+
+from . import payloads
+from .config import EmulatorConfig, Endpoint, EndpointConfig
+
+# ------------------------------------------------------------------------
+# Requests and responses, independent of how they arrive
+# ------------------------------------------------------------------------
+
+
+class Fault(str, Enum):
+    """Injected failures that the front end (server or transport) must act out."""
+
+    STALL = "stall"
+    """Hang for `stall_seconds` without answering."""
+
+    RESET = "reset"
+    """Drop the connection without answering."""
+
+
+class EmulatedRequest:
+    """A request to the emulator, stripped down to what the emulator needs."""
+
+    method: str
+    path: str
+    query: dict[str, str]
+    body: bytes
+
+    def __init__(self, method: str, path: str, query: dict[str, str], body: bytes):
+        """Create a new emulated request."""
+        self.method = method.upper()
+        self.path = path
+        self.query = query
+        self.body = body
+
+    def form(self) -> dict[str, str]:
+        """Decode a form-encoded body."""
+        parsed = parse_qs(self.body.decode("utf-8"), keep_blank_values=True)
+        return {k: v[0] for k, v in parsed.items()}
+
+    def json(self) -> t.Any:
+        """Decode a JSON body."""
+        return json.loads(self.body.decode("utf-8"))
+
+
+class EmulatedResponse:
+    """A response from the emulator, along with any delay or fault to act out."""
+
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    delay: float
+    fault: Fault | None
+
+    def __init__(
+        self,
+        status: int,
+        body: bytes = b"",
+        *,
+        content_type: str = "text/plain; charset=utf-8",
+        headers: dict[str, str] | None = None,
+        delay: float = 0.0,
+        fault: Fault | None = None,
+    ):
+        """Create a new emulated response."""
+        self.status = status
+        self.body = body
+        self.headers = {"Content-Type": content_type, **(headers or {})}
+        self.delay = delay
+        self.fault = fault
+
+
+# ------------------------------------------------------------------------
+# Throttling
+# ------------------------------------------------------------------------
+
+
+class TokenBucket:
+    """A classic token bucket, used to emulate a portal's rate limiting."""
+
+    rate: float
+    burst: int
+    _tokens: float
+    _updated: float
+
+    def __init__(self, rate: float, burst: int):
+        """Create a full bucket that refills at `rate` tokens per second."""
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def take(self) -> float:
+        """
+        Take a token if one is available.
+
+        Return 0 on success, otherwise the number of seconds until one will be.
+        """
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+        self._updated = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+
+# ------------------------------------------------------------------------
+# The emulator itself
+# ------------------------------------------------------------------------
+
+_ROUTES: tuple[tuple[str, Endpoint], ...] = (
+    ("/s/sfsites/aura", Endpoint.GA),
+    ("/voter/searchbyname", Endpoint.MI),
+    ("/api/voter/search", Endpoint.WI),
+    ("/pages/voterregistrationstatus.aspx", Endpoint.PA_STATUS),
+    ("/sureovrwebapi/api/ovr", Endpoint.PA_OVR),
+)
+
+STATS_PATH = "/_emulator/stats"
+
+_JSON = "application/json; charset=utf-8"
+_HTML = "text/html; charset=utf-8"
+
+
+def route(path: str) -> Endpoint | None:
+    """Return the endpoint served at the given path, if any."""
+    lowered = path.lower().rstrip("/")
+    for suffix, endpoint in _ROUTES:
+        if lowered.endswith(suffix):
+            return endpoint
+    return None
+
+
+class Emulator:
+    """
+    A stand-in for the state systems that voter_tools talks to.
+
+    The emulator decides what each request should get back, including any
+    added latency, throttling, or injected failure. It does not itself do
+    any networking; see `server.py` for an HTTP server and `transport.py` for
+    an in-process httpx transport.
+    """
+
+    config: EmulatorConfig
+    _rng: random.Random
+    _lock: threading.Lock
+    _buckets: dict[Endpoint, TokenBucket]
+    _stats: dict[Endpoint, dict[str, int]]
+    _application_count: int
+
+    def __init__(self, config: EmulatorConfig | None = None):
+        """Create a new emulator with the given configuration."""
+        self.config = config or EmulatorConfig()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._buckets = {}
+        for endpoint in Endpoint:
+            endpoint_config = self.config.for_endpoint(endpoint)
+            if endpoint_config.rate_limit is not None:
+                self._buckets[endpoint] = TokenBucket(
+                    endpoint_config.rate_limit, endpoint_config.burst
+                )
+        self._stats = {endpoint: {} for endpoint in Endpoint}
+        self._application_count = 0
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Return counts of requests and outcomes, by endpoint."""
+        with self._lock:
+            return {e.value: dict(counts) for e, counts in self._stats.items()}
+
+    def _count(self, endpoint: Endpoint, outcome: str) -> None:
+        counts = self._stats[endpoint]
+        counts[outcome] = counts.get(outcome, 0) + 1
+
+    def handle(self, request: EmulatedRequest) -> EmulatedResponse:
+        """Decide how to answer a single request."""
+        if request.path == STATS_PATH:
+            return EmulatedResponse(
+                200, json.dumps(self.stats()).encode(), content_type=_JSON
+            )
+
+        endpoint = route(request.path)
+        if endpoint is None:
+            return EmulatedResponse(404, b"Not found.")
+        config = self.config.for_endpoint(endpoint)
+
+        # Make every random decision under the lock, so that a seeded
+        # emulator behaves the same way regardless of thread scheduling.
+        with self._lock:
+            self._count(endpoint, "requests")
+            bucket = self._buckets.get(endpoint)
+            wait = bucket.take() if bucket is not None else 0.0
+            roll = self._rng.random()
+            delay = config.latency.sample(self._rng)
+            outcome = self._decide(config, wait, roll)
+            self._count(endpoint, outcome)
+
+        match outcome:
+            case "throttled":
+                retry_after = max(config.retry_after, math.ceil(wait))
+                return EmulatedResponse(
+                    429,
+                    b"Too many requests.",
+                    headers={"Retry-After": str(retry_after)},
+                )
+            case "reset":
+                return EmulatedResponse(0, delay=delay, fault=Fault.RESET)
+            case "stall":
+                return EmulatedResponse(
+                    504, delay=config.stall_seconds, fault=Fault.STALL
+                )
+            case "unavailable":
+                return EmulatedResponse(
+                    503,
+                    b"Service unavailable.",
+                    headers={"Retry-After": str(config.retry_after)},
+                    delay=delay,
+                )
+            case "error":
+                return EmulatedResponse(500, b"Internal server error.", delay=delay)
+
+        try:
+            response = self._dispatch(endpoint, config, request)
+        except (KeyError, ValueError, TypeError, IndexError):
+            response = EmulatedResponse(400, b"Bad request.")
+        response.delay = delay
+        return response
+
+    @staticmethod
+    def _decide(config: EndpointConfig, wait: float, roll: float) -> str:
+        """Pick an outcome for a request, given a uniform random `roll`."""
+        if wait > 0:
+            return "throttled"
+        for outcome, rate in (
+            ("reset", config.reset_rate),
+            ("stall", config.stall_rate),
+            ("unavailable", config.unavailable_rate),
+            ("error", config.error_rate),
+        ):
+            if roll < rate:
+                return outcome
+            roll -= rate
+        return "ok"
+
+    def _dispatch(
+        self, endpoint: Endpoint, config: EndpointConfig, request: EmulatedRequest
+    ) -> EmulatedResponse:
+        match endpoint:
+            case Endpoint.GA:
+                return self._handle_ga(config, request)
+            case Endpoint.MI:
+                return self._handle_mi(config, request)
+            case Endpoint.WI:
+                return self._handle_wi(config, request)
+            case Endpoint.PA_STATUS:
+                return self._handle_pa_status(config, request)
+            case Endpoint.PA_OVR:
+                return self._handle_pa_ovr(config, request)
+
+    @staticmethod
+    def _lookup(
+        config: EndpointConfig, *parts: str
+    ) -> tuple[payloads.EmulatedVoter | None, bool]:
+        """Decide whether a voter is registered, and if they match many records."""
+        if payloads.fraction("registered", *parts) >= config.registered_rate:
+            return None, False
+        multiple = payloads.fraction("multiple", *parts) < config.multiple_rate
+        return payloads.EmulatedVoter(*parts), multiple
+
+    def _handle_ga(
+        self, config: EndpointConfig, request: EmulatedRequest
+    ) -> EmulatedResponse:
+        message = json.loads(request.form()["message"])
+        results = []
+        for action in message["actions"]:
+            action_id = action["id"]
+            params = action["params"]
+            match params["method"]:
+                case "checkContactExist":
+                    request_map = params["params"]["requestMap"]
+                    voter, multiple = self._lookup(
+                        config,
+                        "GA",
+                        request_map["firstInitial"],
+                        request_map["lastName"],
+                        request_map["birthDate"],
+                    )
+                    results.append(
+                        payloads.ga_check_contact_exist(action_id, voter, multiple)
+                    )
+                case "getPersonalInformation":
+                    contact_id = params["params"]["conId"]
+                    results.append(
+                        payloads.ga_get_personal_information(action_id, contact_id)
+                    )
+                case _:
+                    results.append({"id": action_id, "state": "ERROR", "error": []})
+        return EmulatedResponse(200, payloads.ga_response(results), content_type=_JSON)
+
+    def _handle_mi(
+        self, config: EndpointConfig, request: EmulatedRequest
+    ) -> EmulatedResponse:
+        form = request.form()
+        voter, multiple = self._lookup(
+            config,
+            "MI",
+            form["FirstName"],
+            form["LastName"],
+            form["NameBirthMonth"],
+            form["NameBirthYear"],
+            form["ZipCode"],
+        )
+        return EmulatedResponse(
+            200, payloads.mi_response(voter, multiple), content_type=_HTML
+        )
+
+    def _handle_wi(
+        self, config: EndpointConfig, request: EmulatedRequest
+    ) -> EmulatedResponse:
+        data = request.json()
+        voter, multiple = self._lookup(
+            config, "WI", data["firstName"], data["lastName"], data["birthDate"]
+        )
+        return EmulatedResponse(
+            200, payloads.wi_response(voter, multiple), content_type=_JSON
+        )
+
+    def _handle_pa_status(
+        self, config: EndpointConfig, request: EmulatedRequest
+    ) -> EmulatedResponse:
+        form = request.form()
+        prefix = "ctl00$ContentPlaceHolder1$"
+        voter, _ = self._lookup(
+            config,
+            "PA",
+            form[f"{prefix}txtVRSOpt2Item2"],
+            form[f"{prefix}txtVRSOpt2Item3"],
+            form[f"{prefix}txtVRSOpt2Item4"],
+            form[f"{prefix}CountyCombo"],
+        )
+        return EmulatedResponse(
+            200, payloads.pa_status_response(voter), content_type=_HTML
+        )
+
+    def _handle_pa_ovr(
+        self, config: EndpointConfig, request: EmulatedRequest
+    ) -> EmulatedResponse:
+        action = request.query.get("sysparm_action", "")
+        now = datetime.datetime.now()
+        if not request.query.get("sysparm_AuthKey"):
+            xml = payloads.pa_application_response(
+                None, now, ("VR_WAPI_MissingAccessKey",)
+            )
+        elif action in ("GETAPPLICATIONSETUP", "GETBALLOTAPPLICATIONSETUP"):
+            xml = payloads.pa_setup_xml(now.date())
+        elif action == "GETLANGUAGES":
+            xml = payloads.pa_languages_xml()
+        elif action in ("GETXMLTEMPLATE", "GETBALLOTXMLTEMPLATE"):
+            xml = payloads.pa_xml_template()
+        elif action == "GETERRORVALUES":
+            from ..pa.errors import BASE_ERROR_MAP
+
+            xml = payloads.pa_error_values_xml(BASE_ERROR_MAP)
+        elif action == "GETMUNICIPALITIES":
+            xml = payloads.pa_municipalities_xml(request.query["sysparm_County"])
+        elif action in ("SETAPPLICATION", "SETBALLOTAPPLICATION"):
+            xml = self._submit_pa_application(config, request, now)
+        else:
+            xml = payloads.pa_application_response(
+                None, now, ("VR_WAPI_InvalidAction",)
+            )
+        return EmulatedResponse(200, payloads.pa_ovr_body(xml), content_type=_JSON)
+
+    def _submit_pa_application(
+        self,
+        config: EndpointConfig,
+        request: EmulatedRequest,
+        now: datetime.datetime,
+    ) -> str:
+        application_data = request.json()["ApplicationData"]
+        if not application_data:
+            return payloads.pa_application_response(
+                None, now, ("VR_WAPI_RequestError",)
+            )
+        if (
+            payloads.fraction("invalid", application_data)
+            < config.validation_error_rate
+        ):
+            return payloads.pa_application_response(
+                None, now, ("VR_WAPI_InvalidOVRDL",)
+            )
+        with self._lock:
+            self._application_count += 1
+            application_id = f"EMU{self._application_count:09d}"
+        return payloads.pa_application_response(application_id, now)
@@ -0,0 +1,181 @@
+import json
+import math
+import pathlib
+import random
+import typing as t
+from enum import Enum
+
+import pydantic as p
+
+# ------------------------------------------------------------------------
+# Latency distributions
+# ------------------------------------------------------------------------
+
+
+class LatencyDistribution(str, Enum):
+    """The shape of the artificial latency added to each emulated response."""
+
+    NONE = "none"
+    """No added latency at all; respond as fast as possible."""
+
+    FIXED = "fixed"
+    """Always wait exactly `median_ms`."""
+
+    UNIFORM = "uniform"
+    """Wait a uniformly distributed time between `min_ms` and `max_ms`."""
+
+    EXPONENTIAL = "exponential"
+    """Wait an exponentially distributed time with mean `median_ms`."""
+
+    LOGNORMAL = "lognormal"
+    """
+    Wait a log-normally distributed time with median `median_ms`.
+
+    This is the most realistic choice for state portals: most responses
+    cluster around the median, with a long tail controlled by `sigma`.
+    """
+
+
+class LatencyConfig(p.BaseModel, frozen=True):
+    """Configuration for the latency added to emulated responses."""
+
+    distribution: LatencyDistribution = LatencyDistribution.NONE
+    median_ms: float = p.Field(default=0.0, ge=0.0)
+    sigma: float = p.Field(default=0.5, ge=0.0)
+    min_ms: float = p.Field(default=0.0, ge=0.0)
+    max_ms: float = p.Field(default=0.0, ge=0.0)
+
+    def sample(self, rng: random.Random) -> float:
+        """Return a latency sample, in seconds."""
+        match self.distribution:
+            case LatencyDistribution.NONE:
+                ms = 0.0
+            case LatencyDistribution.FIXED:
+                ms = self.median_ms
+            case LatencyDistribution.UNIFORM:
+                ms = rng.uniform(self.min_ms, max(self.min_ms, self.max_ms))
+            case LatencyDistribution.EXPONENTIAL:
+                ms = rng.expovariate(1.0 / self.median_ms) if self.median_ms else 0.0
+            case LatencyDistribution.LOGNORMAL:
+                ms = (
+                    rng.lognormvariate(math.log(self.median_ms), self.sigma)
+                    if self.median_ms
+                    else 0.0
+                )
+        if self.max_ms and self.distribution != LatencyDistribution.UNIFORM:
+            ms = min(ms, self.max_ms)
+        return ms / 1000.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyConfig":
+        """
+        Parse a compact latency specification, as used on the command line.
+
+        Examples: `none`, `fixed:120`, `uniform:50:400`, `exponential:200`,
+        `lognormal:250:0.6`. All times are in milliseconds.
+        """
+        name, *args = spec.split(":")
+        try:
+            distribution = LatencyDistribution(name.strip().lower())
+            values = [float(arg) for arg in args]
+        except ValueError as e:
+            raise ValueError(f"Invalid latency specification: {spec}") from e
+        match distribution, values:
+            case LatencyDistribution.NONE, []:
+                return cls()
+            case LatencyDistribution.FIXED | LatencyDistribution.EXPONENTIAL, [ms]:
+                return cls(distribution=distribution, median_ms=ms)
+            case LatencyDistribution.UNIFORM, [lo, hi]:
+                return cls(distribution=distribution, min_ms=lo, max_ms=hi)
+            case LatencyDistribution.LOGNORMAL, [ms]:
+                return cls(distribution=distribution, median_ms=ms)
+            case LatencyDistribution.LOGNORMAL, [ms, sigma]:
+                return cls(distribution=distribution, median_ms=ms, sigma=sigma)
+        raise ValueError(f"Invalid latency specification: {spec}")
+
+
+# ------------------------------------------------------------------------
+# Per-endpoint behavior
+# ------------------------------------------------------------------------
+
+
+class Endpoint(str, Enum):
+    """The state endpoints that the emulator knows how to serve."""
+
+    GA = "ga"
+    """Georgia's Salesforce Aura endpoint (`ga.GA_URL`)."""
+
+    MI = "mi"
+    """Michigan's MVIC search-by-name page."""
+
+    WI = "wi"
+    """Wisconsin's MyVote voter search API."""
+
+    PA_STATUS = "pa_status"
+    """Pennsylvania's voter registration status page."""
+
+    PA_OVR = "pa_ovr"
+    """Pennsylvania's online voter registration (OVR) web API."""
+
+
+class EndpointConfig(p.BaseModel, frozen=True):
+    """How a single emulated endpoint should behave."""
+
+    latency: LatencyConfig = LatencyConfig()
+    """Artificial latency added to every response."""
+
+    rate_limit: float | None = p.Field(default=None, gt=0.0)
+    """Sustained requests per second; above this, respond with a 429."""
+
+    burst: int = p.Field(default=10, ge=1)
+    """How many requests may arrive at once before throttling kicks in."""
+
+    error_rate: float = p.Field(default=0.0, ge=0.0, le=1.0)
+    """Fraction of requests that fail with a 500."""
+
+    unavailable_rate: float = p.Field(default=0.0, ge=0.0, le=1.0)
+    """Fraction of requests that fail with a 503 and a `Retry-After` header."""
+
+    stall_rate: float = p.Field(default=0.0, ge=0.0, le=1.0)
+    """Fraction of requests that hang for `stall_seconds` (forcing timeouts)."""
+
+    stall_seconds: float = p.Field(default=30.0, ge=0.0)
+    """How long a stalled request hangs before the emulator gives up."""
+
+    reset_rate: float = p.Field(default=0.0, ge=0.0, le=1.0)
+    """Fraction of requests whose connection is dropped without a response."""
+
+    retry_after: int = p.Field(default=1, ge=0)
+    """The `Retry-After` value, in seconds, sent with 429 and 503 responses."""
+
+    registered_rate: float = p.Field(default=0.7, ge=0.0, le=1.0)
+    """Fraction of (deterministically chosen) voters who are registered."""
+
+    multiple_rate: float = p.Field(default=0.0, ge=0.0, le=1.0)
+    """Fraction of registered voters who match multiple records (MI and WI)."""
+
+    validation_error_rate: float = p.Field(default=0.0, ge=0.0, le=1.0)
+    """Fraction of PA OVR submissions rejected with a validation error."""
+
+
+class EmulatorConfig(p.BaseModel, frozen=True):
+    """Configuration for a full emulator instance."""
+
+    default: EndpointConfig = EndpointConfig()
+    """Behavior for any endpoint not listed in `endpoints`."""
+
+    endpoints: dict[Endpoint, EndpointConfig] = p.Field(default_factory=dict)
+    """Per-endpoint overrides of the default behavior."""
+
+    seed: int | None = None
+    """Seed for the random number generator, for reproducible runs."""
+
+    def for_endpoint(self, endpoint: Endpoint) -> EndpointConfig:
+        """Return the configuration for the given endpoint."""
+        return self.endpoints.get(endpoint, self.default)
+
+    @classmethod
+    def from_file(cls, path: str | pathlib.Path) -> t.Self:
+        """Load a configuration from a JSON file."""
+        with open(path) as f:
+            return cls.model_validate(json.load(f))
@@ -0,0 +1,419 @@
+"""Realistic response bodies for each of the emulated state endpoints."""
+
+import datetime
+import hashlib
+import html
+import json
+import typing as t
+from xml.etree import ElementTree as ET
+
+from ..pa.address import _UNIT_TYPES
+from ..pa.check import COUNTY_TO_CODE
+from ..pa.client import (
+    AssistanceTypeChoice,
+    GenderChoice,
+    MailInAddressTypeChoice,
+    PoliticalPartyChoice,
+    RaceChoice,
+    SuffixChoice,
+)
+
+# ------------------------------------------------------------------------
+# Deterministic "voter universe"
+# ------------------------------------------------------------------------
+
+
+def fraction(*parts: str) -> float:
+    """
+    Return a stable pseudo-random number in [0, 1) for the given key parts.
+
+    The emulator uses this (rather than its random number generator) to decide
+    facts about a voter, so that the same voter always gets the same answer
+    no matter how many times, or in what order, they are checked.
+    """
+    key = "|".join(part.strip().upper() for part in parts).encode("utf-8")
+    digest = hashlib.blake2b(key, digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2**64
+
+
+class EmulatedVoter:
+    """The registration facts the emulator reports for a single voter."""
+
+    state_id: str
+    registration_date: datetime.date
+    status: str
+
+    def __init__(self, *parts: str):
+        """Derive a voter's registration facts from their identifying data."""
+        self.state_id = str(int(fraction("id", *parts) * 10**10)).zfill(10)
+        days = int(fraction("date", *parts) * 12_000)
+        self.registration_date = datetime.date(1990, 1, 1) + datetime.timedelta(days)
+        self.status = "Inactive" if fraction("status", *parts) < 0.1 else "Active"
+
+
+# ------------------------------------------------------------------------
+# Georgia: Salesforce Aura actions
+# ------------------------------------------------------------------------
+
+
+def _aura_action(action_id: str, return_value: dict) -> dict:
+    return {
+        "id": action_id,
+        "state": "SUCCESS",
+        "returnValue": {"returnValue": return_value, "cacheable": False},
+        "error": [],
+    }
+
+
+def ga_check_contact_exist(
+    action_id: str, voter: EmulatedVoter | None, multiple: bool
+) -> dict:
+    """Return the action result for a `checkContactExist` call."""
+    if voter is None:
+        # The real site answers with an empty message, which the GA tool
+        # (deliberately) fails to parse and treats as "not registered".
+        return _aura_action(action_id, {"success": True, "error": False, "message": {}})
+    message = {
+        "hasData": True,
+        "isMultiple": multiple,
+        "id": f"003{voter.state_id}AAA",
+        "instanceOf": "Contact",
+    }
+    return _aura_action(
+        action_id, {"success": True, "error": False, "message": message}
+    )
+
+
+def ga_get_personal_information(action_id: str, contact_id: str) -> dict:
+    """Return the action result for a `getPersonalInformation` call."""
+    voter = EmulatedVoter("ga-contact", contact_id)
+    return _aura_action(
+        action_id,
+        {
+            "createdDate": voter.registration_date.strftime("%Y-%m-%d"),
+            "email": None,
+            "firstName": "EMULATED",
+            "lastName": "VOTER",
+            "middleName": None,
+            "gender": "U",
+            "hasMaidenName": False,
+            "hasMiddleName": False,
+            "phone": None,
+            "status": voter.status,
+            "voterRegistrationNumber": voter.state_id,
+            "isBallotInfoRequired": True,
+        },
+    )
+
+
+def ga_response(actions: t.Sequence[dict]) -> bytes:
+    """Wrap action results in a full Aura response envelope."""
+    return json.dumps(
+        {
+            "actions": list(actions),
+            "events": [],
+            "context": {
+                "mode": "PROD",
+                "app": "siteforce:communityApp",
+                "contextPath": "/s/sfsites",
+                "pathPrefix": "",
+                "fwuid": "EMULATED",
+                "loaded": {},
+                "globalValueProviders": [],
+            },
+            "perfSummary": {"version": "core", "request": 1, "actions": {}},
+        }
+    ).encode("utf-8")
+
+
+# ------------------------------------------------------------------------
+# Michigan: MVIC search results page
+# ------------------------------------------------------------------------
+
+_MI_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8" />
+<title>Michigan Voter Information Center</title>
+<link href="/Content/site.css" rel="stylesheet" />
+</head>
+<body>
+<header class="navbar"><a class="brand" href="/">Michigan Voter Information</a>
+<ul class="nav">{nav}</ul></header>
+<main id="main-content" class="container">
+<form action="/Voter/SearchByName" method="post">
+<input id="hfmultiplevoterrecords" name="hfmultiplevoterrecords" type="hidden"
+ value="{multiple}" />
+<input id="hfnotfound" name="hfnotfound" type="hidden" value="{not_found}" />
+{voter}
+</form>
+</main>
+<footer class="footer">{footer}</footer>
+</body>
+</html>
+"""
+
+_MI_VOTER = """<div class="voter-record">
+<input id="Voter_0__DpaID" name="Voter[0].DpaID" type="hidden" value="{dpa_id}" />
+<input id="Voter_0__EffectiveRegistrationDate"
+ name="Voter[0].EffectiveRegistrationDate" type="hidden"
+ value="{registration_date} 12:00:00 AM" />
+<h2>Yes, you are registered!</h2>
+<p class="clerk">Your clerk: {clerk}</p>
+</div>"""
+
+
+def mi_response(voter: EmulatedVoter | None, multiple: bool) -> bytes:
+    """Return a realistic MVIC search results page."""
+    nav = "".join(
+        f'<li><a href="/Voter/Page{i}">Section {i}</a></li>' for i in range(12)
+    )
+    footer = "".join(f"<p>Footer paragraph {i}.</p>" for i in range(8))
+    voter_html = ""
+    if voter is not None and not multiple:
+        voter_html = _MI_VOTER.format(
+            dpa_id=voter.state_id,
+            registration_date=voter.registration_date.strftime("%m/%d/%Y"),
+            clerk=html.escape("Emulated Township Clerk"),
+        )
+    page = _MI_PAGE.format(
+        nav=nav,
+        footer=footer,
+        multiple="True" if multiple else "False",
+        not_found="True" if voter is None else "False",
+        voter=voter_html,
+    )
+    return page.encode("utf-8")
+
+
+# ------------------------------------------------------------------------
+# Wisconsin: MyVote search API
+# ------------------------------------------------------------------------
+
+
+def _wi_voter(voter: EmulatedVoter, index: int) -> dict:
+    return {
+        "$id": str(index + 3),
+        "voterRegNumber": voter.state_id,
+        "voterStatusName": voter.status,
+        "registrationDate": voter.registration_date.strftime("%m/%d/%Y"),
+        "address": "123 EMULATED ST, MADISON WI 53703",
+        "jurisdiction": "CITY OF MADISON - DANE COUNTY",
+    }
+
+
+def wi_response(voter: EmulatedVoter | None, multiple: bool) -> bytes:
+    """Return a realistic MyVote voter search response."""
+    values = []
+    if voter is not None:
+        values.append(_wi_voter(voter, 0))
+        if multiple:
+            values.append(_wi_voter(EmulatedVoter("wi-twin", voter.state_id), 1))
+    return json.dumps(
+        {
+            "$id": "1",
+            "Data": {"$id": "2", "voters": {"$id": "3", "$values": values}},
+            "Success": True,
+            "ErrorMessage": None,
+            "WarningMessage": None,
+        }
+    ).encode("utf-8")
+
+
+# ------------------------------------------------------------------------
+# Pennsylvania: voter registration status page (ASP.NET partial postback)
+# ------------------------------------------------------------------------
+
+
+def pa_status_response(voter: EmulatedVoter | None) -> bytes:
+    """Return a realistic ASP.NET delta response from the PA status page."""
+    if voter is None:
+        panel = (
+            '<div id="ctl00_ContentPlaceHolder1_regResultsDiv">'
+            "<span>No voter record matched your search criteria.</span></div>"
+        )
+    else:
+        panel = (
+            '<div id="ctl00_ContentPlaceHolder1_regResultsDiv">'
+            "<h2>Voter Status Record</h2>"
+            f"<span>Status: {voter.status.upper()}</span>"
+            f"<span>Registration date: {voter.registration_date:%m/%d/%Y}</span>"
+            "</div>"
+        )
+    panel_id = "ctl00_ContentPlaceHolder1_UpdatePanel1"
+    delta = f"1|#||4|{len(panel)}|updatePanel|{panel_id}|{panel}|"
+    delta += "0|hiddenField|__EVENTTARGET||0|hiddenField|__EVENTARGUMENT||"
+    return delta.encode("utf-8")
+
+
+# ------------------------------------------------------------------------
+# Pennsylvania: OVR web API (XML wrapped in a JSON string)
+# ------------------------------------------------------------------------
+
+
+def _options(root: ET.Element, tag: str, prefix: str, pairs: t.Iterable) -> None:
+    for code, description in pairs:
+        option = ET.SubElement(root, tag)
+        ET.SubElement(option, f"{prefix}Code").text = str(code)
+        ET.SubElement(option, f"{prefix}Description").text = description
+
+
+def _wrapped(root: ET.Element, outer: str, inner: str, text: str) -> None:
+    ET.SubElement(ET.SubElement(root, outer), inner).text = text
+
+
+def pa_setup_xml(today: datetime.date) -> str:
+    """Return a *SETUP response with dates relative to `today`."""
+    root = ET.Element("NewDataSet")
+    _options(
+        root,
+        "Suffix",
+        "NameSuffix",
+        ((s.value, s.value) for s in SuffixChoice if s.value),
+    )
+    _options(
+        root,
+        "Race",
+        "Race",
+        ((r.value, r.name.replace("_", " ")) for r in RaceChoice),
+    )
+    _options(
+        root,
+        "UnitTypes",
+        "UnitTypes",
+        ((code, name.upper()) for name, code in _UNIT_TYPES.items()),
+    )
+    _options(
+        root,
+        "AssistanceType",
+        "AssistanceType",
+        ((a.value, a.name.replace("_", " ").title()) for a in AssistanceTypeChoice),
+    )
+    _options(
+        root, "Gender", "Gender", ((g.value, g.name.title()) for g in GenderChoice)
+    )
+    _options(
+        root,
+        "PoliticalParty",
+        "PoliticalParty",
+        ((pp.value, pp.name.replace("_", " ").title()) for pp in PoliticalPartyChoice),
+    )
+    _options(
+        root,
+        "MailinAddressTypes",
+        "MailinAddressTypes",
+        ((m.value, f"{m.name.title()} Address") for m in MailInAddressTypeChoice),
+    )
+    for name, code in COUNTY_TO_CODE.items():
+        county = ET.SubElement(root, "County")
+        ET.SubElement(county, "countyID").text = code
+        ET.SubElement(county, "Countyname").text = name.upper()
+    for code, name in (("PA", "Pennsylvania"), ("NJ", "New Jersey")):
+        state = ET.SubElement(root, "States")
+        ET.SubElement(state, "Code").text = code
+        ET.SubElement(state, "CodesDescription").text = name
+    deadline = today + datetime.timedelta(days=30)
+    election = today + datetime.timedelta(days=45)
+    _wrapped(root, "NextVRDeadline", "NextVRDeadline", f"{deadline:%m/%d/%Y}")
+    _wrapped(root, "NextElection", "NextElection", f"{election:%m/%d/%Y}")
+    _wrapped(root, "Text_OVRApplnDeclaration", "Text", "<p>I declare...</p>")
+    _wrapped(root, "Text_OVRApplnAssistanceDeclaration", "Text", "<p>I assist</p>")
+    _wrapped(root, "Text_OVRMailInApplnDeclaration", "Text", "<p>Mail-in...</p>")
+    _wrapped(
+        root, "Text_OVRMailInElectionName", "ElectionName", "EMULATED GENERAL ELECTION"
+    )
+    _wrapped(root, "Text_OVRMailInApplnComplTime", "Time", "5:00 PM")
+    _wrapped(root, "Text_OVRMailInBallotRecvdTime", "RecvdTime", "8:00 PM")
+    return ET.tostring(root, encoding="unicode")
+
+
+def pa_languages_xml() -> str:
+    """Return a GETLANGUAGES response."""
+    root = ET.Element("OVRLookupData")
+    for code, name in (
+        ("LANGENG", "English"),
+        ("LANGSPN", "Spanish"),
+        ("LANGTCN", "Chinese"),
+    ):
+        language = ET.SubElement(root, "Languages")
+        ET.SubElement(language, "LanguageCode").text = code
+        ET.SubElement(language, "Language").text = name
+    return ET.tostring(root, encoding="unicode")
+
+
+def pa_municipalities_xml(county: str) -> str:
+    """Return a GETMUNICIPALITIES response for the given county."""
+    root = ET.Element("OVRLookupData")
+    county_id = COUNTY_TO_CODE.get(county.upper(), "0")
+    for index in range(12):
+        municipality = ET.SubElement(root, "Municipality")
+        ET.SubElement(municipality, "MunicipalityType").text = str(index % 4)
+        ET.SubElement(municipality, "MunicipalityID").text = f"MN{index:02d}"
+        ET.SubElement(
+            municipality, "MunicipalityIDname"
+        ).text = f"EMULATED TOWNSHIP {index}"
+        ET.SubElement(municipality, "CountyID").text = county_id
+        ET.SubElement(municipality, "CountyName").text = county.upper()
+    return ET.tostring(root, encoding="unicode")
+
+
+def pa_error_values_xml(codes: t.Iterable[str]) -> str:
+    """Return a GETERRORVALUES response listing the given codes."""
+    root = ET.Element("OVRLookupData")
+    for code in codes:
+        message = ET.SubElement(root, "MessageText")
+        ET.SubElement(message, "ErrorCode").text = code
+        ET.SubElement(message, "ErrorText").text = f"Emulated text for {code}."
+    return ET.tostring(root, encoding="unicode")
+
+
+# The element names of a voter registration record, in API order.
+_PA_TEMPLATE_FIELDS = (
+    "batch FirstName MiddleName LastName TitleSuffix united-states-citizen "
+    "eighteen-on-election-day isnewregistration name-update address-update "
+    "ispartychange isfederalvoter DateOfBirth Gender Ethnicity Phone Email "
+    "streetaddress streetaddress2 unittype unitnumber city zipcode "
+    "donthavePermtOrResAddress county municipality mailingaddress mailingcity "
+    "mailingstate mailingzipcode drivers-license ssn4 signatureimage "
+    "continueAppSubmit donthavebothDLandSSN politicalparty otherpoliticalparty "
+    "needhelptovote typeofassistance preferredlanguage voterregnumber "
+    "previousreglastname previousregfirstname previousregmiddlename "
+    "previousregaddress previousregcity previousregstate previousregzip "
+    "previousregcounty previousregyear declaration1 assistedpersonname "
+    "assistedpersonAddress assistedpersonphone assistancedeclaration2 "
+    "ispollworker bilingualinterpreter pollworkerspeaklang secondEmail ismailin "
+    "istransferpermanent mailinaddresstype mailinballotaddr mailincity "
+    "mailinstate mailinzipcode mailinward mailinlivedsince mailindeclaration"
+)
+PA_TEMPLATE_FIELDS: tuple[str, ...] = tuple(_PA_TEMPLATE_FIELDS.split())
+
+
+def pa_xml_template(fields: t.Iterable[str] = PA_TEMPLATE_FIELDS) -> str:
+    """Return a GETXMLTEMPLATE response with the given record fields."""
+    root = ET.Element("ns0:APIOnlineApplicationData", {"xmlns:ns0": "OVRexternaldata"})
+    record = ET.SubElement(root, "ns0:record")
+    for field in fields:
+        ET.SubElement(record, f"ns0:{field}")
+    return ET.tostring(root, encoding="unicode")
+
+
+def pa_application_response(
+    application_id: str | None,
+    submitted: datetime.datetime,
+    error_codes: t.Sequence[str] = (),
+) -> str:
+    """Return a SETAPPLICATION or SETBALLOTAPPLICATION response."""
+    root = ET.Element("RESPONSE")
+    if application_id is not None:
+        ET.SubElement(root, "APPLICATIONID").text = application_id
+        ET.SubElement(root, "APPLICATIONDATE").text = submitted.strftime(
+            "%b %d %Y  %I:%M%p"
+        )
+    for code in error_codes:
+        ET.SubElement(root, "ERROR").text = code
+    return ET.tostring(root, encoding="unicode")
+
+
+def pa_ovr_body(xml: str) -> bytes:
+    """Wrap an XML document the way the PA API does: as a JSON string."""
+    return json.dumps(xml).encode("utf-8")
@@ -0,0 +1,83 @@
+"""A threaded HTTP server front end for the emulator."""
+
+import socket
+import sys
+import time
+import typing as t
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from .app import EmulatedRequest, Emulator, Fault
+
+
+class EmulatorRequestHandler(BaseHTTPRequestHandler):
+    """Translate HTTP requests into emulator calls, and act out the answers."""
+
+    # Keep-alive, so that clients can pool connections like they would
+    # against the real portals.
+    protocol_version = "HTTP/1.1"
+
+    # Headers and body go out in separate writes; without TCP_NODELAY, Nagle's
+    # algorithm and delayed ACKs add ~40ms to every keep-alive response.
+    disable_nagle_algorithm = True
+
+    server: "EmulatorServer"
+
+    def _handle(self) -> None:
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        request = EmulatedRequest(
+            self.command, url.path, dict(parse_qsl(url.query)), body
+        )
+        response = self.server.emulator.handle(request)
+        if response.delay > 0:
+            time.sleep(response.delay)
+        if response.fault == Fault.RESET:
+            self.connection.shutdown(socket.SHUT_RDWR)
+            self.close_connection = True
+            return
+        self.send_response(response.status)
+        for name, value in response.headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(response.body)))
+        self.end_headers()
+        self.wfile.write(response.body)
+
+    do_GET = _handle
+    do_POST = _handle
+
+    def log_message(self, format: str, *args: t.Any) -> None:
+        """Log requests only if the server was asked to be verbose."""
+        if self.server.verbose:
+            sys.stderr.write(f"{self.address_string()} - {format % args}\n")
+
+
+class EmulatorServer(ThreadingHTTPServer):
+    """An HTTP server that answers every request with an `Emulator`."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    emulator: Emulator
+    verbose: bool
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        emulator: Emulator | None = None,
+        *,
+        verbose: bool = False,
+    ):
+        """Create (and bind) a new emulator server."""
+        self.emulator = emulator or Emulator()
+        self.verbose = verbose
+        super().__init__(address, EmulatorRequestHandler)
+
+    @property
+    def base_url(self) -> str:
+        """Return the base URL that clients should use to reach this server."""
+        host, port = self.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}"
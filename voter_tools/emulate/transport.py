@@ -0,0 +1,85 @@
+"""httpx transports for talking to the emulator instead of real state systems."""
+
+import time
+
+import httpx
+
+from .app import EmulatedRequest, Emulator, Fault
+
+
+class EmulatorTransport(httpx.BaseTransport):
+    """
+    An in-process transport that answers requests with an `Emulator`.
+
+    No sockets are involved, which makes this transport a good fit for tests
+    and benchmarks. If `realtime` is False, configured latency is skipped
+    entirely (but stalls still raise timeouts, immediately).
+    """
+
+    emulator: Emulator
+    realtime: bool
+
+    def __init__(self, emulator: Emulator | None = None, *, realtime: bool = True):
+        """Create a transport backed by the given emulator."""
+        self.emulator = emulator or Emulator()
+        self.realtime = realtime
+
+    def _sleep(self, seconds: float) -> None:
+        if self.realtime and seconds > 0:
+            time.sleep(seconds)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Answer a single request."""
+        emulated = EmulatedRequest(
+            request.method,
+            request.url.path,
+            dict(request.url.params.items()),
+            request.read(),
+        )
+        response = self.emulator.handle(emulated)
+        match response.fault:
+            case Fault.STALL:
+                timeout = request.extensions.get("timeout", {}).get("read")
+                stall = (
+                    response.delay if timeout is None else min(timeout, response.delay)
+                )
+                self._sleep(stall)
+                raise httpx.ReadTimeout("Emulated stall.", request=request)
+            case Fault.RESET:
+                self._sleep(response.delay)
+                raise httpx.RemoteProtocolError(
+                    "Server disconnected without sending a response.", request=request
+                )
+        self._sleep(response.delay)
+        return httpx.Response(
+            response.status,
+            headers=response.headers,
+            content=response.body,
+            request=request,
+        )
+
+
+class RedirectTransport(httpx.HTTPTransport):
+    """
+    A transport that sends every request to an emulator server instead.
+
+    The path and query of each request are left untouched; only the scheme,
+    host, and port change. This lets unmodified tools talk to an emulator
+    started with `python -m voter_tools.emulate`.
+    """
+
+    _target: httpx.URL
+
+    def __init__(self, base_url: str, *args, **kwargs):
+        """Create a transport that redirects every request to `base_url`."""
+        super().__init__(*args, **kwargs)
+        self._target = httpx.URL(base_url)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Rewrite the request URL, then send it."""
+        request.url = request.url.copy_with(
+            scheme=self._target.scheme,
+            host=self._target.host,
+            port=self._target.port,
+        )
+        return super().handle_request(request)
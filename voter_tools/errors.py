@@ -16,6 +16,21 @@ class MultipleRecordsFoundError(CheckRegistrationError):
     pass
 
 
+class CircuitOpenError(CheckRegistrationError):
+    """A state's portal has been failing, so requests to it fail fast."""
+
+    service: str
+    retry_in: float
+
+    def __init__(self, service: str, retry_in: float):
+        """Create a new circuit-open error for the named service."""
+        super().__init__(
+            f"{service} is unavailable; not retrying for {retry_in:.1f} seconds."
+        )
+        self.service = service
+        self.retry_in = retry_in
+
+
 class APIError(Exception):
     """Base class for all API errors."""
 
@@ -1,6 +1,8 @@
 import datetime
+import functools
 import json
 import sys
+import time
 import typing as t
 from abc import abstractmethod
 
@@ -8,13 +10,15 @@ import httpx
 import pydantic as p
 
 from .errors import CheckRegistrationError
+from .retry import DEADLINE
 from .tool import (
     CheckRegistrationDetails,
     CheckRegistrationResult,
     CheckRegistrationTool,
     SupportedFeatures,
+    first_found,
 )
-from .zipcodes import get_county
+from .zipcodes import get_counties, get_county
 
 # ------------------------------------------------------------------------
 # Utilities for issuing requests to Georgia's check voter registration site
@@ -94,6 +98,8 @@ class CheckContactExistAction(Action, frozen=True):
     last_name: str
     zipcode: str
     birth_date: datetime.date
+    county: str | None = None
+    """The county to search; by default, the ZIP code's most likely county."""
 
     result_class: t.ClassVar[type[ActionResult]] = CheckContactExistResult
     class_name: t.ClassVar[str] = "vr_MvpLandingPageController"
@@ -103,7 +109,7 @@ class CheckContactExistAction(Action, frozen=True):
 
     def params(self) -> dict:
         """Return params used as part of the action data."""
-        county_name = get_county(self.zipcode)
+        county_name = self.county or get_county(self.zipcode)
         if county_name is None:
             raise ValueError(f"Unknown county for zipcode: {self.zipcode}")
         county_name = county_name.upper()
@@ -338,20 +344,38 @@ class GAResponse(p.BaseModel, frozen=True):
 GA_URL = "https://mvp.sos.ga.gov/s/sfsites/aura"
 
 
-def _invoke_ga_endpoint(request: GARequest) -> httpx.Response:
-    """Invoke an endpoint on the GA voter reg site."""
+def _invoke_ga_endpoint(
+    request: GARequest,
+    client: httpx.Client | None = None,
+    deadline: float | None = None,
+) -> httpx.Response:
+    """
+    Invoke an endpoint on the GA voter reg site.
+
+    If a `deadline` (a `time.monotonic()` time) is given, the request's
+    timeouts and retries are cut short to meet it. Deadlines are only
+    honored when a `client` (with a `RetryTransport`) is given.
+    """
     final_url = f"{GA_URL}?aura.ApexAction.execute={len(request.actions)}"
-    response = httpx.post(
-        final_url,
-        data=request.to_data(),
-    )
+    if client is None:
+        response = httpx.post(final_url, data=request.to_data())
+    else:
+        response = client.post(
+            final_url,
+            data=request.to_data(),
+            extensions={DEADLINE: deadline} if deadline is not None else None,
+        )
     response.raise_for_status()
     return response
 
 
-def make_ga_request(request: GARequest) -> GAResponse:
+def make_ga_request(
+    request: GARequest,
+    client: httpx.Client | None = None,
+    deadline: float | None = None,
+) -> GAResponse:
     """Make a request to the GA voter reg site."""
-    response = _invoke_ga_endpoint(request)
+    response = _invoke_ga_endpoint(request, client, deadline)
     try:
         data = response.json()
     except Exception:
@@ -362,7 +386,13 @@ def make_ga_request(request: GARequest) -> GAResponse:
 
 
 def _check_contact_exist(
-    first_name: str, last_name: str, zipcode: str, birth_date: datetime.date
+    first_name: str,
+    last_name: str,
+    zipcode: str,
+    birth_date: datetime.date,
+    client: httpx.Client | None = None,
+    deadline: float | None = None,
+    county: str | None = None,
 ) -> CheckContactExistResult | None:
     """
     Check if the user is registered to vote in Georgia.
@@ -374,20 +404,25 @@ def _check_contact_exist(
         last_name=last_name,
         zipcode=zipcode,
         birth_date=birth_date,
+        county=county,
     )
     request = GARequest(actions=(check_action,))
-    response = make_ga_request(request)
+    response = make_ga_request(request, client, deadline)
     check_result = t.cast(
         CheckContactExistResult | None, response.result_for_action(check_action)
     )
     return check_result
 
 
-def _get_contact_details(contact_id: str) -> GetPersonalInformationResult | None:
+def _get_contact_details(
+    contact_id: str,
+    client: httpx.Client | None = None,
+    deadline: float | None = None,
+) -> GetPersonalInformationResult | None:
     """Get the details of a registered voter, by contact ID, in Georgia."""
     personal_action = GetPersonalInformationAction(contact_id=contact_id)
     request = GARequest(actions=(personal_action,))
-    response = make_ga_request(request)
+    response = make_ga_request(request, client, deadline)
     personal_result = t.cast(
         GetPersonalInformationResult | None, response.result_for_action(personal_action)
     )
@@ -400,11 +435,39 @@ def _get_contact_details(contact_id: str) -> GetPersonalInformationResult | None
 
 
 class GeorgiaCheckRegistrationTool(CheckRegistrationTool):
-    """A tool for checking voter registration in Georgia."""
+    """
+    A tool for checking voter registration in Georgia.
+
+    Georgia's site searches for voters by county. When a ZIP code may be in
+    more than one county, every candidate county is searched at once, and
+    the first to find the voter wins.
+
+    Georgia's site needs two round trips for details: one to find the voter,
+    and another to look up their registration. Give the tool a `budget` to
+    bound how long a whole check may take.
+    """
 
     state: t.ClassVar[str] = "GA"
     features: t.ClassVar[SupportedFeatures] = SupportedFeatures(details=True)
 
+    budget: float | None
+    """The most time, in seconds, a single check may take, retries included."""
+
+    def __init__(self, *, budget: float | None = None, **kwargs: t.Any):
+        """
+        Create a new Georgia registration check tool.
+
+        If a `budget` is given, each check must finish within that many
+        seconds: each round trip gets whatever is left of it. If the budget
+        runs out after the voter is found but before their details arrive,
+        the check returns `registered=True` with no details, rather than
+        failing.
+
+        Other keyword arguments are passed to `CheckRegistrationTool`.
+        """
+        super().__init__(**kwargs)
+        self.budget = budget
+
     def check_registration(
         self,
         first_name: str,
@@ -414,9 +477,23 @@ class GeorgiaCheckRegistrationTool(CheckRegistrationTool):
         details: bool = False,
     ) -> CheckRegistrationResult:
         """Check whether a voter is registered in Georgia."""
+        deadline = None if self.budget is None else time.monotonic() + self.budget
+        lookups = [
+            functools.partial(
+                _check_contact_exist,
+                first_name,
+                last_name,
+                zipcode,
+                birth_date,
+                self._client,
+                deadline,
+                county,
+            )
+            for county in get_counties(zipcode) or (None,)
+        ]
         try:
-            check_result = _check_contact_exist(
-                first_name, last_name, zipcode, birth_date
+            check_result = first_found(
+                lookups, lambda result: result is not None and result.success
             )
         except Exception as e:
             raise CheckRegistrationError("Error checking voter registration") from e
@@ -432,8 +509,17 @@ class GeorgiaCheckRegistrationTool(CheckRegistrationTool):
 
         contact_id = check_result.message.contact_id
 
+        # Out of time (now, or while waiting for details): we know enough to
+        # answer, if not in full.
+        if deadline is not None and time.monotonic() >= deadline:
+            return CheckRegistrationResult(registered=True, details=None)
+
         try:
-            personal_result = _get_contact_details(contact_id)
+            personal_result = _get_contact_details(contact_id, self._client, deadline)
+        except httpx.TimeoutException as e:
+            if deadline is not None:
+                return CheckRegistrationResult(registered=True, details=None)
+            raise CheckRegistrationError("Error checking voter registration") from e
         except Exception as e:
             raise CheckRegistrationError("Error checking voter registration") from e
 
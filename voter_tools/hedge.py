@@ -0,0 +1,236 @@
+"""
+Hedged requests, to cut the tail latency of registration lookups.
+
+A handful of very slow responses from the state portals dominate our p99. A
+hedged request trims that tail: if a lookup hasn't been answered within a
+high percentile of recent latencies, a duplicate is sent (on another pooled
+connection) and whichever answers first (successfully) wins.
+
+Hedging doubles the cost of the requests it touches, so it is opt-in, and a
+process-wide `HedgeBudget` caps the fraction of requests that may be hedged.
+Only idempotent lookups may ever be hedged; `HedgingTransport` is only
+installed by the check tools, never by `PennsylvaniaAPIClient`.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+import httpx
+import pydantic as p
+
+# -----------------------------------------------------------------------------
+# Policy and bookkeeping
+# -----------------------------------------------------------------------------
+
+
+class HedgePolicy(p.BaseModel, frozen=True):
+    """When to send a hedged (duplicate) request."""
+
+    percentile: float = p.Field(default=95.0, gt=0.0, lt=100.0)
+    """Hedge requests that take longer than this percentile of recent ones."""
+
+    min_samples: int = p.Field(default=20, ge=1)
+    """How many latencies to observe before trusting the percentile."""
+
+    initial_delay: float = p.Field(default=1.0, ge=0.0)
+    """Hedge delay, in seconds, until `min_samples` latencies are known."""
+
+    min_delay: float = p.Field(default=0.01, ge=0.0)
+    """Never hedge sooner than this, in seconds."""
+
+    window: int = p.Field(default=500, ge=1)
+    """How many recent latencies to keep."""
+
+
+class LatencyTracker:
+    """A thread-safe window of recent request latencies."""
+
+    _samples: deque[float]
+    _lock: threading.Lock
+
+    def __init__(self, window: int = 500):
+        """Create a tracker that remembers the last `window` latencies."""
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of latencies currently tracked."""
+        with self._lock:
+            return len(self._samples)
+
+    def record(self, latency: float) -> None:
+        """Record a latency, in seconds."""
+        with self._lock:
+            self._samples.append(latency)
+
+    def percentile(self, q: float) -> float | None:
+        """Return the `q`th percentile (0-100) of recent latencies, if any."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * q / 100))
+        return samples[index]
+
+
+class HedgeBudget:
+    """
+    A process-wide cap on the fraction of requests that are hedged.
+
+    Every request earns `ratio` tokens (up to `burst`); every hedge spends one.
+    """
+
+    ratio: float
+    burst: float
+    _tokens: float
+    _lock: threading.Lock
+
+    def __init__(self, ratio: float = 0.05, burst: float = 10.0):
+        """Create a budget that allows hedging `ratio` of all requests."""
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        """Earn budget for a request."""
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Spend budget for a hedge. Return False if there isn't enough."""
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+
+_BUDGET = HedgeBudget()
+
+
+def get_hedge_budget() -> HedgeBudget:
+    """Return the process-wide hedge budget."""
+    return _BUDGET
+
+
+# -----------------------------------------------------------------------------
+# Hedging transport
+# -----------------------------------------------------------------------------
+
+_EXECUTOR: ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the thread pool shared by every hedging transport."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=64, thread_name_prefix="hedge")
+        return _EXECUTOR
+
+
+def _discard(future: Future[httpx.Response]) -> None:
+    """Close the response of a request that lost the race, once it arrives."""
+    if future.exception() is None:
+        future.result().close()
+
+
+class HedgingTransport(httpx.BaseTransport):
+    """
+    An httpx transport that hedges slow requests.
+
+    Only install this in front of idempotent requests: a hedged request is
+    sent twice, and both copies may reach the server.
+    """
+
+    _transport: httpx.BaseTransport
+    policy: HedgePolicy
+    tracker: LatencyTracker
+    budget: HedgeBudget
+
+    hedged: int
+    """How many requests have been hedged."""
+
+    hedge_wins: int
+    """How many hedged requests were answered first by the hedge."""
+
+    _lock: threading.Lock
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport,
+        policy: HedgePolicy | None = None,
+        *,
+        budget: HedgeBudget | None = None,
+    ):
+        """Wrap `transport` so that slow requests are hedged."""
+        self._transport = transport
+        self.policy = policy or HedgePolicy()
+        self.tracker = LatencyTracker(self.policy.window)
+        self.budget = budget or get_hedge_budget()
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def hedge_delay(self) -> float:
+        """Return how long to wait for a response before hedging."""
+        delay = None
+        if len(self.tracker) >= self.policy.min_samples:
+            delay = self.tracker.percentile(self.policy.percentile)
+        if delay is None:
+            delay = self.policy.initial_delay
+        return max(self.policy.min_delay, delay)
+
+    def _send(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        response = self._transport.handle_request(request)
+        if response.status_code < 500:
+            self.tracker.record(time.monotonic() - started)
+        return response
+
+    def _copy(self, request: httpx.Request) -> httpx.Request:
+        return httpx.Request(
+            request.method,
+            request.url,
+            headers=request.headers,
+            content=request.content,
+            extensions=request.extensions,
+        )
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, and hedge it if it's slow to answer."""
+        request.read()
+        self.budget.record_request()
+        executor = _get_executor()
+        primary = executor.submit(self._send, request)
+        done, _ = wait([primary], timeout=self.hedge_delay())
+        if done or not self.budget.try_spend():
+            return primary.result()
+
+        hedge = executor.submit(self._send, self._copy(request))
+        with self._lock:
+            self.hedged += 1
+        pending: set[Future[httpx.Response]] = {primary, hedge}
+        finished: set[Future[httpx.Response]] = set()
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            finished |= done
+            # Prefer the first *successful* answer; if one copy failed and the
+            # other is still going, give the other one a chance.
+            successes = [f for f in done if f.exception() is None]
+            if successes or not pending:
+                winner = successes[0] if successes else next(iter(done))
+                if winner is hedge:
+                    with self._lock:
+                        self.hedge_wins += 1
+                for loser in (finished | pending) - {winner}:
+                    loser.add_done_callback(_discard)
+                return winner.result()
+
+    def close(self) -> None:
+        """Close the wrapped transport."""
+        self._transport.close()
@@ -0,0 +1,418 @@
+"""
+Throughput and latency metrics for registration checks.
+
+Every state gets a `StateMetrics`: counters for HTTP requests, retries,
+dedupe cache hits, and check outcomes, plus latency histograms for single
+HTTP requests and for whole checks (retries included). Tools record into the
+process-wide `Metrics` by default, just as they share a state's circuit
+breaker and concurrency limiter.
+
+Metrics can be rendered in the Prometheus text format (and served with
+`serve_metrics`), dumped as a JSON summary, or watched as a progress line
+on stderr with `ProgressReporter`.
+"""
+
+import bisect
+import http.server
+import math
+import sys
+import threading
+import time
+import typing as t
+
+import httpx
+
+# -----------------------------------------------------------------------------
+# Histograms and counters
+# -----------------------------------------------------------------------------
+
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+"""Upper bounds, in seconds, of the latency histogram buckets."""
+
+
+class Histogram:
+    """A thread-safe histogram with fixed buckets, in the Prometheus style."""
+
+    buckets: tuple[float, ...]
+    _counts: list[int]
+    _sum: float
+    _lock: threading.Lock
+
+    def __init__(self, buckets: t.Sequence[float] = LATENCY_BUCKETS):
+        """Create a histogram with the given (sorted) bucket upper bounds."""
+        self.buckets = tuple(buckets)
+        # One more count than buckets, for values above the last bound.
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Record a value."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    @property
+    def count(self) -> int:
+        """Return how many values have been observed."""
+        with self._lock:
+            return sum(self._counts)
+
+    def cumulative(self) -> tuple[list[tuple[float, int]], int, float]:
+        """Return `(bound, cumulative count)` pairs, the count, and the sum."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        running = 0
+        pairs = []
+        for bound, count in zip((*self.buckets, math.inf), counts, strict=True):
+            running += count
+            pairs.append((bound, running))
+        return pairs, running, total
+
+    def quantile(self, q: float) -> float | None:
+        """
+        Estimate the `q`th quantile (0-1) as the bound of its bucket.
+
+        Returns None if nothing has been observed.
+        """
+        pairs, count, _ = self.cumulative()
+        if count == 0:
+            return None
+        rank = q * count
+        for bound, running in pairs:
+            if running >= rank:
+                return bound
+        return math.inf  # pragma: no cover
+
+
+COUNTERS: tuple[str, ...] = (
+    "requests",
+    "retries",
+    "cache_hits",
+    "registered",
+    "not_registered",
+    "errors",
+    "skipped",
+)
+"""The counters kept for each state."""
+
+
+class StateMetrics:
+    """Counters and latency histograms for one state's checks."""
+
+    state: str
+    request_latency: Histogram
+    """Latency of single HTTP requests to the state's site."""
+
+    check_latency: Histogram
+    """Latency of whole checks, including retries and backoff."""
+
+    _counts: dict[str, int]
+    _lock: threading.Lock
+
+    def __init__(self, state: str):
+        """Create empty metrics for a state."""
+        self.state = state
+        self.request_latency = Histogram()
+        self.check_latency = Histogram()
+        self._counts = dict.fromkeys(COUNTERS, 0)
+        self._lock = threading.Lock()
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        """Add to one of the `COUNTERS`."""
+        with self._lock:
+            self._counts[counter] += amount
+
+    def counts(self) -> dict[str, int]:
+        """Return a copy of the counters."""
+        with self._lock:
+            return dict(self._counts)
+
+    def __getitem__(self, counter: str) -> int:
+        """Return the current value of a counter."""
+        with self._lock:
+            return self._counts[counter]
+
+    def to_dict(self) -> dict[str, t.Any]:
+        """Return a JSON-friendly summary."""
+        summary: dict[str, t.Any] = self.counts()
+        for name, histogram in (
+            ("request_latency", self.request_latency),
+            ("check_latency", self.check_latency),
+        ):
+            _, count, total = histogram.cumulative()
+            summary[name] = {
+                "count": count,
+                "mean_s": total / count if count else None,
+                "p50_s": histogram.quantile(0.5),
+                "p95_s": histogram.quantile(0.95),
+                "p99_s": histogram.quantile(0.99),
+            }
+        return summary
+
+
+UNKNOWN_STATE = "unknown"
+"""The state under which rows with an unknown ZIP code are counted."""
+
+
+class Metrics:
+    """A set of per-state metrics, with some run-wide bookkeeping."""
+
+    started: float
+    """When collection started, from `time.monotonic()`."""
+
+    _states: dict[str, StateMetrics]
+    _lock: threading.Lock
+
+    def __init__(self):
+        """Create an empty set of metrics."""
+        self.started = time.monotonic()
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def state(self, state: str | None) -> StateMetrics:
+        """Return the metrics for a state, creating them if needed."""
+        state = state.upper() if state else UNKNOWN_STATE
+        with self._lock:
+            metrics = self._states.get(state)
+            if metrics is None:
+                metrics = self._states[state] = StateMetrics(state)
+            return metrics
+
+    def states(self) -> list[StateMetrics]:
+        """Return every state's metrics, sorted by state."""
+        with self._lock:
+            return [self._states[s] for s in sorted(self._states)]
+
+    def total(self, counter: str) -> int:
+        """Return a counter summed across states."""
+        return sum(m[counter] for m in self.states())
+
+    @property
+    def rows(self) -> int:
+        """Return how many rows have an outcome."""
+        return sum(
+            self.total(c) for c in ("registered", "not_registered", "errors", "skipped")
+        )
+
+    def to_dict(self) -> dict[str, t.Any]:
+        """Return a JSON-friendly summary of every state's metrics."""
+        elapsed = time.monotonic() - self.started
+        return {
+            "elapsed_s": elapsed,
+            "rows": self.rows,
+            "rows_per_s": self.rows / elapsed if elapsed > 0 else None,
+            "totals": {c: self.total(c) for c in COUNTERS},
+            "states": {m.state: m.to_dict() for m in self.states()},
+        }
+
+    def render_prometheus(self, prefix: str = "voter_tools") -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        states = self.states()
+        lines = []
+        for counter in COUNTERS:
+            name = f"{prefix}_{counter}_total"
+            lines.append(f"# TYPE {name} counter")
+            for m in states:
+                lines.append(f'{name}{{state="{m.state}"}} {m[counter]}')
+        for attr in ("request_latency", "check_latency"):
+            name = f"{prefix}_{attr.removesuffix('_latency')}_duration_seconds"
+            lines.append(f"# TYPE {name} histogram")
+            for m in states:
+                pairs, count, total = getattr(m, attr).cumulative()
+                for bound, running in pairs:
+                    le = "+Inf" if bound == math.inf else repr(bound)
+                    lines.append(
+                        f'{name}_bucket{{state="{m.state}",le="{le}"}} {running}'
+                    )
+                lines.append(f'{name}_sum{{state="{m.state}"}} {total}')
+                lines.append(f'{name}_count{{state="{m.state}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+_METRICS = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """Return the process-wide metrics."""
+    return _METRICS
+
+
+# -----------------------------------------------------------------------------
+# Metered transport
+# -----------------------------------------------------------------------------
+
+
+class MeteredTransport(httpx.BaseTransport):
+    """An httpx transport that counts requests and records their latency."""
+
+    _transport: httpx.BaseTransport
+    metrics: StateMetrics
+
+    def __init__(self, transport: httpx.BaseTransport, metrics: StateMetrics):
+        """Wrap `transport`, recording into `metrics`."""
+        self._transport = transport
+        self.metrics = metrics
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, timing it."""
+        self.metrics.increment("requests")
+        started = time.monotonic()
+        try:
+            return self._transport.handle_request(request)
+        finally:
+            self.metrics.request_latency.observe(time.monotonic() - started)
+
+    def close(self) -> None:
+        """Close the wrapped transport."""
+        self._transport.close()
+
+
+# -----------------------------------------------------------------------------
+# Reporting
+# -----------------------------------------------------------------------------
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}"
+
+
+class ProgressReporter:
+    """
+    Periodically write a one-line progress report to a stream (stderr).
+
+    If `fraction_read` is given, it should return how much of the input has
+    been read so far (0-1), or None if that's unknown; `rows_read` should
+    return how many rows that was. Together they give an ETA.
+    """
+
+    metrics: Metrics
+    interval: float
+    _stream: t.TextIO
+    _fraction_read: t.Callable[[], float | None] | None
+    _rows_read: t.Callable[[], int] | None
+    _stopping: threading.Event
+    _thread: threading.Thread | None
+
+    def __init__(
+        self,
+        metrics: Metrics,
+        *,
+        interval: float = 2.0,
+        stream: t.TextIO | None = None,
+        fraction_read: t.Callable[[], float | None] | None = None,
+        rows_read: t.Callable[[], int] | None = None,
+    ):
+        """Create a reporter; call `start()` to begin reporting."""
+        self.metrics = metrics
+        self.interval = interval
+        self._stream = stream or sys.stderr
+        self._fraction_read = fraction_read
+        self._rows_read = rows_read
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def eta(self) -> float | None:
+        """Estimate the seconds remaining, if possible."""
+        if self._fraction_read is None or self._rows_read is None:
+            return None
+        fraction, rows_read = self._fraction_read(), self._rows_read()
+        rows = self.metrics.rows
+        if not fraction or not rows_read or not rows:
+            return None
+        # Rows are read ahead of being checked; scale by how many are done.
+        done = fraction * min(1.0, rows / rows_read)
+        elapsed = time.monotonic() - self.metrics.started
+        return elapsed * (1 - done) / done
+
+    def line(self) -> str:
+        """Return the current progress line."""
+        metrics = self.metrics
+        rows = metrics.rows
+        elapsed = time.monotonic() - metrics.started
+        rate = rows / elapsed if elapsed > 0 else 0.0
+        parts = [
+            f"{rows:,} rows",
+            f"{rate:,.1f} rows/s",
+            f"{metrics.total('registered'):,} registered",
+            f"{metrics.total('errors'):,} errors",
+            f"{metrics.total('retries'):,} retries",
+        ]
+        eta = self.eta()
+        if eta is not None:
+            parts.append(f"ETA {_format_duration(eta)}")
+        return " | ".join(parts)
+
+    def _write(self, final: bool = False) -> None:
+        if self._stream.isatty():
+            # Overwrite the previous line in place.
+            self._stream.write(f"\r{self.line()}\x1b[K" + ("\n" if final else ""))
+        else:
+            self._stream.write(f"{self.line()}\n")
+        self._stream.flush()
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            self._write()
+
+    def start(self) -> None:
+        """Start reporting in a background thread."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop reporting, and write a final line."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._write(final=True)
+
+
+def serve_metrics(
+    metrics: Metrics, port: int, host: str = "127.0.0.1"
+) -> http.server.ThreadingHTTPServer:
+    """
+    Serve `metrics` in the Prometheus text format at `/metrics`.
+
+    The server runs in a daemon thread; call `shutdown()` and then
+    `server_close()` on it to stop.
+    """
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: t.Any) -> None:
+            pass
+
+    server = http.server.ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
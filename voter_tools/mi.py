@@ -13,6 +13,63 @@ from .tool import (
     SupportedFeatures,
 )
 
+# ------------------------------------------------------------------------
+# Parsing of MVIC search results
+# ------------------------------------------------------------------------
+
+
+def parse_search_by_name_response(text: str, details: bool) -> CheckRegistrationResult:
+    """
+    Parse the HTML page returned by an MVIC search by name.
+
+    Raises a MultipleRecordsFoundError if the search matched several voters,
+    and a CheckRegistrationError if requested details could not be found.
+    """
+    # Parse the response
+    soup = BeautifulSoup(text, "html.parser")
+
+    # See if there are multiple voter records
+    multiple_records_val = find_attr_value(
+        soup, "input", "value", id="hfmultiplevoterrecords"
+    )
+    if (multiple_records_val or "").lower() == "true":
+        raise MultipleRecordsFoundError()
+
+    # Check if the voter was found
+    voter_found_val = find_attr_value(soup, "input", "value", id="hfnotfound")
+    if (voter_found_val or "").lower() == "true":
+        return CheckRegistrationResult(registered=False)
+
+    # Don't want details? We're done here.
+    if not details:
+        return CheckRegistrationResult(registered=True)
+
+    # Get the registration details
+    dpa_id_val = find_attr_value(soup, "input", "value", id="Voter_0__DpaID")
+    if not dpa_id_val:
+        raise CheckRegistrationError("Failed to find dpa id.")
+    registration_date_val = find_attr_value(
+        soup, "input", "value", id="Voter_0__EffectiveRegistrationDate"
+    )
+    if not registration_date_val:
+        raise CheckRegistrationError("Failed to find registration date.")
+    try:
+        registration_date = datetime.datetime.strptime(
+            registration_date_val.split(" ")[0], "%m/%d/%Y"
+        ).date()
+    except ValueError as e:
+        raise CheckRegistrationError("Failed to parse registration date.") from e
+
+    return CheckRegistrationResult(
+        registered=True,
+        details=CheckRegistrationDetails(
+            state_id=dpa_id_val,
+            registration_date=registration_date,
+            status="active",  # TODO: are there alternatives?
+        ),
+    )
+
+
 # ------------------------------------------------------------------------
 # CheckRegistrationTool implementation for MI
 # ------------------------------------------------------------------------
@@ -38,7 +95,7 @@ class MichiganCheckRegistrationTool(CheckRegistrationTool):
     ) -> CheckRegistrationResult:
         """Check if a voter is registered in Michigan."""
         try:
-            request = httpx.post(
+            request = self._client.post(
                 self.SEARCH_BY_NAME_URL,
                 data={
                     "FirstName": first_name,
@@ -59,46 +116,4 @@ class MichiganCheckRegistrationTool(CheckRegistrationTool):
         except httpx.HTTPError as e:
             raise CheckRegistrationError("Failed to check voter registration.") from e
 
-        # Parse the response
-        soup = BeautifulSoup(request.text, "html.parser")
-
-        # See if there are multiple voter records
-        multiple_records_val = find_attr_value(
-            soup, "input", "value", id="hfmultiplevoterrecords"
-        )
-        if (multiple_records_val or "").lower() == "true":
-            raise MultipleRecordsFoundError()
-
-        # Check if the voter was found
-        voter_found_val = find_attr_value(soup, "input", "value", id="hfnotfound")
-        if (voter_found_val or "").lower() == "true":
-            return CheckRegistrationResult(registered=False)
-
-        # Don't want details? We're done here.
-        if not details:
-            return CheckRegistrationResult(registered=True)
-
-        # Get the registration details
-        dpa_id_val = find_attr_value(soup, "input", "value", id="Voter_0__DpaID")
-        if not dpa_id_val:
-            raise CheckRegistrationError("Failed to find dpa id.")
-        registration_date_val = find_attr_value(
-            soup, "input", "value", id="Voter_0__EffectiveRegistrationDate"
-        )
-        if not registration_date_val:
-            raise CheckRegistrationError("Failed to find registration date.")
-        try:
-            registration_date = datetime.datetime.strptime(
-                registration_date_val.split(" ")[0], "%m/%d/%Y"
-            ).date()
-        except ValueError as e:
-            raise CheckRegistrationError("Failed to parse registration date.") from e
-
-        return CheckRegistrationResult(
-            registered=True,
-            details=CheckRegistrationDetails(
-                state_id=dpa_id_val,
-                registration_date=registration_date,
-                status="active",  # TODO: are there alternatives?
-            ),
-        )
+        return parse_search_by_name_response(request.text, details)
@@ -1,4 +1,8 @@
 import re
+import typing as t
+
+if t.TYPE_CHECKING:
+    from .client import UnitTypeChoice
 
 _UNIT_TYPES = {
     "apartment": "APT",
@@ -33,10 +37,136 @@ _UNIT_TYPES = {
 }
 
 
-_RE_BARE_NUMBER = re.compile(r"^#?(\d+)$")
-_RE_BARE_UNIT_NUMBER = re.compile(r"^(\w+)\.? (\d+)$")
-_RE_TRAILING_NUMBER = re.compile(r"^(.*) #(\d+)$")
-_RE_TRAILING_UNIT_NUMBER = re.compile(r"^(.*) (\w+)\.? (\d+)$")
+# Common (mostly USPS) abbreviations for the unit types above.
+_UNIT_ABBREVIATIONS = {
+    "apt": "APT",
+    "bsmt": "BSM",
+    "bldg": "BLD",
+    "dept": "DEP",
+    "fl": "FL",
+    "frnt": "FRN",
+    "hngr": "HNG",
+    "lbby": "LBB",
+    "lowr": "LOW",
+    "ofc": "OFC",
+    "ph": "PH",
+    "rm": "RM",
+    "spc": "SPC",
+    "ste": "STE",
+    "trlr": "TRLR",
+    "uppr": "UPP",
+}
+
+_UNIT_CODES = {**_UNIT_TYPES, **_UNIT_ABBREVIATIONS}
+
+# Unit types that usually come without a number ("123 Main St Rear").
+_NUMBERLESS_CODES = frozenset(
+    {"BSM", "FRN", "LBB", "LOW", "OFC", "PH", "REA", "SID", "UPP"}
+)
+
+
+def _alternation(names: t.Iterable[str]) -> str:
+    # Longest names first, so that (say) "lot" doesn't cut "lobby" short.
+    return "|".join(re.escape(name) for name in sorted(names, key=len, reverse=True))
+
+
+_UNIT_TYPE = _alternation(_UNIT_CODES)
+_NUMBERLESS_UNIT_TYPE = _alternation(
+    name for name, code in _UNIT_CODES.items() if code in _NUMBERLESS_CODES
+)
+_UNIT_NUMBER = r"[a-z]?-?\d+(?:-?[a-z0-9]+)?|[a-z]"
+_UNIT = rf"(?P<type>{_UNIT_TYPE})\.?\s*#?\s*(?P<number>{_UNIT_NUMBER})"
+_NUMBERLESS_UNIT = rf"(?P<type>{_NUMBERLESS_UNIT_TYPE})\.?"
+
+_RE_BARE_NUMBER = re.compile(rf"^\s*#?\s*(?P<number>{_UNIT_NUMBER})\s*$", re.IGNORECASE)
+_RE_BARE_UNIT_NUMBER = re.compile(rf"^\s*{_UNIT}\s*$", re.IGNORECASE)
+_RE_BARE_UNIT = re.compile(rf"^\s*{_NUMBERLESS_UNIT}\s*$", re.IGNORECASE)
+_RE_TRAILING_NUMBER = re.compile(
+    rf"[\s,]#\s*(?P<number>{_UNIT_NUMBER})\s*$", re.IGNORECASE
+)
+_RE_TRAILING_UNIT_NUMBER = re.compile(rf"[\s,]{_UNIT}\s*$", re.IGNORECASE)
+_RE_TRAILING_UNIT = re.compile(rf"[\s,]{_NUMBERLESS_UNIT}\s*$", re.IGNORECASE)
+
+_SECOND_LINE_PATTERNS = (_RE_BARE_UNIT_NUMBER, _RE_BARE_NUMBER, _RE_BARE_UNIT)
+_FIRST_LINE_PATTERNS = (
+    _RE_TRAILING_UNIT_NUMBER,
+    _RE_TRAILING_NUMBER,
+    _RE_TRAILING_UNIT,
+)
+
+# A unit number with no type is taken to be a generic unit.
+_BARE_UNIT_TYPE = "UNI"
+
+# Directions that may come before a street's name ("10 N Front St").
+_DIRECTIONS = frozenset(
+    {"n", "s", "e", "w", "ne", "nw", "se", "sw", "north", "south", "east", "west"}
+)
+
+
+class UnitAddress(t.NamedTuple):
+    """Address lines, with the unit (if any) split out of them."""
+
+    address: str
+    """The first address line, without the unit."""
+
+    address_2: str | None
+    """The second address line, or None if it held only the unit."""
+
+    unit_type: str | None
+    unit_number: str | None
+
+
+def _match_unit(
+    patterns: t.Iterable[re.Pattern[str]], text: str
+) -> re.Match[str] | None:
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match is not None:
+            return match
+    return None
+
+
+def _unit_type_number(match: re.Match[str]) -> tuple[str, str | None]:
+    groups = match.groupdict()
+    name, number = groups.get("type"), groups.get("number")
+    unit_type = _UNIT_CODES[name.lower()] if name else _BARE_UNIT_TYPE
+    return unit_type, number.upper() if number else None
+
+
+def _has_street_name(text: str) -> bool:
+    # Any word that isn't a number or a direction ("10 N" has no name).
+    for word in text.replace(",", " ").split():
+        word = word.rstrip(".").lower()
+        if word not in _DIRECTIONS and any(c.isalpha() for c in word):
+            return True
+    return False
+
+
+def split_unit(address1: str, address2: str | None) -> UnitAddress:
+    """
+    Split the unit type and number out of a potentially multi-line address.
+
+    The unit is either all of the second line ("Apt 4", "#4", "Rear") or the
+    end of the first ("123 Main St Ste. 200", "123 Main St #4"); a known
+    unit type is required, except that a number with no type is taken to be
+    a unit ("UNI"). Some types ("Rear", "Bsmt", "PH", ...) need no number.
+
+    At the end of the first line, the unit must follow a street name, since
+    many street names end in unit types ("10 N Front", "1 Pier 39").
+
+    The unit is removed from the line it was found in; if no unit is found,
+    the lines are returned as they are.
+    """
+    if address2:
+        match = _match_unit(_SECOND_LINE_PATTERNS, address2)
+        if match is not None:
+            return UnitAddress(address1, None, *_unit_type_number(match))
+    match = _match_unit(_FIRST_LINE_PATTERNS, address1)
+    if match is not None:
+        street = address1[: match.start()].rstrip(" ,")
+        if _has_street_name(street):
+            return UnitAddress(street, address2, *_unit_type_number(match))
+    return UnitAddress(address1, address2, None, None)
 
 
 def get_unit_type_number(
@@ -46,9 +176,37 @@ def get_unit_type_number(
     Normalize a provided potentially multi-line address.
 
     Specifically, attempt to identify a unit type/number from the address,
-    if a known type is found.
+    as described by `split_unit`.
+
+    If found, return a tuple of the unit type and number (which is None for
+    types that need none). Otherwise, return a tuple of None.
+    """
+    _, _, unit_type, unit_number = split_unit(address1, address2)
+    return unit_type, unit_number
+
+
+def get_unit_type_choice(unit_type: str) -> "UnitTypeChoice":
+    """Return the `UnitTypeChoice` for a unit type code."""
+    from .client import UnitTypeChoice
+
+    # The API knows trailers as both TRL and TRLR.
+    return UnitTypeChoice.TRAILER if unit_type == "TRLR" else UnitTypeChoice(unit_type)
+
+
+def get_unit_choices(
+    addresses: t.Iterable[tuple[str, str | None]],
+) -> list[UnitAddress]:
+    """
+    Split the unit out of each of many (address1, address2) pairs.
 
-    If found, return a tuple of the unit type and number. Otherwise, return
-    a tuple of None.
+    Unit types are returned as `UnitTypeChoice`s, ready for a
+    `VoterApplicationRecord`.
     """
-    return None, None
+    results: list[UnitAddress] = []
+    for address1, address2 in addresses:
+        address = split_unit(address1, address2)
+        if address.unit_type is not None:
+            unit_type = get_unit_type_choice(address.unit_type)
+            address = address._replace(unit_type=unit_type)
+        results.append(address)
+    return results
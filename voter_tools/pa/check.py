@@ -1,3 +1,4 @@
+import functools
 import pathlib
 import typing as t
 from datetime import date
@@ -6,8 +7,13 @@ import httpx
 from user_agent import generate_user_agent
 
 from ..errors import CheckRegistrationError
-from ..tool import CheckRegistrationResult, CheckRegistrationTool, SupportedFeatures
-from ..zipcodes import get_county
+from ..tool import (
+    CheckRegistrationResult,
+    CheckRegistrationTool,
+    SupportedFeatures,
+    first_found,
+)
+from ..zipcodes import get_counties, get_county
 
 COUNTY_TO_CODE = {
     "ADAMS": "2290",
@@ -88,8 +94,20 @@ def get_county_code(zipcode: str) -> str | None:
     return COUNTY_TO_CODE.get(county.upper())
 
 
+def get_county_codes(zipcode: str) -> list[str]:
+    """Get the codes of every county a Pennsylvania ZIP code may be in."""
+    codes = (COUNTY_TO_CODE.get(county.upper()) for county in get_counties(zipcode))
+    return [code for code in codes if code]
+
+
 class PennsylvaniaCheckRegistrationTool(CheckRegistrationTool):
-    """A tool for checking voter registration in Pennsylvania."""
+    """
+    A tool for checking voter registration in Pennsylvania.
+
+    Pennsylvania's site searches for voters by county. When a ZIP code may
+    be in more than one county, every candidate county is searched at once,
+    and the first to find the voter wins.
+    """
 
     state: t.ClassVar[str] = "PA"
     features: t.ClassVar[SupportedFeatures] = SupportedFeatures(details=False)
@@ -109,12 +127,14 @@ class PennsylvaniaCheckRegistrationTool(CheckRegistrationTool):
         return {kv[0]: kv[1].strip() for line in lines if (kv := line.split(":", 1))}
 
     def _request(
-        self, first_name: str, last_name: str, zipcode: str, birth_date: date
+        self,
+        first_name: str,
+        last_name: str,
+        zipcode: str,
+        birth_date: date,
+        county_code: str,
     ) -> httpx.Response:
         """Make a request to the PA voter registration status page."""
-        county_code = get_county_code(zipcode)
-        if not county_code:
-            raise CheckRegistrationError("Invalid ZIP code or unknown county")
         data = {
             "ctl00$ContentPlaceHolder1$ScriptManager1": "ctl00$ContentPlaceHolder1$UpdatePanel1|ctl00$ContentPlaceHolder1$btnContinue",  # noqa: E501
             "ctl00_ContentPlaceHolder1_ScriptManager1_HiddenField": "",
@@ -129,7 +149,7 @@ class PennsylvaniaCheckRegistrationTool(CheckRegistrationTool):
             **self._get_view_state_data(),
             "ctl00$ContentPlaceHolder1$btnContinue": "Search",
         }
-        response = httpx.post(
+        response = self._client.post(
             self.STATUS_URL,
             data=data,
             headers={
@@ -153,13 +173,25 @@ class PennsylvaniaCheckRegistrationTool(CheckRegistrationTool):
         details: bool = False,
     ) -> CheckRegistrationResult:
         """Check whether a voter is registered in Pennsylvania."""
-        try:
-            response = self._request(first_name, last_name, zipcode, birth_date)
-        except httpx.HTTPStatusError as e:
-            raise CheckRegistrationError("Failed to check voter registration") from e
-        except CheckRegistrationError:
-            raise
-
-        return CheckRegistrationResult(
-            registered="voter status record" in response.text.lower(), details=None
+        county_codes = get_county_codes(zipcode)
+        if not county_codes:
+            raise CheckRegistrationError("Invalid ZIP code or unknown county")
+
+        def check_county(county_code: str) -> CheckRegistrationResult:
+            try:
+                response = self._request(
+                    first_name, last_name, zipcode, birth_date, county_code
+                )
+            except httpx.HTTPError as e:
+                raise CheckRegistrationError(
+                    "Failed to check voter registration"
+                ) from e
+            return CheckRegistrationResult(
+                registered="voter status record" in response.text.lower(),
+                details=None,
+            )
+
+        return first_found(
+            [functools.partial(check_county, code) for code in county_codes],
+            lambda result: result.registered,
         )
@@ -1,5 +1,6 @@
 import datetime
 import io
+import threading
 import typing as t
 from base64 import b64decode, b64encode
 from enum import Enum
@@ -10,6 +11,7 @@ import pydantic as p
 import pydantic_xml as px
 from PIL import Image
 
+from .address import get_unit_type_choice, split_unit
 from .counties import CountyChoice, get_county_choice
 from .errors import (
     APIError,
@@ -19,6 +21,10 @@ from .errors import (
     build_error_for_codes,
 )
 
+if t.TYPE_CHECKING:
+    from .journal import SubmissionJournal
+    from .preflight import ReferenceCache
+
 STAGING_URL = "https://paovrwebapi.beta.vote.pa.gov/SureOVRWebAPI/api/ovr"
 PRODUCTION_URL = "https://paovrwebapi.vote.pa.gov/SureOVRWebAPI/api/ovr"
 
@@ -314,12 +320,95 @@ SignatureImage: t.TypeAlias = t.Annotated[
 ]
 
 
+# -----------------------------------------------------------------------------
+# Lazily-built XML models
+# -----------------------------------------------------------------------------
+
+_BUILD_LOCK = threading.RLock()
+
+
+def _nested_models(annotation: t.Any) -> t.Iterator[type["XmlModel"]]:
+    """Yield the XML models found anywhere in a field's annotation."""
+    if isinstance(annotation, type) and issubclass(annotation, XmlModel):
+        yield annotation
+    for arg in t.get_args(annotation):
+        yield from _nested_models(arg)
+
+
+def _build(model: type["XmlModel"]) -> None:
+    """Build a model's validator and XML serializer, and its nested models'."""
+    with _BUILD_LOCK:
+        if model.__xml_serializer__ is not None:
+            return
+        for field in model.model_fields.values():
+            for nested in _nested_models(field.annotation):
+                if nested is not model:
+                    _build(nested)
+        model.model_rebuild()
+
+
+class XmlModel(px.BaseXmlModel, frozen=True, defer_build=True):
+    """
+    Base class for the API's XML models, built on first use.
+
+    Building validators and XML serializers for every model up front makes
+    importing this module slow, even in processes that use one or two of
+    them. Instead, each model (and the models nested in it) is built the
+    first time it's used; `warm()` builds them all.
+    """
+
+    @classmethod
+    def from_xml_tree(
+        cls,
+        root: t.Any,
+        context: dict[str, t.Any] | None = None,
+        empty_as_string: bool = False,
+    ) -> t.Self:
+        """Deserialize an XML element tree, building the model if need be."""
+        _build(cls)
+        return super().from_xml_tree(
+            root, context=context, empty_as_string=empty_as_string
+        )
+
+    def to_xml_tree(
+        self,
+        *,
+        skip_empty: bool = False,
+        exclude_none: bool = False,
+        exclude_unset: bool = False,
+    ) -> t.Any:
+        """Serialize to an XML element tree, building the model if need be."""
+        _build(type(self))
+        return super().to_xml_tree(
+            skip_empty=skip_empty,
+            exclude_none=exclude_none,
+            exclude_unset=exclude_unset,
+        )
+
+
+def _models(model: type[XmlModel] = XmlModel) -> t.Iterator[type[XmlModel]]:
+    for subclass in model.__subclasses__():
+        yield subclass
+        yield from _models(subclass)
+
+
+def warm() -> None:
+    """
+    Build every API model now, rather than on first use.
+
+    Long-running servers can call this at startup, so that the first
+    requests don't pay for it.
+    """
+    for model in _models():
+        _build(model)
+
+
 # -----------------------------------------------------------------------------
 # Generic response type
 # -----------------------------------------------------------------------------
 
 
-class APIResponse(px.BaseXmlModel, tag="RESPONSE", frozen=True):
+class APIResponse(XmlModel, tag="RESPONSE", frozen=True):
     """
     A generic response from the Pennsylvania OVR API.
 
@@ -356,12 +445,10 @@ class APIResponse(px.BaseXmlModel, tag="RESPONSE", frozen=True):
             return None
         if isinstance(value, str):
             return tuple(v for v in value.split(",") if v)
-        # We assume there's something iterable here.
+        # We assume there's something iterable here, of strings that may
+        # themselves hold several comma-separated codes.
         try:
-            # First, collapse that thing back into a string.
-            value = ",".join(value)
-            # Now split it back into a tuple. (Yeah, I know; sorry.)
-            return tuple(v for v in value.split(",") if v)
+            return tuple(code for v in value for code in v.split(",") if code)
         except Exception as e:
             # Nope, not even iterable.
             raise ValueError("Error codes must be a string or an iterable.") from e
@@ -399,7 +486,7 @@ class APIResponse(px.BaseXmlModel, tag="RESPONSE", frozen=True):
 # -----------------------------------------------------------------------------
 
 
-class SetupOption(px.BaseXmlModel, frozen=True):
+class SetupOption(XmlModel, frozen=True):
     """Base class for all options returned by the *SETUP API calls."""
 
     pass
@@ -507,9 +594,7 @@ class State(SetupOption, tag="States", frozen=True):
     """The human-readable description for the state (like 'Pennsylvania')."""
 
 
-class SetupResponse(
-    px.BaseXmlModel, tag="NewDataSet", search_mode="unordered", frozen=True
-):
+class SetupResponse(XmlModel, tag="NewDataSet", search_mode="unordered", frozen=True):
     """
     A full response from the *SETUP API call.
 
@@ -582,7 +667,7 @@ class SetupResponse(
 # -----------------------------------------------------------------------------
 
 
-class Municipality(px.BaseXmlModel, tag="Municipality", frozen=True):
+class Municipality(XmlModel, tag="Municipality", frozen=True):
     """A single municipality in Pennsylvania, like 'Barnett Township'."""
 
     mun_type: int = px.element(alias="MunicipalityType")
@@ -601,7 +686,7 @@ class Municipality(px.BaseXmlModel, tag="Municipality", frozen=True):
     """The name of the county (like 'ADAMS')."""
 
 
-class MunicipalitiesResponse(px.BaseXmlModel, tag="OVRLookupData", frozen=True):
+class MunicipalitiesResponse(XmlModel, tag="OVRLookupData", frozen=True):
     """A response from the GETMUNICIPALITIES API call."""
 
     municipalities: tuple[Municipality, ...]
@@ -613,7 +698,7 @@ class MunicipalitiesResponse(px.BaseXmlModel, tag="OVRLookupData", frozen=True):
 # -----------------------------------------------------------------------------
 
 
-class ErrorValue(px.BaseXmlModel, tag="MessageText", frozen=True):
+class ErrorValue(XmlModel, tag="MessageText", frozen=True):
     """A single error value from the GETERRORVALUES API call."""
 
     code: str = px.element(alias="ErrorCode")
@@ -623,7 +708,7 @@ class ErrorValue(px.BaseXmlModel, tag="MessageText", frozen=True):
     """The human-readable description of the error value."""
 
 
-class ErrorValuesResponse(px.BaseXmlModel, tag="OVRLookupData", frozen=True):
+class ErrorValuesResponse(XmlModel, tag="OVRLookupData", frozen=True):
     """A response from the GETERRORVALUES API call."""
 
     errors: tuple[ErrorValue, ...]
@@ -635,7 +720,7 @@ class ErrorValuesResponse(px.BaseXmlModel, tag="OVRLookupData", frozen=True):
 # -----------------------------------------------------------------------------
 
 
-class Language(px.BaseXmlModel, tag="Languages", frozen=True):
+class Language(XmlModel, tag="Languages", frozen=True):
     """A single language in the Pennsylvania OVR API."""
 
     code: str = px.element(alias="LanguageCode")
@@ -645,7 +730,7 @@ class Language(px.BaseXmlModel, tag="Languages", frozen=True):
     """The human-readable name for the language (like 'English')."""
 
 
-class LanguagesResponse(px.BaseXmlModel, tag="OVRLookupData", frozen=True):
+class LanguagesResponse(XmlModel, tag="OVRLookupData", frozen=True):
     """A response from the GETLANGUAGES API call."""
 
     languages: tuple[Language, ...]
@@ -815,7 +900,7 @@ class MailInAddressTypeChoice(str, Enum):
     ALTERNATE = "A"
 
 
-class VoterBatch(px.BaseXmlModel, frozen=True):
+class VoterBatch(XmlModel, frozen=True):
     """01 - A batch mode for a voter registration application."""
 
     # XXX setting BatchMode.FIRST_ERROR_ONLY results in the staging
@@ -824,7 +909,7 @@ class VoterBatch(px.BaseXmlModel, frozen=True):
     batch: BatchMode = px.element(default=BatchMode.ALL_ERRORS)
 
 
-class VoterName(px.BaseXmlModel, frozen=True):
+class VoterName(XmlModel, frozen=True):
     """02 - Personal information for a voter registration application."""
 
     first_name: str = px.element(tag="FirstName", max_length=30)
@@ -833,7 +918,7 @@ class VoterName(px.BaseXmlModel, frozen=True):
     suffix: SuffixChoice = px.element(tag="TitleSuffix", default=SuffixChoice.NONE)
 
 
-class VoterEligibility(px.BaseXmlModel, frozen=True):
+class VoterEligibility(XmlModel, frozen=True):
     """03 - Eligibility information for a voter registration application."""
 
     is_us_citizen: TrueBit = px.element(tag="united-states-citizen")
@@ -854,7 +939,7 @@ class VoterEligibility(px.BaseXmlModel, frozen=True):
         return self
 
 
-class VoterReason(px.BaseXmlModel, frozen=True):
+class VoterReason(XmlModel, frozen=True):
     """
 
     Manage the reasons for a voter registration application.
@@ -1023,7 +1108,7 @@ class VoterReason(px.BaseXmlModel, frozen=True):
         return choice
 
 
-class VoterAbout(px.BaseXmlModel, frozen=True):
+class VoterAbout(XmlModel, frozen=True):
     """05 - Information about the voter for a voter registration application."""
 
     birth_date: PARequestDate = px.element(tag="DateOfBirth")
@@ -1040,7 +1125,7 @@ class VoterAbout(px.BaseXmlModel, frozen=True):
     email: p.EmailStr | None = px.element(tag="Email", max_length=50, default=None)
 
 
-class VoterAddress(px.BaseXmlModel, frozen=True):
+class VoterAddress(XmlModel, frozen=True):
     """06 - Address information for a voter registration application."""
 
     address: str = px.element(tag="streetaddress", max_length=40)
@@ -1052,8 +1137,27 @@ class VoterAddress(px.BaseXmlModel, frozen=True):
     city: str = px.element(tag="city", max_length=35)
     zip5: str = px.element(tag="zipcode", max_length=5, min_length=5)
 
-    # FUTURE: make `unit_type` and `unit_number` computed fields, based on the
-    # contents of the address lines themselves. Otherwise it's just weirdness?
+    def with_unit_split(self) -> t.Self:
+        """
+        Return a copy with any unit moved out of the address lines.
+
+        A unit found in the address lines (see `voter_tools.pa.address`) is
+        removed from them and put in `unit_type` and `unit_number`. Nothing is
+        changed if either unit field is already set, or no unit is found.
+        """
+        if self.unit_type is not None or self.unit_number is not None:
+            return self
+        address = split_unit(self.address, self.address_2)
+        if address.unit_type is None:
+            return self
+        return self.model_copy(
+            update={
+                "address": address.address,
+                "address_2": address.address_2,
+                "unit_type": get_unit_type_choice(address.unit_type),
+                "unit_number": address.unit_number,
+            }
+        )
 
     @p.field_validator("zip5", mode="after")
     def validate_zip5_has_county(cls, value: str) -> str:
@@ -1071,7 +1175,7 @@ class VoterAddress(px.BaseXmlModel, frozen=True):
         return choice
 
 
-class VoterMailingAddress(px.BaseXmlModel, frozen=True):
+class VoterMailingAddress(XmlModel, frozen=True):
     """07 - Mailing address information for a voter registration application."""
 
     no_street_permanent: Bit = px.element(
@@ -1124,7 +1228,7 @@ class VoterMailingAddress(px.BaseXmlModel, frozen=True):
         return self
 
 
-class VoterIdentification(px.BaseXmlModel, frozen=True):
+class VoterIdentification(XmlModel, frozen=True):
     """08 - Identification information for a voter registration application."""
 
     drivers_license: str | None = px.element(
@@ -1178,7 +1282,7 @@ class VoterIdentification(px.BaseXmlModel, frozen=True):
         return self
 
 
-class VoterPoliticalParty(px.BaseXmlModel, frozen=True):
+class VoterPoliticalParty(XmlModel, frozen=True):
     """09 - Political party information for a voter registration application."""
 
     political_party: PoliticalPartyChoice = px.element(tag="politicalparty")
@@ -1200,7 +1304,7 @@ class VoterPoliticalParty(px.BaseXmlModel, frozen=True):
         return self
 
 
-class VoterAssistance(px.BaseXmlModel, frozen=True):
+class VoterAssistance(XmlModel, frozen=True):
     """10 - Assistance information for a voter registration application."""
 
     require_help_to_vote: Bit = px.element(tag="needhelptovote", default=False)
@@ -1230,7 +1334,7 @@ class VoterAssistance(px.BaseXmlModel, frozen=True):
         return self
 
 
-class VoterChangedInfo(px.BaseXmlModel, frozen=True):
+class VoterChangedInfo(XmlModel, frozen=True):
     """11 - Changed information for a voter registration application."""
 
     # The implementation for this section of the API docs is
@@ -1240,7 +1344,7 @@ class VoterChangedInfo(px.BaseXmlModel, frozen=True):
     pass
 
 
-class VoterDeclaration(px.BaseXmlModel, frozen=True):
+class VoterDeclaration(XmlModel, frozen=True):
     """12 - Declaration information for a voter registration application."""
 
     confirm_declaration: TrueBit = px.element(tag="declaration1")
@@ -1251,7 +1355,7 @@ class VoterDeclaration(px.BaseXmlModel, frozen=True):
     """
 
 
-class VoterHelpWithForm(px.BaseXmlModel, frozen=True):
+class VoterHelpWithForm(XmlModel, frozen=True):
     """13 - Help with form information for a voter registration application."""
 
     assistant_name: str | None = px.element(
@@ -1292,7 +1396,7 @@ class VoterHelpWithForm(px.BaseXmlModel, frozen=True):
         return self
 
 
-class VoterPollWorker(px.BaseXmlModel, frozen=True):
+class VoterPollWorker(XmlModel, frozen=True):
     """14 - Poll worker information for a voter registration application."""
 
     be_poll_worker: Bit | None = px.element(tag="ispollworker", default=None)
@@ -1322,7 +1426,7 @@ class VoterPollWorker(px.BaseXmlModel, frozen=True):
         return self
 
 
-class VoterSecondEmailID(px.BaseXmlModel, frozen=True):
+class VoterSecondEmailID(XmlModel, frozen=True):
     """15 - Second email ID information for a voter registration application."""
 
     alternate_email: p.EmailStr | None = px.element(
@@ -1330,7 +1434,7 @@ class VoterSecondEmailID(px.BaseXmlModel, frozen=True):
     )
 
 
-class VoterTransferPermanentStatusFlag(px.BaseXmlModel, frozen=True):
+class VoterTransferPermanentStatusFlag(XmlModel, frozen=True):
     """16 - Transfer Permanent Status Flag information for a voter reg application."""
 
     transfer_permanent_status: Bit | None = px.element(
@@ -1342,7 +1446,7 @@ class VoterTransferPermanentStatusFlag(px.BaseXmlModel, frozen=True):
     """
 
 
-class VoterMailInBallot(px.BaseXmlModel, frozen=True):
+class VoterMailInBallot(XmlModel, frozen=True):
     """17 - Mail-In Ballot information for a voter registration application."""
 
     is_mail_in: Bit | None = px.element(tag="ismailinballot", default=None)
@@ -1450,7 +1554,7 @@ class VoterApplicationRecord(
 
 
 class VoterApplication(
-    px.BaseXmlModel,
+    XmlModel,
     tag="APIOnlineApplicationData",
     nsmap=NSMAP,
     frozen=True,
@@ -1513,6 +1617,15 @@ class PennsylvaniaAPIClient:
     api_url: str
     api_key: str
     language: int
+    reference: "ReferenceCache | None"
+    """The OVR's reference data, if applications are checked before sending."""
+
+    ballot_reference: "ReferenceCache | None"
+    """The same, for mail-in ballot applications."""
+
+    journal: "SubmissionJournal | None"
+    """A journal of submissions, if re-submissions should be skipped."""
+
     _client: httpx.Client
 
     def __init__(
@@ -1522,15 +1635,32 @@ class PennsylvaniaAPIClient:
         *,
         language: int = 0,
         timeout: float = 5.0,
+        preflight: bool = False,
+        journal: "SubmissionJournal | None" = None,
         # Lower-level parameter for test and debug purposes
         _transport: httpx.BaseTransport | None = None,
     ):
-        """Create a new client for the Pennsylvania OVR API."""
+        """
+        Create a new client for the Pennsylvania OVR API.
+
+        With `preflight`, applications are checked against the OVR's (cached)
+        reference data before they're sent; see `voter_tools.pa.preflight`.
+        With a `journal`, applications that were already accepted aren't sent
+        again; see `voter_tools.pa.journal`.
+        """
         self.api_url = api_url
         self.api_key = api_key
         self.language = language
         mounts = {"all://": _transport} if _transport else None
         self._client = httpx.Client(mounts=mounts, timeout=timeout)
+        self.journal = journal
+        self.reference = None
+        self.ballot_reference = None
+        if preflight:
+            from .preflight import ReferenceCache
+
+            self.reference = ReferenceCache(self)
+            self.ballot_reference = ReferenceCache(self, ballot=True)
 
     @classmethod
     def staging(
@@ -1582,14 +1712,8 @@ class PennsylvaniaAPIClient:
         except Exception as e:
             raise UnparsableResponseError("Invalid JSON returned.") from e
 
-    def _post(
-        self,
-        action: Action,
-        data: XmlElement | str,  # type: ignore
-        params: dict | None = None,
-    ) -> str:
-        """Perform a raw POST request to the Pennsylvania OVR API."""
-        url = self.build_url(action)
+    def _serialize(self, data: XmlElement | str) -> str:  # type: ignore
+        """Serialize request data the way the API expects it."""
         if isinstance(data, XmlElement):
             data_str = xml_tostring(data, encoding="unicode")  # type: ignore
             assert isinstance(data_str, str)
@@ -1603,6 +1727,17 @@ class PennsylvaniaAPIClient:
             data_str = data
 
         assert isinstance(data_str, str), f"DATA was an unexpected type: {type(data)}"
+        return data_str
+
+    def _post(
+        self,
+        action: Action,
+        data: XmlElement | str,  # type: ignore
+        params: dict | None = None,
+    ) -> str:
+        """Perform a raw POST request to the Pennsylvania OVR API."""
+        url = self.build_url(action)
+        data_str = self._serialize(data)
 
         data_jsonable = {"ApplicationData": data_str}
         try:
@@ -1695,28 +1830,77 @@ class PennsylvaniaAPIClient:
         except (px.ParsingError, p.ValidationError) as e:
             raise UnparsableResponseError("Invalid schema returned.") from e
 
-    def set_application(
-        self, application: VoterApplication, raise_validation_error: bool = True
-    ) -> APIResponse:
-        """
-        Submit a voter registration + optional mail-in ballot app.
+    def _preflight(self, action: Action, application: VoterApplication) -> None:
+        """Raise if an application fails pre-flight checks (when enabled)."""
+        reference = (
+            self.ballot_reference
+            if action == Action.SET_BALLOT_APPLICATION
+            else self.reference
+        )
+        if reference is None:
+            return
+        from .preflight import preflight
 
-        If the PA API returns a response with a validation error, and
-        `raise_validation_error` is True, this method will raise an exception.
-        Otherwise, the response will be returned as-is.
-        """
-        xml_tree = application.to_xml_tree()
-        data = self.invoke(Action.SET_APPLICATION, data=xml_tree)
+        error = preflight(application, reference)
+        if error is not None:
+            raise error
+
+    def _send(self, action: Action, data: str) -> tuple[APIResponse, str]:
+        """Send an application; return the API's response, parsed and raw."""
+        response = self.invoke(action, data=data)
         try:
-            api_response = APIResponse.from_xml_tree(data)
+            api_response = APIResponse.from_xml_tree(response)
         except (px.ParsingError, p.ValidationError) as e:
             raise UnparsableResponseError("Invalid schema returned.") from e
+        return api_response, xml_tostring(response, encoding="unicode")  # type: ignore
+
+    def _submit(
+        self,
+        action: Action,
+        application: VoterApplication,
+        raise_validation_error: bool,
+    ) -> APIResponse:
+        """Submit an application, consulting the journal if there is one."""
+        self._preflight(action, application)
+        data = self._serialize(application.to_xml_tree())
+        if self.journal is None:
+            api_response, _ = self._send(action, data)
+        else:
+            from .journal import may_have_been_sent, submission_key
+
+            key = submission_key(self.api_url, action.value, data)
+            previous = self.journal.begin(key)
+            if previous is not None and previous.response is not None:
+                api_response = APIResponse.from_xml(previous.response)
+            else:
+                try:
+                    api_response, raw = self._send(action, data)
+                except Exception as e:
+                    # Unless the request never left, it stays in flight:
+                    # the OVR may or may not have the application.
+                    if not may_have_been_sent(e):
+                        self.journal.finish(key, False, None)
+                    raise
+                self.journal.finish(key, not api_response.has_error(), raw)
         # CONSIDER allowing callers to decide whether to raise here or not.
         if raise_validation_error:
             api_response.raise_for_error()
             assert not api_response.has_error()
         return api_response
 
+    def set_application(
+        self, application: VoterApplication, raise_validation_error: bool = True
+    ) -> APIResponse:
+        """
+        Submit a voter registration + optional mail-in ballot app.
+
+        If the PA API returns a response with a validation error, and
+        `raise_validation_error` is True, this method will raise an exception.
+        Otherwise, the response will be returned as-is. Applications that fail
+        pre-flight checks always raise, since there's no response to return.
+        """
+        return self._submit(Action.SET_APPLICATION, application, raise_validation_error)
+
     def set_ballot_application(
         self, application: VoterApplication, raise_validation_error: bool = True
     ) -> APIResponse:
@@ -1725,16 +1909,9 @@ class PennsylvaniaAPIClient:
 
         If the PA API returns a response with a validation error, and
         `raise_validation_error` is True, this method will raise an exception.
-        Otherwise, the response will be returned as-is.
+        Otherwise, the response will be returned as-is. Applications that fail
+        pre-flight checks always raise, since there's no response to return.
         """
-        data = self.invoke(
-            Action.SET_BALLOT_APPLICATION, data=application.to_xml_tree()
+        return self._submit(
+            Action.SET_BALLOT_APPLICATION, application, raise_validation_error
         )
-        try:
-            api_response = APIResponse.from_xml_tree(data)
-        except (px.ParsingError, p.ValidationError) as e:
-            raise UnparsableResponseError("Invalid schema returned.") from e
-        if raise_validation_error:
-            api_response.raise_for_error()
-            assert not api_response.has_error()
-        return api_response
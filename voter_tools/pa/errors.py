@@ -1,3 +1,4 @@
+import functools
 import typing as t
 
 import pydantic as p
@@ -71,7 +72,7 @@ class APIValidationError(APIError):
     def __init__(self, errors: t.Iterable[APIErrorDetails]) -> None:
         """Initialize the error with the given errors."""
         self._errors = tuple(errors)
-        locs = ", ".join(str(error.loc) for error in errors)
+        locs = ", ".join(str(error.loc) for error in self._errors)
         message = f"Validation errors on {locs}"
         if len(self._errors) == 1:
             message += f": {self._errors[0].msg}"
@@ -144,15 +145,23 @@ def build_error_for_codes(codes: tuple[str, ...]) -> APIError | None:
     """
     Return the single most appropriate error for a collection of PA API codes.
 
-    If no codes are provided, None is returned.
+    If no codes are provided, None is returned. The error is always a new
+    object, so it's safe to raise (and to attach a traceback to).
+
+    The result is the same as merging the errors for each code with
+    `merge_errors`, but without building the intermediate errors.
     """
-    errors: list[APIError] = []
+    if not codes:
+        return None
+    if len(codes) == 1:
+        return _copy_error(_resolve_error_code(codes[0]))
+    details: list[APIErrorDetails] = []
     for code in codes:
-        error = ERROR_MAP.get(_simplify_error_code(code))
-        if error is None:
-            error = APIValidationError.unexpected(code)
-        errors.append(error)
-    return merge_errors(errors)
+        error = _resolve_error_code(code)
+        if not isinstance(error, APIValidationError):
+            return _copy_error(error)
+        details.extend(error._errors)
+    return APIValidationError(details)
 
 
 # A collection of mappings from known API error codes to error behaviors.
@@ -401,3 +410,35 @@ def _simplify_error_code(code: str) -> str:
 ERROR_MAP: dict[str, APIError] = {
     _simplify_error_code(code): error for code, error in BASE_ERROR_MAP.items()
 }
+
+
+# The errors in the maps above are shared prototypes; they're never raised
+# directly. Each response gets fresh copies from `_copy_error`.
+
+
+@functools.lru_cache(maxsize=1024)
+def _resolve_near_miss(code: str) -> APIError:
+    """Resolve a code missing from `BASE_ERROR_MAP` via its simplified form."""
+    error = ERROR_MAP.get(_simplify_error_code(code))
+    if error is None:
+        error = APIValidationError.unexpected(code)
+    return error
+
+
+def _resolve_error_code(code: str) -> APIError:
+    """Return the prototype error for a PA API code."""
+    # Exact codes are by far the most common, so check them first. The
+    # sandbox's "near miss" codes are few, and are remembered once resolved.
+    error = BASE_ERROR_MAP.get(code)
+    return error if error is not None else _resolve_near_miss(code)
+
+
+def _copy_error(error: APIError) -> APIError:
+    """Return a new error just like a prototype error."""
+    # Skip __init__: the prototype's message and (frozen) error details can
+    # be shared; only the exception object itself, which picks up a
+    # traceback and context when raised, must be new.
+    copy = type(error).__new__(type(error))
+    copy.__dict__.update(error.__dict__)
+    copy.args = error.args
+    return copy
@@ -0,0 +1,244 @@
+"""
+A journal of application submissions, so re-runs don't submit twice.
+
+When `set_application` times out, there's no telling whether the OVR created
+an application. Retrying risks a duplicate; not retrying risks losing the
+voter. `SubmissionJournal` records each submission (by a hash of its
+content) before it's sent, and its outcome after:
+
+- Submissions that succeeded aren't sent again; the journal answers with
+  the original response.
+- Submissions that failed (the API answered with an error, or the request
+  never left, say, because the connection was refused) may be re-sent.
+- Submissions that never got an answer are *ambiguous*, and are refused
+  with `AmbiguousSubmissionError` until they're reconciled with `resolve()`
+  (say, after asking the PA Department of State about them).
+"""
+
+import datetime
+import hashlib
+import sqlite3
+import threading
+import typing as t
+from enum import Enum
+from xml.sax.saxutils import escape
+
+import httpx
+import pydantic as p
+
+from ..errors import APIError
+from ..store import utc_now
+
+
+class SubmissionStatus(str, Enum):
+    """Where a submission stands."""
+
+    IN_FLIGHT = "in_flight"
+    """Sent (or about to be), with no answer recorded."""
+
+    SUCCEEDED = "succeeded"
+    """The OVR created an application."""
+
+    FAILED = "failed"
+    """
+    The OVR answered with an error, or the request never left; the submission
+    may be retried.
+    """
+
+
+class Submission(p.BaseModel, frozen=True):
+    """A journaled submission."""
+
+    key: str
+    """The hash of the submitted application."""
+
+    status: SubmissionStatus
+    response: str | None = None
+    """The API's response (as XML), once there is one."""
+
+    updated_at: datetime.datetime
+
+
+class AmbiguousSubmissionError(APIError):
+    """Raised when an earlier submission of an application never got an answer."""
+
+    submission: Submission
+
+    def __init__(self, submission: Submission):
+        """Create an error for the given (in-flight) submission."""
+        super().__init__(
+            f"Application {submission.key[:12]} was submitted at "
+            f"{submission.updated_at.isoformat()} with no answer; resolve it "
+            "before submitting it again."
+        )
+        self.submission = submission
+
+
+def submission_key(api_url: str, action: str, data: str) -> str:
+    """
+    Return the journal key for a serialized application.
+
+    The same application sent as a different action (say, a ballot rather
+    than a registration application) or to a different API (staging, then
+    production) is a different submission.
+    """
+    digest = hashlib.sha256()
+    for part in (api_url, action, data):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+# Failures that happen before any of a request reaches the server.
+_NOT_SENT = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.PoolTimeout,
+    httpx.UnsupportedProtocol,
+)
+
+
+def may_have_been_sent(error: BaseException) -> bool:
+    """
+    Return True unless `error` shows that a request never left.
+
+    The client wraps `httpx` errors in its own, so the whole chain of causes
+    is searched.
+    """
+    seen: BaseException | None = error
+    while seen is not None:
+        if isinstance(seen, _NOT_SENT):
+            return False
+        seen = seen.__cause__ or seen.__context__
+    return True
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    key TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    response TEXT,
+    updated_at TEXT NOT NULL
+)
+"""
+
+
+class SubmissionJournal:
+    """
+    A SQLite journal of application submissions.
+
+    The journal may be shared between threads. Unlike `ResultStore`, every
+    change is committed straight away: the point is to survive a crash
+    between sending an application and hearing back.
+    """
+
+    path: str
+
+    _connection: sqlite3.Connection
+    _lock: threading.Lock
+
+    def __init__(self, path: str):
+        """Open (creating, if needed) the journal at `path`."""
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(_SCHEMA)
+        self._connection.commit()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Submission | None:
+        row = self._connection.execute(
+            "SELECT status, response, updated_at FROM submissions WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        status, response, updated_at = row
+        return Submission(
+            key=key,
+            status=SubmissionStatus(status),
+            response=response,
+            updated_at=datetime.datetime.fromisoformat(updated_at),
+        )
+
+    def _put(
+        self, key: str, status: SubmissionStatus, response: str | None = None
+    ) -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO submissions (key, status, response, updated_at) "
+            "VALUES (?, ?, ?, ?)",
+            (key, status.value, response, utc_now().isoformat()),
+        )
+        self._connection.commit()
+
+    def get(self, key: str) -> Submission | None:
+        """Return the journaled submission with the given key, if any."""
+        with self._lock:
+            return self._get(key)
+
+    def begin(self, key: str) -> Submission | None:
+        """
+        Record that a submission is about to be sent.
+
+        Return the earlier submission if it succeeded, in which case nothing
+        should be sent. Raise `AmbiguousSubmissionError` if an earlier
+        submission never got an answer. Otherwise, return None.
+        """
+        with self._lock:
+            previous = self._get(key)
+            if previous is not None:
+                if previous.status == SubmissionStatus.SUCCEEDED:
+                    return previous
+                if previous.status == SubmissionStatus.IN_FLIGHT:
+                    raise AmbiguousSubmissionError(previous)
+            self._put(key, SubmissionStatus.IN_FLIGHT)
+        return None
+
+    def finish(self, key: str, succeeded: bool, response: str | None) -> None:
+        """Record the API's answer to a submission (or that it wasn't sent)."""
+        status = SubmissionStatus.SUCCEEDED if succeeded else SubmissionStatus.FAILED
+        with self._lock:
+            self._put(key, status, response)
+
+    def ambiguous(self) -> list[Submission]:
+        """Return the submissions that never got an answer."""
+        with self._lock:
+            keys = [
+                key
+                for (key,) in self._connection.execute(
+                    "SELECT key FROM submissions WHERE status = ? ORDER BY updated_at",
+                    (SubmissionStatus.IN_FLIGHT.value,),
+                )
+            ]
+            return [s for s in map(self._get, keys) if s is not None]
+
+    def resolve(self, key: str, application_id: str | None = None) -> None:
+        """
+        Reconcile an ambiguous submission.
+
+        Pass the application's ID if the OVR turns out to have created it;
+        otherwise the submission is marked failed, and may be sent again.
+        """
+        if application_id is None:
+            status, response = SubmissionStatus.FAILED, None
+        else:
+            status = SubmissionStatus.SUCCEEDED
+            application_id = escape(application_id)
+            response = (
+                f"<RESPONSE><APPLICATIONID>{application_id}</APPLICATIONID></RESPONSE>"
+            )
+        with self._lock:
+            self._put(key, status, response)
+
+    def close(self) -> None:
+        """Close the journal."""
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> t.Self:
+        """Return the journal itself."""
+        return self
+
+    def __exit__(self, *exc_info: t.Any) -> None:
+        """Close the journal."""
+        self.close()
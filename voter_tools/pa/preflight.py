@@ -0,0 +1,216 @@
+"""
+Check PA applications against the OVR's own reference data before sending.
+
+Many submissions fail with validation codes for values the OVR could have
+told us about up front: an unknown county, unit type, suffix, or party. The
+OVR publishes its valid values (via the *SETUP and GETMUNICIPALITIES calls),
+and they rarely change. `ReferenceCache` keeps a copy, refreshed in the
+background, and `preflight` checks an application against it, reporting
+problems as an `APIValidationError` like the one the API would have sent. An
+application that fails pre-flight never costs a round trip.
+"""
+
+import threading
+import time
+import typing as t
+
+from ..errors import APIError
+from .client import (
+    MunicipalitiesResponse,
+    PennsylvaniaAPIClient,
+    SetupResponse,
+    VoterApplication,
+    VoterApplicationRecord,
+)
+from .counties import get_county_choice
+from .errors import BASE_ERROR_MAP, APIErrorDetails, APIValidationError
+
+T = t.TypeVar("T")
+
+
+class ReferenceCache:
+    """
+    A cache of the OVR's reference data, refreshed in the background.
+
+    The first use of each piece of data fetches it. After that, the cached
+    copy is always returned straight away; once it's older than `max_age`, a
+    background thread fetches a new one. If that fails, the old copy stays,
+    and the error is kept in `last_error`.
+    """
+
+    client: PennsylvaniaAPIClient
+    max_age: float
+    """How long (in seconds) data is used before it's refreshed."""
+
+    ballot: bool
+    """If True, use the mail-in ballot application's setup data."""
+
+    last_error: APIError | None
+    """The error from the most recent failed background refresh, if any."""
+
+    _clock: t.Callable[[], float]
+    _entries: dict[str, tuple[t.Any, float]]
+    _refreshing: set[str]
+    _choices: tuple[SetupResponse, dict[str, frozenset[str]]] | None
+    _lock: threading.Lock
+
+    def __init__(
+        self,
+        client: PennsylvaniaAPIClient,
+        max_age: float = 24 * 60 * 60,
+        ballot: bool = False,
+        clock: t.Callable[[], float] = time.monotonic,
+    ):
+        """Create a cache of the reference data served by `client`."""
+        self.client = client
+        self.max_age = max_age
+        self.ballot = ballot
+        self.last_error = None
+        self._clock = clock
+        self._entries = {}
+        self._refreshing = set()
+        self._choices = None
+        self._lock = threading.Lock()
+
+    def setup(self) -> SetupResponse:
+        """Return the OVR's *SETUP data."""
+        fetch = (
+            self.client.get_ballot_application_setup
+            if self.ballot
+            else self.client.get_application_setup
+        )
+        return self._get("setup", fetch)
+
+    def municipalities(self, county: str) -> MunicipalitiesResponse:
+        """Return the OVR's municipalities for a county."""
+        county = county.upper()
+        return self._get(
+            f"municipalities:{county}", lambda: self.client.get_municipalities(county)
+        )
+
+    def choices(self, name: str) -> frozenset[str]:
+        """Return the valid codes for one of the `SetupResponse` option lists."""
+        setup = self.setup()
+        with self._lock:
+            if self._choices is None or self._choices[0] is not setup:
+                self._choices = (setup, {})
+            by_name = self._choices[1]
+            if name not in by_name:
+                options = getattr(setup, name)
+                by_name[name] = frozenset(str(option.code) for option in options)
+            return by_name[name]
+
+    def _get(self, key: str, fetch: t.Callable[[], T]) -> T:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            value = fetch()
+            with self._lock:
+                self._entries[key] = (value, self._clock())
+            return value
+        value, fetched_at = entry
+        if self._clock() - fetched_at >= self.max_age:
+            self._refresh_in_background(key, fetch)
+        return value
+
+    def _refresh_in_background(self, key: str, fetch: t.Callable[[], t.Any]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        thread = threading.Thread(
+            target=self._refresh, args=(key, fetch), name="pa-reference", daemon=True
+        )
+        thread.start()
+
+    def _refresh(self, key: str, fetch: t.Callable[[], t.Any]) -> None:
+        try:
+            value = fetch()
+        except APIError as e:
+            self.last_error = e
+        else:
+            with self._lock:
+                self._entries[key] = (value, self._clock())
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+# -----------------------------------------------------------------------------
+# Pre-flight checks
+# -----------------------------------------------------------------------------
+
+# Record fields checked against one of the option lists in `SetupResponse`.
+_CHOICE_FIELDS: tuple[tuple[str, str], ...] = (
+    ("suffix", "suffixes"),
+    ("race", "races"),
+    ("gender", "genders"),
+    ("unit_type", "unit_types"),
+    ("mailing_state", "states"),
+    ("political_party", "political_parties"),
+    ("assistance_type", "assistance_types"),
+    ("mail_in_address_type", "mailin_address_types"),
+    ("mail_in_state", "states"),
+)
+
+# The API lists trailers as both TRL and TRLR.
+_ALIASES = {"TRL": "TRLR", "TRLR": "TRL"}
+
+# Fields whose errors are reported just as the API would report them.
+_API_ERRORS = {
+    "political_party": "VR_WAPI_InvalidOVRPoliticalParty",
+    "previous_county": "VR_WAPI_InvalidOVRPreviousCounty",
+}
+
+
+def _invalid(field: str, msg: str) -> tuple[APIErrorDetails, ...]:
+    code = _API_ERRORS.get(field)
+    error = BASE_ERROR_MAP.get(code) if code else None
+    if isinstance(error, APIValidationError):
+        return error.errors()
+    return (APIErrorDetails(type="invalid", msg=msg, loc=(field,)),)
+
+
+def _check_choices(
+    record: VoterApplicationRecord, cache: ReferenceCache
+) -> t.Iterator[APIErrorDetails]:
+    for field, name in _CHOICE_FIELDS:
+        value = getattr(record, field)
+        code = getattr(value, "value", value)
+        if not code:
+            continue
+        choices = cache.choices(name)
+        if code not in choices and _ALIASES.get(code) not in choices:
+            yield from _invalid(field, f"'{code}' is not a valid choice.")
+
+
+def _county_known(county: str, cache: ReferenceCache) -> bool:
+    names = {c.name.upper() for c in cache.setup().counties if c.name}
+    return county in names and bool(cache.municipalities(county).municipalities)
+
+
+def _check_counties(
+    record: VoterApplicationRecord, cache: ReferenceCache
+) -> t.Iterator[APIErrorDetails]:
+    county = get_county_choice(record.zip5)
+    if county is None or not _county_known(county.value, cache):
+        yield from _invalid("zip5", "This ZIP code's county is unknown to the OVR.")
+    if record.previous_zip5 is None:
+        return
+    previous = get_county_choice(record.previous_zip5)
+    if previous is None or not _county_known(previous.value, cache):
+        yield from _invalid("previous_county", "Unknown county.")
+
+
+def preflight(
+    application: VoterApplication, cache: ReferenceCache
+) -> APIValidationError | None:
+    """
+    Check an application against the OVR's reference data.
+
+    Return the validation errors the API would (likely) report, or None if
+    the application looks good.
+    """
+    record = application.record
+    details = [*_check_choices(record, cache), *_check_counties(record, cache)]
+    return APIValidationError(details) if details else None
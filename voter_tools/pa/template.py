@@ -0,0 +1,193 @@
+"""
+Notice when the PA OVR's application XML template changes.
+
+The OVR publishes the XML template it expects (via GETXMLTEMPLATE and
+GETBALLOTXMLTEMPLATE), and `VoterApplicationRecord` declares the elements we
+send. If the two drift apart, submissions start failing. `TemplateWatch`
+keeps a fingerprint (a hash of the canonicalized template) of each template,
+re-checks them on a schedule, and reports which elements the template has
+gained or lost compared to `VoterApplicationRecord`.
+"""
+
+import functools
+import hashlib
+import json
+import pathlib
+import time
+import typing as t
+import xml.etree.ElementTree as ET
+
+import pydantic as p
+from pydantic_xml.fields import ComputedXmlEntityInfo, EntityLocation, XmlEntityInfo
+
+from .client import PennsylvaniaAPIClient, VoterApplicationRecord, xml_tostring
+
+
+def _local_name(tag: str) -> str:
+    """Return an element's tag without its namespace or prefix."""
+    return tag.rsplit("}", 1)[-1].rsplit(":", 1)[-1]
+
+
+@functools.cache
+def record_tags(model: type[p.BaseModel] = VoterApplicationRecord) -> frozenset[str]:
+    """Return the XML element tags a record model declares."""
+    fields: list[tuple[str, t.Any]] = [
+        *(
+            (name, info)
+            for name, f in model.model_fields.items()
+            for info in f.metadata
+        ),
+        *model.model_computed_fields.items(),
+    ]
+    return frozenset(
+        # Elements without an explicit tag are named for their field.
+        info.path or name
+        for name, info in fields
+        if isinstance(info, (XmlEntityInfo, ComputedXmlEntityInfo))
+        and info.location == EntityLocation.ELEMENT
+    )
+
+
+def template_tags(template: t.Any) -> frozenset[str]:
+    """Return the element tags of a template's `record` element."""
+    record = next(
+        (e for e in template.iter() if _local_name(str(e.tag)) == "record"), template
+    )
+    return frozenset(_local_name(str(child.tag)) for child in record)
+
+
+def fingerprint(template: t.Any) -> str:
+    """
+    Return a hash of a template, canonicalized.
+
+    Whitespace and attribute order don't change the fingerprint; elements
+    added, removed, or reordered do.
+    """
+    text = xml_tostring(template, encoding="unicode")
+    canonical = ET.canonicalize(text, strip_text=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class TemplateFingerprint(p.BaseModel, frozen=True):
+    """What we know about a template from when we last fetched it."""
+
+    name: str
+    digest: str
+    tags: frozenset[str]
+    checked_at: float
+    """When the template was fetched, by the watch's clock."""
+
+
+class TemplateDrift(p.BaseModel, frozen=True):
+    """The result of checking a template."""
+
+    name: str
+    digest: str
+    previous_digest: str | None
+    """The template's previous fingerprint, if it was checked before."""
+
+    added: tuple[str, ...]
+    """Elements in the template that `VoterApplicationRecord` doesn't declare."""
+
+    removed: tuple[str, ...]
+    """Elements `VoterApplicationRecord` declares that the template lacks."""
+
+    @property
+    def changed(self) -> bool:
+        """Return True if the template changed since it was last checked."""
+        return self.previous_digest is not None and self.previous_digest != self.digest
+
+    @property
+    def matches_record(self) -> bool:
+        """Return True if the template has just the elements we send."""
+        return not self.added and not self.removed
+
+
+class TemplateWatch:
+    """
+    Fingerprints of the OVR's XML templates, re-checked on a schedule.
+
+    `check()` fetches a template only once it's due (`interval` seconds after
+    it was last fetched), so it can be called as often as is convenient. With
+    a `path`, fingerprints are kept in a JSON file, so that successive runs
+    notice changes made between them.
+    """
+
+    client: PennsylvaniaAPIClient
+    interval: float
+    """How long (in seconds) to wait between fetches of each template."""
+
+    path: pathlib.Path | None
+
+    _clock: t.Callable[[], float]
+    _fingerprints: dict[str, TemplateFingerprint]
+
+    def __init__(
+        self,
+        client: PennsylvaniaAPIClient,
+        interval: float = 24 * 60 * 60,
+        path: str | pathlib.Path | None = None,
+        clock: t.Callable[[], float] = time.time,
+    ):
+        """Create a watch over the templates served by `client`."""
+        self.client = client
+        self.interval = interval
+        self.path = pathlib.Path(path) if path is not None else None
+        self._clock = clock
+        self._fingerprints = {}
+        if self.path is not None and self.path.exists():
+            data = json.loads(self.path.read_text())
+            for item in data:
+                fp = TemplateFingerprint.model_validate(item)
+                self._fingerprints[fp.name] = fp
+
+    def _fetchers(self) -> dict[str, t.Callable[[], t.Any]]:
+        return {
+            "application": self.client.get_xml_template,
+            "ballot": self.client.get_ballot_xml_template,
+        }
+
+    def fingerprint(self, name: str) -> TemplateFingerprint | None:
+        """Return the last fingerprint of a template, if any."""
+        return self._fingerprints.get(name)
+
+    def check(self, name: str = "application", force: bool = False) -> TemplateDrift:
+        """
+        Check a template (`application` or `ballot`) against its fingerprint.
+
+        The template is fetched only if it's due, or if `force` is True;
+        otherwise, the report is based on the stored fingerprint.
+        """
+        fetch = self._fetchers()[name]
+        previous = self._fingerprints.get(name)
+        now = self._clock()
+        if previous is None or force or now - previous.checked_at >= self.interval:
+            template = fetch()
+            current = TemplateFingerprint(
+                name=name,
+                digest=fingerprint(template),
+                tags=template_tags(template),
+                checked_at=now,
+            )
+            self._fingerprints[name] = current
+            self._save()
+        else:
+            current = previous
+        declared = record_tags()
+        return TemplateDrift(
+            name=name,
+            digest=current.digest,
+            previous_digest=previous.digest if previous is not None else None,
+            added=tuple(sorted(current.tags - declared)),
+            removed=tuple(sorted(declared - current.tags)),
+        )
+
+    def check_all(self, force: bool = False) -> list[TemplateDrift]:
+        """Check every template."""
+        return [self.check(name, force=force) for name in self._fetchers()]
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        data = [fp.model_dump(mode="json") for fp in self._fingerprints.values()]
+        self.path.write_text(json.dumps(data, indent=2))
@@ -0,0 +1,423 @@
+"""
+Retries and circuit breaking for requests to state voter registration sites.
+
+State portals are slow, flaky, and occasionally down for hours. Registration
+lookups are idempotent, so it is always safe to retry them on connection
+errors, timeouts, throttling (429), and server errors (5xx). When a portal is
+down entirely, a per-state circuit breaker makes callers fail fast instead of
+waiting out a full timeout for every single lookup.
+
+Both mechanisms live in `RetryTransport`, an httpx transport that wraps
+another transport. Every `CheckRegistrationTool` installs one by default.
+
+A request may carry a `DEADLINE` extension: the `time.monotonic()` time by
+which it must be answered, retries included. Each attempt's timeouts are cut
+to the time remaining, and retries that couldn't finish in time aren't made.
+A timeout at the deadline doesn't count against the circuit breaker.
+"""
+
+import datetime
+import random
+import threading
+import time
+import typing as t
+from email.utils import parsedate_to_datetime
+from enum import Enum
+
+import httpx
+import pydantic as p
+
+from .errors import CircuitOpenError
+from .metrics import StateMetrics
+
+# -----------------------------------------------------------------------------
+# Retry policy
+# -----------------------------------------------------------------------------
+
+DEADLINE = "voter_tools.deadline"
+"""
+The request extension holding a request's deadline, if it has one.
+
+The deadline is a `time.monotonic()` time.
+"""
+
+
+def with_deadline(request: httpx.Request, deadline: float) -> None:
+    """Cut a request's timeouts so that none runs past `deadline`."""
+    remaining = max(0.0, deadline - time.monotonic())
+    timeouts = request.extensions.get("timeout", {})
+    request.extensions = {
+        **request.extensions,
+        "timeout": {
+            name: remaining
+            if timeouts.get(name) is None
+            else min(timeouts[name], remaining)
+            for name in ("connect", "read", "write", "pool")
+        },
+    }
+
+
+def past_deadline(request: httpx.Request) -> bool:
+    """
+    Return True if a request has a deadline, and it has passed.
+
+    A timeout past the deadline is most likely one `with_deadline` cut short:
+    it says the caller ran out of time, not that the service is slow.
+    """
+    deadline: float | None = request.extensions.get(DEADLINE)
+    return deadline is not None and time.monotonic() >= deadline
+
+
+class RetryPolicy(p.BaseModel, frozen=True):
+    """How (and how often) to retry failed requests."""
+
+    max_attempts: int = p.Field(default=3, ge=1)
+    """Total number of attempts, including the first one."""
+
+    base_delay: float = p.Field(default=0.5, ge=0.0)
+    """Delay before the first retry, in seconds, before jitter is applied."""
+
+    multiplier: float = p.Field(default=2.0, ge=1.0)
+    """Factor by which the delay grows with each retry."""
+
+    max_delay: float = p.Field(default=10.0, ge=0.0)
+    """Upper bound on any single backoff delay, in seconds."""
+
+    jitter: float = p.Field(default=1.0, ge=0.0, le=1.0)
+    """
+    Fraction of each delay that is randomized.
+
+    1.0 is "full jitter": the delay is uniform between zero and the capped
+    exponential delay. 0.0 disables jitter entirely.
+    """
+
+    max_retry_after: float = p.Field(default=30.0, ge=0.0)
+    """
+    The longest `Retry-After` we are willing to wait, in seconds.
+
+    If a server asks us to wait longer, we give up and return its response.
+    """
+
+    retry_statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+    """HTTP status codes that are worth retrying."""
+
+    def backoff(self, retry: int, rng: random.Random | None = None) -> float:
+        """Return the delay, in seconds, before the given retry (1-based)."""
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** (retry - 1))
+        sample = rng.random() if rng is not None else random.random()
+        return ceiling * (1.0 - self.jitter * sample)
+
+
+NO_RETRIES = RetryPolicy(max_attempts=1)
+"""A policy that never retries; requests still go through the breaker."""
+
+
+def parse_retry_after(
+    value: str | None, now: datetime.datetime | None = None
+) -> float | None:
+    """
+    Parse a `Retry-After` header value into a number of seconds.
+
+    The header is either a number of seconds or an HTTP date. Return None if
+    the header is missing or can't be parsed.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.UTC)
+    now = now or datetime.datetime.now(datetime.UTC)
+    return max(0.0, (when - now).total_seconds())
+
+
+# -----------------------------------------------------------------------------
+# Circuit breakers
+# -----------------------------------------------------------------------------
+
+
+class CircuitState(str, Enum):
+    """The state of a circuit breaker."""
+
+    CLOSED = "closed"
+    """Requests flow normally."""
+
+    OPEN = "open"
+    """Requests fail immediately, without touching the network."""
+
+    HALF_OPEN = "half_open"
+    """A single trial request is allowed through to probe the service."""
+
+
+class CircuitBreaker:
+    """
+    A thread-safe circuit breaker.
+
+    After `failure_threshold` consecutive failures the breaker opens, and
+    requests fail fast for `reset_timeout` seconds. After that, a single trial
+    request is let through: if it succeeds the breaker closes again, and if
+    it fails the breaker re-opens for another `reset_timeout`.
+    """
+
+    failure_threshold: int
+    reset_timeout: float
+    _clock: t.Callable[[], float]
+    _lock: threading.Lock
+    _state: CircuitState
+    _failures: int
+    _opened_at: float
+    _trial_in_flight: bool
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        *,
+        clock: t.Callable[[], float] = time.monotonic,
+    ):
+        """Create a new, closed, circuit breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        """Return the current state of the breaker."""
+        with self._lock:
+            if (
+                self._state == CircuitState.OPEN
+                and self._clock() - self._opened_at >= self.reset_timeout
+            ):
+                return CircuitState.HALF_OPEN
+            return self._state
+
+    def retry_in(self) -> float:
+        """Return the number of seconds until the breaker will allow a trial."""
+        with self._lock:
+            if self._state != CircuitState.OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.reset_timeout - self._clock())
+
+    def allow(self) -> bool:
+        """Return True if a request may be attempted right now."""
+        with self._lock:
+            if self._state == CircuitState.CLOSED:
+                return True
+            if self._state == CircuitState.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = CircuitState.HALF_OPEN
+                self._trial_in_flight = False
+            # Half-open: let exactly one trial request through at a time.
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        """Record a successful request, closing the breaker."""
+        with self._lock:
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the breaker if needed."""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if (
+                self._state == CircuitState.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                self._state = CircuitState.OPEN
+                self._opened_at = self._clock()
+
+    def record_abandoned(self) -> None:
+        """
+        Record a request that was given up on before reaching the service.
+
+        This says nothing about the service's health, but frees up the
+        half-open trial, if the request was it.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def reset(self) -> None:
+        """Forget all history and close the breaker."""
+        self.record_success()
+
+
+_BREAKERS: dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_breaker(state: str) -> CircuitBreaker:
+    """
+    Return the shared circuit breaker for a given state's portal.
+
+    All tools for a state share a breaker, so that one tool discovering that
+    a portal is down spares every other tool the wait.
+    """
+    state = state.upper()
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(state)
+        if breaker is None:
+            breaker = _BREAKERS[state] = CircuitBreaker()
+        return breaker
+
+
+def reset_breakers() -> None:
+    """Close every shared circuit breaker. Mostly useful in tests."""
+    with _BREAKERS_LOCK:
+        for breaker in _BREAKERS.values():
+            breaker.reset()
+
+
+# -----------------------------------------------------------------------------
+# Retrying transport
+# -----------------------------------------------------------------------------
+
+
+class RetryTransport(httpx.BaseTransport):
+    """
+    An httpx transport that retries requests and consults a circuit breaker.
+
+    Only install this in front of idempotent requests: every request sent
+    through it, including POSTs, may be sent more than once.
+    """
+
+    _transport: httpx.BaseTransport
+    policy: RetryPolicy
+    breaker: CircuitBreaker | None
+    name: str
+    metrics: StateMetrics | None
+    _sleep: t.Callable[[float], None]
+    _rng: random.Random
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport,
+        policy: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        *,
+        name: str = "service",
+        metrics: StateMetrics | None = None,
+        sleep: t.Callable[[float], None] = time.sleep,
+        rng: random.Random | None = None,
+    ):
+        """
+        Wrap `transport` with retries and (optionally) a circuit breaker.
+
+        If `metrics` are given, retries are counted there.
+        """
+        self._transport = transport
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker
+        self.name = name
+        self.metrics = metrics
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+
+    def _check_breaker(self) -> None:
+        if self.breaker is not None and not self.breaker.allow():
+            raise CircuitOpenError(self.name, self.breaker.retry_in())
+
+    def _record(self, success: bool) -> None:
+        if self.breaker is None:
+            return
+        if success:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def _retry_after(self, delay: float) -> None:
+        if self.metrics is not None:
+            self.metrics.increment("retries")
+        self._sleep(delay)
+
+    def _too_late(self, deadline: float | None, delay: float) -> bool:
+        """Return True if a retry after `delay` would start past the deadline."""
+        return deadline is not None and time.monotonic() + delay >= deadline
+
+    def _response_retry_delay(
+        self, response: httpx.Response, attempt: int, deadline: float | None
+    ) -> float | None:
+        """Return how long to wait before retrying a response, or None to give up."""
+        if attempt >= self.policy.max_attempts:
+            return None
+        delay = self.policy.backoff(attempt, self._rng)
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            if retry_after > self.policy.max_retry_after:
+                return None
+            delay = max(delay, retry_after)
+        if self._too_late(deadline, delay):
+            return None
+        return delay
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, retrying it according to the policy."""
+        # Make sure the body is buffered so that it can be re-sent.
+        request.read()
+        deadline: float | None = request.extensions.get(DEADLINE)
+        attempt = 1
+        while True:
+            self._check_breaker()
+            last_attempt = attempt >= self.policy.max_attempts
+            if deadline is not None:
+                with_deadline(request, deadline)
+            try:
+                response = self._transport.handle_request(request)
+            except httpx.TransportError as e:
+                # Waiting for a slot, or running out of the caller's time,
+                # says nothing about the portal's health.
+                if isinstance(e, httpx.PoolTimeout) or (
+                    isinstance(e, httpx.TimeoutException) and past_deadline(request)
+                ):
+                    if self.breaker is not None:
+                        self.breaker.record_abandoned()
+                    raise
+                self._record(success=False)
+                delay = self.policy.backoff(attempt, self._rng)
+                if last_attempt or self._too_late(deadline, delay):
+                    raise
+                self._retry_after(delay)
+                attempt += 1
+                continue
+            except Exception:
+                # Never leave a half-open breaker waiting on a lost trial.
+                self._record(success=False)
+                raise
+
+            status = response.status_code
+            if status not in self.policy.retry_statuses:
+                self._record(success=True)
+                return response
+
+            # Throttling means the portal is up, just busy: it doesn't count
+            # against the breaker. Server errors do.
+            self._record(success=status == 429)
+            retry_delay = self._response_retry_delay(response, attempt, deadline)
+            if retry_delay is None:
+                return response
+            response.read()
+            response.close()
+            self._retry_after(retry_delay)
+            attempt += 1
+
+    def close(self) -> None:
+        """Close the wrapped transport."""
+        self._transport.close()
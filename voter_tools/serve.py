@@ -0,0 +1,572 @@
+"""
+Registration checks as an HTTP service.
+
+`ServiceApp` is an ASGI application that answers registration checks:
+
+- `POST /check` takes a JSON object with `first_name`, `last_name`,
+  `zipcode`, `birth_date`, and optionally `details`, and answers with a JSON
+  object describing the outcome.
+- `POST /check/batch` takes newline-delimited JSON (one such object per
+  line, each optionally with an `id`), and streams back one line per check,
+  as each finishes, with the `index` of its input line. Batch checks wait
+  in the bulk lane of each state's concurrency limiter, so single checks
+  go ahead of them.
+- `GET /metrics` serves per-state metrics in the Prometheus text format.
+
+Unlike a web app that builds a tool per request, a `CheckService` lives as
+long as the process. Each state gets one long-lived async tool, so
+connections to its portal are pooled and its circuit breaker and
+concurrency limiter see every request. Recent results are cached,
+concurrent checks of the same voter share a single request to the state,
+and each client is rate limited.
+
+Run it with `vote serve`, which needs an ASGI server
+(`pip install 'voter-tools[serve]'`), or mount `ServiceApp` in your own.
+"""
+
+import asyncio
+import datetime
+import json
+import math
+import time
+import typing as t
+from collections import Counter, OrderedDict
+
+import pydantic as p
+
+from . import _CHECK_TOOLS
+from .aio import AsyncCheckRegistrationTool, get_async_check_tool
+from .bulk import CheckKey, CheckOutcome, CheckRequest, record_outcome
+from .concurrency import Priority
+from .errors import CheckRegistrationError
+from .metrics import Metrics, get_metrics
+from .zipcodes import get_state, get_states
+
+# -----------------------------------------------------------------------------
+# Caching and rate limiting
+# -----------------------------------------------------------------------------
+
+ServiceKey = tuple[CheckKey, bool]
+"""Identifies a check in the service: the voter, and whether details were asked."""
+
+
+class ResultCache:
+    """A least-recently-used cache of check outcomes, which expire after `ttl`."""
+
+    max_size: int
+    ttl: float
+    """How long, in seconds, an outcome is kept."""
+
+    _clock: t.Callable[[], float]
+    _entries: OrderedDict[ServiceKey, tuple[float, CheckOutcome]]
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        ttl: float = 3600.0,
+        *,
+        clock: t.Callable[[], float] = time.monotonic,
+    ):
+        """Create an empty cache."""
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+
+    def get(self, key: ServiceKey) -> CheckOutcome | None:
+        """Return a cached outcome, if there's one that hasn't expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, outcome = entry
+        if expires <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return outcome
+
+    def put(self, key: ServiceKey, outcome: CheckOutcome) -> None:
+        """Cache an outcome, evicting the least recently used if full."""
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (self._clock() + self.ttl, outcome)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        """Return how many outcomes are cached (some may have expired)."""
+        return len(self._entries)
+
+
+class RateLimiter:
+    """
+    A token bucket for each client.
+
+    Each client may make `burst` checks at once, and `rate` checks per second
+    after that. Only the `max_clients` most recently seen clients are
+    remembered.
+    """
+
+    rate: float
+    burst: float
+    max_clients: int
+    _clock: t.Callable[[], float]
+    _buckets: OrderedDict[str, tuple[float, float]]
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: float = 100.0,
+        *,
+        max_clients: int = 10_000,
+        clock: t.Callable[[], float] = time.monotonic,
+    ):
+        """Create a limiter that refills each client's bucket at `rate` a second."""
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._clock = clock
+        self._buckets = OrderedDict()
+
+    def take(self, client: str, amount: float = 1.0) -> float:
+        """
+        Take `amount` tokens from a client's bucket, if they're available.
+
+        Return 0 on success, otherwise the number of seconds until they will
+        be. Asking for more than `burst` tokens always fails.
+        """
+        now = self._clock()
+        tokens, updated = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        wait = 0.0
+        if amount > self.burst:
+            wait = math.inf
+        elif tokens >= amount:
+            tokens -= amount
+        else:
+            wait = (amount - tokens) / self.rate
+        self._buckets[client] = (tokens, now)
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+# -----------------------------------------------------------------------------
+# Check service
+# -----------------------------------------------------------------------------
+
+
+class CheckService:
+    """
+    Long-lived, pooled registration checks for an async service.
+
+    Must be used from a single event loop.
+    """
+
+    metrics: Metrics
+    cache: ResultCache
+    max_workers: int
+
+    coalesced: int
+    """How many checks shared another, already in-flight, check."""
+
+    _tool_kwargs: dict[str, t.Any]
+    _tools: dict[tuple[str, Priority], AsyncCheckRegistrationTool | None]
+    _in_flight: dict[ServiceKey, "asyncio.Task[CheckOutcome]"]
+    _waiters: Counter[ServiceKey]
+
+    def __init__(
+        self,
+        *,
+        metrics: Metrics | None = None,
+        cache: ResultCache | None = None,
+        max_workers: int = 32,
+        **tool_kwargs: t.Any,
+    ):
+        """
+        Create a new check service.
+
+        `max_workers` bounds the number of checks running at once for
+        *each* state. Outcomes, cache hits, and the tools' requests are
+        recorded in `metrics` (by default, the process-wide `get_metrics()`).
+
+        Any extra keyword arguments are passed along to each tool's constructor.
+        """
+        self.metrics = metrics or get_metrics()
+        self.cache = cache or ResultCache()
+        self.max_workers = max_workers
+        self.coalesced = 0
+        self._tool_kwargs = tool_kwargs
+        self._tools = {}
+        self._in_flight = {}
+        self._waiters = Counter()
+
+    def tool_for(
+        self, state: str, priority: Priority = Priority.INTERACTIVE
+    ) -> AsyncCheckRegistrationTool | None:
+        """
+        Return the (long-lived) tool for a state and priority lane.
+
+        Returns None if the state is unsupported.
+        """
+        if (state, priority) not in self._tools:
+            self._tools[state, priority] = get_async_check_tool(
+                state=state,
+                max_workers=self.max_workers,
+                metrics=self.metrics.state(state),
+                priority=priority,
+                **self._tool_kwargs,
+            )
+        return self._tools[state, priority]
+
+    def warm(self) -> None:
+        """
+        Load the ZIP code index and build every supported state's tool.
+
+        Both take a moment, which would otherwise stall the event loop on
+        the first checks; call this from a thread before serving.
+        """
+        get_states(())
+        for state in _CHECK_TOOLS:
+            for priority in Priority:
+                self.tool_for(state, priority)
+
+    async def check(
+        self,
+        request: CheckRequest,
+        details: bool = False,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> tuple[CheckOutcome, bool]:
+        """
+        Check a single voter, capturing (rather than raising) failures.
+
+        Return the outcome, and whether it was answered without a new
+        request to the state: from the cache, or by sharing a check of the
+        same voter that was already in flight (whatever its priority). A
+        check is cancelled once every caller waiting on it has been.
+        """
+        key = (request.key, details)
+        outcome = self.cache.get(key)
+        if outcome is not None:
+            record_outcome(self.metrics, outcome, cache_hit=True)
+            return outcome, True
+
+        task = self._in_flight.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(self._check(request, details, priority))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        # A cancelled caller (say, a client that hung up) mustn't cancel a
+        # check that others are waiting on; once nobody is, it's stopped.
+        self._waiters[key] += 1
+        try:
+            outcome = await asyncio.shield(task)
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+                task.cancel()
+        record_outcome(self.metrics, outcome, cache_hit=shared)
+        return outcome, shared
+
+    def _finish(self, key: ServiceKey, task: "asyncio.Task[CheckOutcome]") -> None:
+        """Cache a finished check's outcome, if it succeeded."""
+        del self._in_flight[key]
+        if not task.cancelled() and task.exception() is None:
+            outcome = task.result()
+            if outcome.result is not None:
+                self.cache.put(key, outcome)
+
+    async def _check(
+        self, request: CheckRequest, details: bool, priority: Priority
+    ) -> CheckOutcome:
+        state = get_state(request.zipcode, fallback=True)
+        if state is None:
+            return CheckOutcome(request=request, skipped="unknown ZIP code")
+        tool = self.tool_for(state, priority)
+        if tool is None:
+            return CheckOutcome(
+                request=request, state=state, skipped=f"unsupported state: {state}"
+            )
+        started = time.monotonic()
+        try:
+            result = await tool.check_registration(
+                request.first_name,
+                request.last_name,
+                request.zipcode,
+                request.birth_date,
+                details,
+            )
+        except CheckRegistrationError as e:
+            return CheckOutcome(request=request, state=state, error=str(e))
+        finally:
+            self.metrics.state(state).check_latency.observe(time.monotonic() - started)
+        return CheckOutcome(request=request, state=state, result=result)
+
+    def close(self) -> None:
+        """Stop every tool's worker threads once pending checks finish."""
+        for tool in self._tools.values():
+            if tool is not None:
+                tool.close()
+        self._tools.clear()
+
+
+# -----------------------------------------------------------------------------
+# ASGI application
+# -----------------------------------------------------------------------------
+
+
+class CheckPayload(p.BaseModel, frozen=True):
+    """The body of a check request (or one line of a batch)."""
+
+    first_name: str
+    last_name: str
+    zipcode: str
+    birth_date: datetime.date
+    details: bool = False
+    id: str | int | None = None
+    """Echoed back with the outcome, to match up batch results."""
+
+    def to_request(self) -> CheckRequest:
+        """Return the normalized check request."""
+        return CheckRequest.normalized(
+            self.first_name, self.last_name, self.zipcode, self.birth_date
+        )
+
+
+def outcome_json(outcome: CheckOutcome, cached: bool) -> dict[str, t.Any]:
+    """Return the JSON representation of an outcome."""
+    result = outcome.result
+    return {
+        "state": outcome.state,
+        "registered": result.registered if result is not None else None,
+        "details": (
+            result.details.model_dump(mode="json")
+            if result is not None and result.details is not None
+            else None
+        ),
+        "error": outcome.error,
+        "skipped": outcome.skipped,
+        "cached": cached,
+    }
+
+
+Scope = t.MutableMapping[str, t.Any]
+Message = t.MutableMapping[str, t.Any]
+Receive = t.Callable[[], t.Awaitable[Message]]
+Send = t.Callable[[Message], t.Awaitable[None]]
+
+_JSON = b"application/json"
+_NDJSON = b"application/x-ndjson"
+
+
+class _HTTPError(Exception):
+    """Ends a request with an error response."""
+
+    status: int
+    message: str
+    headers: list[tuple[bytes, bytes]]
+
+    def __init__(
+        self,
+        status: int,
+        message: str,
+        headers: list[tuple[bytes, bytes]] | None = None,
+    ):
+        """Create an error with the given status and message."""
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or []
+
+
+class ServiceApp:
+    """An ASGI application that serves a `CheckService`."""
+
+    service: CheckService
+    limiter: RateLimiter | None
+
+    MAX_BODY_SIZE: t.ClassVar[int] = 10 * 1024 * 1024
+    """Request bodies larger than this (in bytes) are refused."""
+
+    MAX_BATCH_SIZE: t.ClassVar[int] = 10_000
+    """Batches with more checks than this are refused."""
+
+    def __init__(self, service: CheckService, limiter: RateLimiter | None = None):
+        """Serve `service`, rate limiting clients with `limiter` (if given)."""
+        self.service = service
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI connection."""
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        try:
+            await self._route(scope, receive, send)
+        except _HTTPError as e:
+            await self._respond(
+                send,
+                e.status,
+                _JSON,
+                json.dumps({"error": e.message}).encode(),
+                e.headers,
+            )
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await asyncio.to_thread(self.service.warm)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.service.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _route(self, scope: Scope, receive: Receive, send: Send) -> None:
+        method, path = scope["method"], scope["path"]
+        routes = {
+            "/check": ("POST", self._check),
+            "/check/batch": ("POST", self._check_batch),
+            "/metrics": ("GET", self._metrics),
+        }
+        if path not in routes:
+            raise _HTTPError(404, "Not found.")
+        allowed, handler = routes[path]
+        if method != allowed:
+            raise _HTTPError(405, "Method not allowed.", [(b"allow", allowed.encode())])
+        await handler(scope, receive, send)
+
+    async def _check(self, scope: Scope, receive: Receive, send: Send) -> None:
+        body = await self._read_body(receive)
+        try:
+            payload = CheckPayload.model_validate_json(body)
+        except p.ValidationError as e:
+            raise _HTTPError(400, f"Invalid check: {e}") from None
+        self._limit(scope, 1)
+        outcome, cached = await self.service.check(
+            payload.to_request(), payload.details
+        )
+        response = json.dumps({"id": payload.id, **outcome_json(outcome, cached)})
+        await self._respond(send, 200, _JSON, response.encode())
+
+    async def _check_batch(self, scope: Scope, receive: Receive, send: Send) -> None:
+        lines = (await self._read_body(receive)).splitlines()
+        items = [(index, line) for index, line in enumerate(lines) if line.strip()]
+        if len(items) > self.MAX_BATCH_SIZE:
+            raise _HTTPError(413, f"Batches are limited to {self.MAX_BATCH_SIZE}.")
+        self._limit(scope, len(items))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", _NDJSON)],
+            }
+        )
+        tasks = [asyncio.ensure_future(self._batch_item(*item)) for item in items]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                line = json.dumps(await next_done) + "\n"
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": line.encode(),
+                        "more_body": True,
+                    }
+                )
+        finally:
+            # If the client went away, stop its checks (those that no other
+            # caller is waiting on).
+            for task in tasks:
+                task.cancel()
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def _batch_item(self, index: int, line: bytes) -> dict[str, t.Any]:
+        try:
+            payload = CheckPayload.model_validate_json(line)
+        except p.ValidationError as e:
+            return {"index": index, "id": None, "error": f"Invalid check: {e}"}
+        outcome, cached = await self.service.check(
+            payload.to_request(), payload.details, Priority.BULK
+        )
+        return {"index": index, "id": payload.id, **outcome_json(outcome, cached)}
+
+    async def _metrics(self, scope: Scope, receive: Receive, send: Send) -> None:
+        body = self.service.metrics.render_prometheus().encode()
+        await self._respond(send, 200, b"text/plain; version=0.0.4", body)
+
+    def _limit(self, scope: Scope, amount: int) -> None:
+        """Raise a 429 error if the client has made too many checks."""
+        if self.limiter is None or amount == 0:
+            return
+        client = scope.get("client")
+        wait = self.limiter.take(client[0] if client else "", amount)
+        if wait == math.inf:
+            raise _HTTPError(429, "Batch is larger than the rate limit allows.")
+        if wait > 0:
+            retry_after = str(math.ceil(wait)).encode()
+            raise _HTTPError(429, "Too many checks.", [(b"retry-after", retry_after)])
+
+    async def _read_body(self, receive: Receive) -> bytes:
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise asyncio.CancelledError()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.MAX_BODY_SIZE:
+                raise _HTTPError(413, "Request body too large.")
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    async def _respond(
+        self,
+        send: Send,
+        status: int,
+        content_type: bytes,
+        body: bytes,
+        headers: list[tuple[bytes, bytes]] | None = None,
+    ) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", content_type),
+                    (b"content-length", str(len(body)).encode()),
+                    *(headers or []),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+# -----------------------------------------------------------------------------
+# Running
+# -----------------------------------------------------------------------------
+
+
+def _uvicorn() -> t.Any:
+    try:
+        import uvicorn
+    except ImportError as e:
+        raise ValueError(
+            "Serving requires the uvicorn package; "
+            "install it with `pip install 'voter-tools[serve]'`."
+        ) from e
+    return uvicorn
+
+
+def run(app: ServiceApp, host: str = "127.0.0.1", port: int = 8000) -> None:
+    """Serve `app` until interrupted."""
+    _uvicorn().run(app, host=host, port=port, log_level="warning")
@@ -0,0 +1,124 @@
+"""
+Split bulk checks across hosts, and put their outputs back together.
+
+A state portal throttles each IP address, so a large run goes faster spread
+over several hosts. Each host runs one shard of the input. Rows are assigned
+to shards by a stable hash of the voter's normalized identity, so the same
+voter always lands on the same shard (and its warm caches and result store)
+from one run to the next.
+
+Each shard's output carries the original row numbers, so that
+`merge_by_row_number` can put the rows back into input order.
+"""
+
+import contextlib
+import hashlib
+import heapq
+import itertools
+import json
+import operator
+import tempfile
+import typing as t
+
+import pydantic as p
+
+from .bulk import CheckKey, CheckRequest, InvalidRequest
+from .store import encode_key
+
+
+def shard_for(key: CheckKey, count: int) -> int:
+    """Return which of `count` shards (0-based) a check belongs to."""
+    digest = hashlib.blake2b(encode_key(key).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+class Shard(p.BaseModel, frozen=True):
+    """One of several shards of a bulk run."""
+
+    index: int
+    """Which shard this is, counting from 0."""
+
+    total: int
+    """How many shards there are."""
+
+    @classmethod
+    def parse(cls, text: str) -> "Shard":
+        """Parse a shard given as `K/N`, where K counts from 1."""
+        try:
+            k, n = (int(part) for part in text.split("/"))
+        except ValueError:
+            raise ValueError(f"Invalid shard '{text}': expected K/N.") from None
+        if not 1 <= k <= n:
+            raise ValueError(f"Invalid shard '{text}': K must be from 1 to N.")
+        return cls(index=k - 1, total=n)
+
+    def __str__(self) -> str:
+        """Return the shard as `K/N`."""
+        return f"{self.index + 1}/{self.total}"
+
+    def contains(self, row_number: int, request: CheckRequest | InvalidRequest) -> bool:
+        """
+        Return True if a row belongs to this shard.
+
+        Rows are assigned by their check's key; invalid rows, which have no
+        key, by their row number.
+        """
+        if isinstance(request, InvalidRequest):
+            return row_number % self.total == self.index
+        return shard_for(request.key, self.total) == self.index
+
+
+# -----------------------------------------------------------------------------
+# Merging
+# -----------------------------------------------------------------------------
+
+Record = dict[str, t.Any]
+
+MERGE_RUN_SIZE = 100_000
+"""How many rows to sort in memory at a time when merging."""
+
+
+def _sorted_runs(
+    records: t.Iterable[Record], row_number: t.Callable[[Record], int], run_size: int
+) -> t.Iterator[list[tuple[int, Record]]]:
+    """Sort records in runs of `run_size`, one run in memory at a time."""
+    records = iter(records)
+    while run := [(row_number(r), r) for r in itertools.islice(records, run_size)]:
+        run.sort(key=operator.itemgetter(0))
+        yield run
+
+
+def _read_run(spill: t.TextIO) -> t.Iterator[tuple[int, Record]]:
+    for line in spill:
+        number, record = line.split("\t", 1)
+        yield int(number), json.loads(record)
+
+
+def merge_by_row_number(
+    shards: t.Iterable[t.Iterable[Record]],
+    row_column: str,
+    run_size: int = MERGE_RUN_SIZE,
+) -> t.Iterator[tuple[int, Record]]:
+    """
+    Merge the records of several shard outputs into row number order.
+
+    Yields `(row_number, record)` pairs. `check-csv` writes each shard's
+    output in row order, but outputs that were concatenated or edited may
+    not be, so each is sorted first: in runs of `run_size` that are spilled
+    to temporary files, so memory use stays flat.
+    """
+
+    def row_number(record: Record) -> int:
+        return int(record[row_column])
+
+    with contextlib.ExitStack() as stack:
+        runs = []
+        for records in shards:
+            for run in _sorted_runs(records, row_number, run_size):
+                spill = stack.enter_context(
+                    tempfile.TemporaryFile("w+", encoding="utf-8")
+                )
+                spill.writelines(f"{number}\t{json.dumps(r)}\n" for number, r in run)
+                spill.seek(0)
+                runs.append(_read_run(spill))
+        yield from heapq.merge(*runs, key=operator.itemgetter(0))
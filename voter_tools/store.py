@@ -0,0 +1,236 @@
+"""
+A persistent store of registration check results.
+
+Bulk checks are re-run over the same voters every few weeks, and most
+answers don't change between runs. `ResultStore` keeps the latest result for
+each voter (by `CheckRequest.key`) in a local SQLite database, along with
+when it was checked, so that `BulkChecker` can reuse recent answers instead
+of asking the state again, and report what changed since the last run.
+"""
+
+import datetime
+import sqlite3
+import threading
+import typing as t
+
+import pydantic as p
+
+from .tool import CheckRegistrationDetails, CheckRegistrationResult
+
+if t.TYPE_CHECKING:
+    from .bulk import CheckKey
+
+
+class StoredResult(p.BaseModel, frozen=True):
+    """A result from an earlier check, and when it was made."""
+
+    state: str
+    result: CheckRegistrationResult
+    checked_at: datetime.datetime
+    """When the check was made, in UTC."""
+
+    def age(self, now: datetime.datetime | None = None) -> datetime.timedelta:
+        """Return how long ago the check was made."""
+        return (now or utc_now()) - self.checked_at
+
+
+class StoredResults(t.Mapping["CheckKey", StoredResult]):
+    """
+    Stored results for many voters, held as they were read from the store.
+
+    Each voter's row is kept as its raw columns, and its `StoredResult` is
+    built only when it's looked up, so a bulk run can fetch a whole chunk's
+    earlier results at once without validating a model per voter.
+    """
+
+    _index: dict["CheckKey", int]
+    _states: list[str]
+    _registered: bytearray
+    _details: list[str | None]
+    """Each voter's details, as stored JSON."""
+
+    _checked_at: list[str]
+    """When each voter was checked, as a stored ISO 8601 string."""
+
+    def __init__(self) -> None:
+        """Create an empty collection."""
+        self._index = {}
+        self._states = []
+        self._registered = bytearray()
+        self._details = []
+        self._checked_at = []
+
+    def add(
+        self,
+        key: "CheckKey",
+        state: str,
+        registered: int,
+        details: str | None,
+        checked_at: str,
+    ) -> None:
+        """Add a voter's row, as read from the store."""
+        self._index[key] = len(self._states)
+        self._states.append(state)
+        self._registered.append(bool(registered))
+        self._details.append(details)
+        self._checked_at.append(checked_at)
+
+    def __getitem__(self, key: "CheckKey") -> StoredResult:
+        """Return the stored result for a voter."""
+        index = self._index[key]
+        details = self._details[index]
+        return StoredResult(
+            state=self._states[index],
+            result=CheckRegistrationResult(
+                registered=bool(self._registered[index]),
+                details=(
+                    CheckRegistrationDetails.model_validate_json(details)
+                    if details
+                    else None
+                ),
+            ),
+            checked_at=datetime.datetime.fromisoformat(self._checked_at[index]),
+        )
+
+    def __iter__(self) -> t.Iterator["CheckKey"]:
+        """Return the voters with a stored result."""
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        """Return how many voters have a stored result."""
+        return len(self._index)
+
+
+def utc_now() -> datetime.datetime:
+    """Return the current time, in UTC."""
+    return datetime.datetime.now(datetime.UTC)
+
+
+def encode_key(key: "CheckKey") -> str:
+    """Encode a check key as a string, for storage and hashing."""
+    first_name, last_name, zipcode, birth_date = key
+    return "\x1f".join((first_name, last_name, zipcode, birth_date.isoformat()))
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    registered INTEGER NOT NULL,
+    details TEXT,
+    checked_at TEXT NOT NULL
+)
+"""
+
+
+class ResultStore:
+    """
+    A SQLite database of the latest check result for each voter.
+
+    The store may be shared between threads. Results are written in batches
+    (every `BATCH_SIZE` results, and on `flush()` or `close()`), so a crash
+    loses at most one batch.
+    """
+
+    path: str
+    BATCH_SIZE: t.ClassVar[int] = 500
+
+    _connection: sqlite3.Connection
+    _pending: list[tuple[str, str, int, str | None, str]]
+    _lock: threading.Lock
+
+    def __init__(self, path: str):
+        """Open (creating, if needed) the store at `path`."""
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(_SCHEMA)
+        self._connection.commit()
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: t.Iterable["CheckKey"]) -> StoredResults:
+        """Return the stored results for whichever of `keys` have one."""
+        by_encoded = {encode_key(key): key for key in keys}
+        found = StoredResults()
+        if not by_encoded:
+            return found
+        encoded = list(by_encoded)
+        with self._lock:
+            self._flush()
+            # Stay well under SQLite's limit on query parameters.
+            for i in range(0, len(encoded), 500):
+                chunk = encoded[i : i + 500]
+                rows = self._connection.execute(
+                    "SELECT key, state, registered, details, checked_at FROM results "
+                    f"WHERE key IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, state, registered, details, checked_at in rows:
+                    found.add(by_encoded[key], state, registered, details, checked_at)
+        return found
+
+    def get(self, key: "CheckKey") -> StoredResult | None:
+        """Return the stored result for a voter, if there is one."""
+        return self.get_many([key]).get(key)
+
+    def put(
+        self,
+        key: "CheckKey",
+        state: str,
+        result: CheckRegistrationResult,
+        checked_at: datetime.datetime | None = None,
+    ) -> None:
+        """Store the latest result for a voter, replacing any earlier one."""
+        details = result.details.model_dump_json() if result.details else None
+        row = (
+            encode_key(key),
+            state,
+            int(result.registered),
+            details,
+            (checked_at or utc_now()).isoformat(),
+        )
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) >= self.BATCH_SIZE:
+                self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO results "
+            "(key, state, registered, details, checked_at) VALUES (?, ?, ?, ?, ?)",
+            self._pending,
+        )
+        self._connection.commit()
+        self._pending = []
+
+    def flush(self) -> None:
+        """Write any pending results."""
+        with self._lock:
+            self._flush()
+
+    def __len__(self) -> int:
+        """Return how many voters have a stored result."""
+        with self._lock:
+            self._flush()
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM results"
+            ).fetchone()
+        return count
+
+    def close(self) -> None:
+        """Write any pending results and close the database."""
+        with self._lock:
+            self._flush()
+            self._connection.close()
+
+    def __enter__(self) -> t.Self:
+        """Return the store itself."""
+        return self
+
+    def __exit__(self, *exc_info: t.Any) -> None:
+        """Close the store."""
+        self.close()
@@ -0,0 +1,239 @@
+"""
+Streaming, optionally compressed, input and output for bulk tools.
+
+Bulk inputs run to many gigabytes, so they are never read (or written) all at
+once. Paths may be `-` for stdin/stdout, and gzip or zstd compression is
+handled transparently: compressed input is detected from its magic bytes,
+and output compression follows the output path's suffix unless given.
+
+zstd support requires the optional `zstandard` package
+(`pip install 'voter-tools[zstd]'`).
+"""
+
+import gzip
+import io
+import os
+import pathlib
+import stat
+import sys
+import typing as t
+from enum import Enum
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+_BinaryStream = io.RawIOBase | io.BufferedIOBase
+
+BUFFER_SIZE = 1 << 20
+"""Size of the buffers between us and the underlying files, in bytes."""
+
+
+class Compression(str, Enum):
+    """Supported compression formats for bulk input and output."""
+
+    NONE = "none"
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+    @classmethod
+    def for_path(cls, path: str | pathlib.Path) -> "Compression":
+        """Guess the compression format from a file name."""
+        suffix = pathlib.Path(path).suffix.lower()
+        if suffix in (".gz", ".gzip"):
+            return cls.GZIP
+        if suffix in (".zst", ".zstd"):
+            return cls.ZSTD
+        return cls.NONE
+
+    @classmethod
+    def for_header(cls, header: bytes) -> "Compression":
+        """Detect the compression format from the first bytes of a stream."""
+        if header.startswith(GZIP_MAGIC):
+            return cls.GZIP
+        if header.startswith(ZSTD_MAGIC):
+            return cls.ZSTD
+        return cls.NONE
+
+
+def _zstandard() -> t.Any:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ValueError(
+            "zstd compression requires the zstandard package; "
+            "install it with `pip install 'voter-tools[zstd]'`."
+        ) from e
+    return zstandard
+
+
+def _is_dash(path: str | pathlib.Path) -> bool:
+    return str(path) == "-"
+
+
+def _sniff(path: str | pathlib.Path) -> Compression:
+    with open(path, "rb") as f:
+        return Compression.for_header(f.read(4))
+
+
+def _open_binary_input(path: str | pathlib.Path) -> _BinaryStream:
+    if _is_dash(path):
+        # stdin can't be rewound, so the bytes read to detect compression
+        # are handed back in front of the rest of the stream.
+        header = sys.stdin.buffer.read(4)
+        stdin = _Unclosable(sys.stdin.buffer, prefix=header)
+        match Compression.for_header(header):
+            case Compression.GZIP:
+                return gzip.GzipFile(fileobj=stdin, mode="rb")
+            case Compression.ZSTD:
+                return _zstandard().ZstdDecompressor().stream_reader(stdin)
+        return stdin
+    match _sniff(path):
+        case Compression.GZIP:
+            return gzip.open(path, "rb")
+        case Compression.ZSTD:
+            return _zstandard().ZstdDecompressor().stream_reader(open(path, "rb"))
+    return open(path, "rb", buffering=0)
+
+
+def open_input(path: str | pathlib.Path) -> t.TextIO:
+    """
+    Open a text file for streaming reads; `-` means stdin.
+
+    gzip and zstd compressed input is decompressed on the fly, whatever the
+    file is called. Closing the returned stream never closes stdin itself.
+    """
+    return io.TextIOWrapper(
+        io.BufferedReader(_open_binary_input(path), BUFFER_SIZE),
+        encoding="utf-8-sig",
+        newline="",
+    )
+
+
+def read_fraction(stream: t.IO) -> t.Callable[[], float | None] | None:
+    """
+    Return a function that reports how much of an input has been read (0-1).
+
+    This works for any stream backed by a regular file, compressed or not, as
+    it's the underlying file's position that counts. Returns None if the
+    stream isn't backed by a regular file (a pipe, say).
+    """
+    try:
+        fd = stream.fileno()
+        info = os.fstat(fd)
+    except (OSError, ValueError):
+        return None
+    if not stat.S_ISREG(info.st_mode) or info.st_size == 0:
+        return None
+
+    def fraction() -> float | None:
+        try:
+            return min(1.0, os.lseek(fd, 0, os.SEEK_CUR) / info.st_size)
+        except OSError:
+            return None
+
+    return fraction
+
+
+def _open_binary_output(
+    path: str | pathlib.Path, compression: Compression
+) -> _BinaryStream:
+    # Fail before creating the output file if zstd isn't available.
+    zstandard = _zstandard() if compression == Compression.ZSTD else None
+    raw: io.RawIOBase
+    if _is_dash(path):
+        raw = _Unclosable(sys.stdout.buffer)
+    else:
+        raw = open(path, "wb", buffering=0)
+    match compression:
+        case Compression.GZIP:
+            return _ClosesBoth(gzip.GzipFile(fileobj=raw, mode="wb"), raw)
+        case Compression.ZSTD:
+            assert zstandard is not None
+            return zstandard.ZstdCompressor().stream_writer(raw)
+    return raw
+
+
+def open_output(
+    path: str | pathlib.Path, compression: Compression | None = None
+) -> t.TextIO:
+    """
+    Open a text file for streaming writes; `-` means stdout.
+
+    If `compression` is None, it is guessed from the path's suffix (stdout
+    is left uncompressed). Closing the returned stream finishes compression,
+    but never closes stdout itself.
+    """
+    if compression is None:
+        compression = Compression.NONE if _is_dash(path) else Compression.for_path(path)
+    return io.TextIOWrapper(
+        io.BufferedWriter(_open_binary_output(path, compression), BUFFER_SIZE),
+        encoding="utf-8",
+        newline="",
+    )
+
+
+class _Unclosable(io.RawIOBase):
+    """Pass reads and writes through to a stream, but never close it."""
+
+    _stream: t.IO[bytes]
+    _prefix: bytes
+    """Bytes to read before any from the stream."""
+
+    def __init__(self, stream: t.IO[bytes], prefix: bytes = b""):
+        self._stream = stream
+        self._prefix = prefix
+
+    def fileno(self) -> int:
+        return self._stream.fileno()
+
+    def readable(self) -> bool:
+        return self._stream.readable()
+
+    def writable(self) -> bool:
+        return self._stream.writable()
+
+    def readinto(self, b: t.Any) -> int:
+        if self._prefix:
+            data, self._prefix = self._prefix[: len(b)], self._prefix[len(b) :]
+        else:
+            data = self._stream.read(len(b))
+        b[: len(data)] = data
+        return len(data)
+
+    def write(self, b: t.Any) -> int:
+        return self._stream.write(b)
+
+    def flush(self) -> None:
+        if not self.closed and self._stream.writable():
+            self._stream.flush()
+
+    def close(self) -> None:
+        self.flush()
+        super().close()
+
+
+class _ClosesBoth(io.RawIOBase):
+    """Write through a stream that wraps another, and close them both."""
+
+    _outer: io.BufferedIOBase
+    _inner: io.RawIOBase
+
+    def __init__(self, outer: io.BufferedIOBase, inner: io.RawIOBase):
+        self._outer = outer
+        self._inner = inner
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: t.Any) -> int:
+        return self._outer.write(b)
+
+    def flush(self) -> None:
+        if not self._outer.closed:
+            self._outer.flush()
+
+    def close(self) -> None:
+        if not self.closed:
+            self._outer.close()
+            self._inner.close()
+        super().close()
@@ -1,9 +1,24 @@
+import array
 import datetime
+import threading
 import typing as t
 from abc import ABC, abstractmethod
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
 
+import httpx
 import pydantic as p
 
+from .concurrency import AIMDLimiter, LimitedTransport, Priority, get_limiter
+from .hedge import HedgePolicy, HedgingTransport
+from .metrics import MeteredTransport, StateMetrics, get_metrics
+from .retry import CircuitBreaker, RetryPolicy, RetryTransport, get_breaker
+
 
 class CheckRegistrationDetails(p.BaseModel, frozen=True):
     """Details about a voter's registration status."""
@@ -44,6 +59,61 @@ class CheckRegistrationTool(ABC):
     features: t.ClassVar[SupportedFeatures]
     """Features supported by this tool."""
 
+    _client: httpx.Client
+
+    def __init__(
+        self,
+        *,
+        timeout: float = 5.0,
+        retry: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        limiter: AIMDLimiter | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+        hedge: HedgePolicy | None = None,
+        metrics: StateMetrics | None = None,
+        # Lower-level parameter for test and debug purposes
+        _transport: httpx.BaseTransport | None = None,
+    ):
+        """
+        Create a new registration check tool.
+
+        The tool holds a single pooled HTTP client for its lifetime, so it is
+        cheaper to create one tool and use it for many checks than to create
+        a tool per check.
+
+        Failed lookups are retried according to `retry` (by default, a few
+        times with jittered exponential backoff; pass `NO_RETRIES` to turn
+        this off). Unless a `breaker` or `limiter` is given, all tools for a
+        state share that state's circuit breaker and adaptive concurrency
+        limiter. Each retry attempt holds its own limiter slot, so backoff
+        delays don't tie one up. When the limiter is busy, the tool's
+        requests wait in its `priority` lane: bulk work should pass
+        `Priority.BULK`, so interactive checks go ahead of it.
+
+        If a `hedge` policy is given, lookups that are slow to answer are
+        sent a second time, and the first successful answer wins. This is off
+        by default.
+
+        Requests, retries, and latencies are recorded in `metrics`; by
+        default, the state's share of the process-wide `get_metrics()`.
+        """
+        metrics = metrics or get_metrics().state(self.state)
+        inner: httpx.BaseTransport = LimitedTransport(
+            MeteredTransport(_transport or httpx.HTTPTransport(), metrics),
+            limiter or get_limiter(self.state),
+            priority,
+        )
+        if hedge is not None:
+            inner = HedgingTransport(inner, hedge)
+        transport = RetryTransport(
+            inner,
+            retry,
+            breaker or get_breaker(self.state),
+            name=f"{self.state} voter registration site",
+            metrics=metrics,
+        )
+        self._client = httpx.Client(mounts={"all://": transport}, timeout=timeout)
+
     @abstractmethod
     def check_registration(
         self,
@@ -64,6 +134,150 @@ class CheckRegistrationTool(ABC):
         ...
 
 
+# -----------------------------------------------------------------------------
+# Fanning out lookups
+# -----------------------------------------------------------------------------
+
+T = t.TypeVar("T")
+
+_EXECUTOR: ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the thread pool that fanned-out lookups run on by default."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=64, thread_name_prefix="fan-out")
+        return _EXECUTOR
+
+
+def first_found(
+    lookups: t.Sequence[t.Callable[[], T]],
+    found: t.Callable[[T], bool],
+    executor: Executor | None = None,
+) -> T:
+    """
+    Run `lookups` concurrently, and return the first result that is `found`.
+
+    Lookups are given most likely first. Once one finds what it's looking
+    for, lookups that haven't started are cancelled; those already under way
+    finish in the background, and are ignored. If none finds anything, the
+    first lookup's result is returned, unless a lookup failed: then the first
+    failure is raised, since the voter may have been in its candidate.
+
+    Lookups run on `executor`; by default, a bounded pool kept for fanned-out
+    lookups alone.
+    """
+    if len(lookups) == 1:
+        return lookups[0]()
+    executor = executor or _get_executor()
+    futures = [executor.submit(lookup) for lookup in lookups]
+    pending: set[Future[T]] = set(futures)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None and found(future.result()):
+                for other in pending:
+                    other.cancel()
+                return future.result()
+    for future in futures:
+        if future.exception() is not None:
+            return future.result()  # Raises.
+    return futures[0].result()
+
+
 # TODO: as we support online voter registration in more states, consider if
 # there's anything like a unified interface to build for them. For now,
 # let's not bother.
+
+
+# -----------------------------------------------------------------------------
+# Compact batches of results
+# -----------------------------------------------------------------------------
+
+_NOT_REGISTERED = CheckRegistrationResult(registered=False)
+_REGISTERED = CheckRegistrationResult(registered=True)
+
+
+class ResultBatch:
+    """
+    Many check results, stored compactly as parallel arrays.
+
+    A `CheckRegistrationResult` with details is two pydantic models, a date,
+    and two strings: about a kilobyte, for what's really a bool, a date, and
+    two short strings. A batch keeps each field in its own array (with
+    statuses, which repeat, stored once), in well under a tenth of that.
+
+    Results go in and come out as the usual models, built only as they're
+    read; results without details are shared instances.
+    """
+
+    registered: bytearray
+    registration_dates: array.array
+    """Each result's registration date as an ordinal, or 0 if no details."""
+
+    state_ids: list[str]
+    """Each result's state ID, or '' if no details."""
+
+    status_indexes: array.array
+    """Each result's index into `statuses` (meaningless if no details)."""
+
+    statuses: list[str]
+    """The distinct registration statuses, in order of first appearance."""
+
+    _status_index: dict[str, int]
+
+    def __init__(self, results: t.Iterable[CheckRegistrationResult] = ()):
+        """Create a batch holding `results`."""
+        self.registered = bytearray()
+        self.registration_dates = array.array("i")
+        self.state_ids = []
+        self.status_indexes = array.array("H")
+        self.statuses = []
+        self._status_index = {}
+        self.extend(results)
+
+    def append(self, result: CheckRegistrationResult) -> None:
+        """Add a result to the end of the batch."""
+        self.registered.append(result.registered)
+        details = result.details
+        if details is None:
+            self.registration_dates.append(0)
+            self.state_ids.append("")
+            self.status_indexes.append(0)
+            return
+        index = self._status_index.get(details.status)
+        if index is None:
+            index = self._status_index[details.status] = len(self.statuses)
+            self.statuses.append(details.status)
+        self.registration_dates.append(details.registration_date.toordinal())
+        self.state_ids.append(details.state_id)
+        self.status_indexes.append(index)
+
+    def extend(self, results: t.Iterable[CheckRegistrationResult]) -> None:
+        """Add several results to the end of the batch."""
+        for result in results:
+            self.append(result)
+
+    def __len__(self) -> int:
+        """Return how many results the batch holds."""
+        return len(self.registered)
+
+    def __getitem__(self, index: int) -> CheckRegistrationResult:
+        """Return one result, as a `CheckRegistrationResult`."""
+        registered = bool(self.registered[index])
+        ordinal = self.registration_dates[index]
+        if not ordinal:
+            return _REGISTERED if registered else _NOT_REGISTERED
+        details = CheckRegistrationDetails(
+            state_id=self.state_ids[index],
+            registration_date=datetime.date.fromordinal(ordinal),
+            status=self.statuses[self.status_indexes[index]],
+        )
+        return CheckRegistrationResult(registered=registered, details=details)
+
+    def __iter__(self) -> t.Iterator[CheckRegistrationResult]:
+        """Return each result, as a `CheckRegistrationResult`."""
+        return (self[i] for i in range(len(self)))
@@ -81,7 +81,7 @@ class WisconsinCheckRegistrationTool(CheckRegistrationTool):
     ) -> CheckRegistrationResult:
         """Check if a voter is registered in Michigan."""
         try:
-            request = httpx.post(
+            request = self._client.post(
                 self.SEARCH_URL,
                 json={
                     "firstName": first_name,
@@ -0,0 +1,326 @@
+"""
+Writers for bulk registration check results.
+
+Results can be written as CSV (the input's columns plus stringified result
+columns), or with typed columns as JSON Lines or Parquet, which load straight
+into a warehouse without re-parsing. Every writer takes rows in batches as
+they finish, so results are never held in memory all at once; a Parquet
+writer turns each batch into a row group.
+
+Parquet support requires the optional `pyarrow` package
+(`pip install 'voter-tools[parquet]'`).
+"""
+
+import csv
+import datetime
+import json
+import sys
+import typing as t
+from enum import Enum
+
+from .bulk import CheckOutcome
+from .streams import Compression
+
+Row = dict[str | None, t.Any]
+"""A row read from the input CSV."""
+
+Batch = t.Sequence[tuple[Row, CheckOutcome]]
+
+
+class OutputFormat(str, Enum):
+    """Supported formats for bulk results."""
+
+    CSV = "csv"
+    JSONL = "jsonl"
+    PARQUET = "parquet"
+
+
+class ResultColumns(t.NamedTuple):
+    """Names of the result columns added to each input row."""
+
+    registered: str = "Registered"
+    registration_date: str = "Registration Date"
+    registration_status: str = "Registration Status"
+    state_voter_id: str = "State Voter ID"
+    error: str = "Error"
+
+
+def result_values(outcome: CheckOutcome, details: bool) -> dict[str, t.Any]:
+    """
+    Return the typed result values for an outcome, keyed by field name.
+
+    `registered` is None if no answer was had, in which case `error` says
+    why (a failed check, or a reason the row wasn't checked).
+    """
+    result = outcome.result
+    registered = result.registered if result is not None else None
+    values: dict[str, t.Any] = {"registered": registered}
+    if details:
+        found = result.details if result is not None and registered else None
+        values["registration_date"] = found.registration_date if found else None
+        values["registration_status"] = found.status if found else None
+        values["state_voter_id"] = found.state_id if found else None
+    values["error"] = outcome.error or outcome.skipped
+    return values
+
+
+class ResultWriter:
+    """Base class for writers of bulk results."""
+
+    input_fields: list[str]
+    columns: ResultColumns
+    details: bool
+
+    DEFAULT_BATCH_SIZE: t.ClassVar[int] = 1_000
+    """How many rows to write at a time, unless told otherwise."""
+
+    def __init__(
+        self, input_fields: t.Sequence[str], columns: ResultColumns, details: bool
+    ):
+        """Create a writer for rows with the given input fields."""
+        self.input_fields = list(input_fields)
+        self.columns = columns
+        self.details = details
+
+    def _typed_record(self, row: Row, outcome: CheckOutcome) -> dict[str, t.Any]:
+        """Return the input row's fields followed by typed result columns."""
+        record = {name: row.get(name) for name in self.input_fields}
+        for field, value in result_values(outcome, self.details).items():
+            record[getattr(self.columns, field)] = value
+        return record
+
+    def write(self, batch: Batch) -> None:
+        """Write a batch of finished rows."""
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        """Finish writing. This does not close the underlying stream."""
+        pass
+
+    def __enter__(self) -> t.Self:
+        """Return the writer itself."""
+        return self
+
+    def __exit__(self, *exc_info: t.Any) -> None:
+        """Finish writing."""
+        self.close()
+
+
+class CSVResultWriter(ResultWriter):
+    """
+    Write results as CSV.
+
+    Values are stringified: failed and skipped rows have `(error)` or
+    `(<reason>)` in the registered column, and there is no error column.
+    """
+
+    _out: t.TextIO
+    _writer: csv.DictWriter
+
+    def __init__(
+        self,
+        out: t.TextIO,
+        input_fields: t.Sequence[str],
+        columns: ResultColumns,
+        details: bool,
+    ):
+        """Create a writer, and write the header row."""
+        super().__init__(input_fields, columns, details)
+        extra_fields = list(columns[:4]) if details else [columns.registered]
+        self._out = out
+        self._writer = csv.DictWriter(out, fieldnames=self.input_fields + extra_fields)
+        self._writer.writeheader()
+
+    def _csv_row(self, row: Row, outcome: CheckOutcome) -> Row:
+        columns = self.columns
+        values = result_values(outcome, self.details)
+        if self.details:
+            date = values["registration_date"]
+            row[columns.registration_date] = date.strftime("%Y-%m-%d") if date else ""
+            row[columns.registration_status] = values["registration_status"] or ""
+            row[columns.state_voter_id] = values["state_voter_id"] or ""
+        if outcome.result is not None:
+            row[columns.registered] = outcome.result.registered
+        elif outcome.error is not None:
+            row[columns.registered] = "(error)"
+        else:
+            row[columns.registered] = f"({outcome.skipped})"
+        return row
+
+    def write(self, batch: Batch) -> None:
+        """Write a batch of finished rows."""
+        self._writer.writerows(self._csv_row(row, outcome) for row, outcome in batch)
+        self._out.flush()
+
+
+class ChangesWriter(ResultWriter):
+    """
+    Write, as CSV, only rows whose result changed since an earlier run.
+
+    Each row has the input's fields, the voter's state, and the registered
+    flag and registration status from before and after.
+    """
+
+    CHANGE_FIELDS: t.ClassVar[tuple[str, ...]] = (
+        "State",
+        "Previously Registered",
+        "Registered",
+        "Previous Status",
+        "Status",
+        "Previously Checked At",
+    )
+
+    _out: t.TextIO
+    _writer: csv.DictWriter
+
+    def __init__(
+        self,
+        out: t.TextIO,
+        input_fields: t.Sequence[str],
+        columns: ResultColumns,
+        details: bool,
+    ):
+        """Create a writer, and write the header row."""
+        super().__init__(input_fields, columns, details)
+        self._out = out
+        self._writer = csv.DictWriter(
+            out, fieldnames=self.input_fields + list(self.CHANGE_FIELDS)
+        )
+        self._writer.writeheader()
+
+    def _change_row(self, row: Row, outcome: CheckOutcome) -> Row:
+        assert outcome.previous is not None and outcome.result is not None
+        before, after = outcome.previous.result, outcome.result
+        change: Row = {name: row.get(name) for name in self.input_fields}
+        change.update(
+            zip(
+                self.CHANGE_FIELDS,
+                (
+                    outcome.state,
+                    before.registered,
+                    after.registered,
+                    before.details.status if before.details else "",
+                    after.details.status if after.details else "",
+                    outcome.previous.checked_at.isoformat(timespec="seconds"),
+                ),
+                strict=True,
+            )
+        )
+        return change
+
+    def write(self, batch: Batch) -> None:
+        """Write whichever rows in a batch have changed."""
+        self._writer.writerows(
+            self._change_row(row, outcome) for row, outcome in batch if outcome.changed
+        )
+        self._out.flush()
+
+
+def _json_default(value: t.Any) -> t.Any:
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__} to JSON.")
+
+
+class JSONLResultWriter(ResultWriter):
+    """
+    Write results as JSON Lines, one object per row.
+
+    Result columns are typed: `registered` is a boolean (or null), dates are
+    ISO 8601 strings, and the error column holds the reason for a failed or
+    skipped check.
+    """
+
+    _out: t.TextIO
+
+    def __init__(
+        self,
+        out: t.TextIO,
+        input_fields: t.Sequence[str],
+        columns: ResultColumns,
+        details: bool,
+    ):
+        """Create a writer."""
+        super().__init__(input_fields, columns, details)
+        self._out = out
+
+    def write(self, batch: Batch) -> None:
+        """Write a batch of finished rows."""
+        self._out.writelines(
+            json.dumps(self._typed_record(row, outcome), default=_json_default) + "\n"
+            for row, outcome in batch
+        )
+        self._out.flush()
+
+
+def _pyarrow() -> tuple[t.Any, t.Any]:
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ValueError(
+            "Parquet output requires the pyarrow package; "
+            "install it with `pip install 'voter-tools[parquet]'`."
+        ) from e
+    return pyarrow, pyarrow.parquet
+
+
+class ParquetResultWriter(ResultWriter):
+    """
+    Write results as Parquet, one row group per batch.
+
+    Input columns are strings; `registered` is a nullable boolean and the
+    registration date a date. Compression is applied per column chunk, so
+    gzip and zstd are passed to the Parquet writer rather than wrapping the
+    file.
+    """
+
+    DEFAULT_BATCH_SIZE: t.ClassVar[int] = 50_000
+
+    _pa: t.Any
+    _schema: t.Any
+    _writer: t.Any
+
+    def __init__(
+        self,
+        path: str,
+        input_fields: t.Sequence[str],
+        columns: ResultColumns,
+        details: bool,
+        compression: Compression | None = None,
+    ):
+        """
+        Create a writer for the file at `path`; `-` means stdout.
+
+        If `compression` is None, the Parquet library's default is used.
+        """
+        super().__init__(input_fields, columns, details)
+        pa, pq = _pyarrow()
+        fields = [pa.field(name, pa.string()) for name in self.input_fields]
+        fields.append(pa.field(columns.registered, pa.bool_()))
+        if details:
+            fields += [
+                pa.field(columns.registration_date, pa.date32()),
+                pa.field(columns.registration_status, pa.string()),
+                pa.field(columns.state_voter_id, pa.string()),
+            ]
+        fields.append(pa.field(columns.error, pa.string()))
+        self._pa = pa
+        self._schema = pa.schema(fields)
+        kwargs: dict[str, t.Any] = {}
+        if compression is not None:
+            kwargs["compression"] = compression.value
+        where = sys.stdout.buffer if path == "-" else path
+        self._writer = pq.ParquetWriter(where, self._schema, **kwargs)
+
+    def write(self, batch: Batch) -> None:
+        """Write a batch of finished rows as a row group."""
+        if not batch:
+            return
+        records = [self._typed_record(row, outcome) for row, outcome in batch]
+        table = self._pa.Table.from_pylist(records, schema=self._schema)
+        self._writer.write_table(table, row_group_size=len(records))
+
+    def close(self) -> None:
+        """Write the Parquet footer."""
+        self._writer.close()
@@ -1,27 +1,73 @@
 """Module for looking up zip codes, states, and counties."""
 
+import bisect
 import csv
+import functools
+import math
 import pathlib
+import threading
+import typing as t
 
 _ZIP_TO_STATE: dict[str, str] = {}
 _ZIP_TO_COUNTY: dict[str, str] = {}
+_ZIP_TO_COUNTIES: dict[str, tuple[str, ...]] = {}
+_ZIP_TO_LOCATION: dict[str, tuple[float, float]] = {}
+
+_LOAD_LOCK = threading.Lock()
 
 _ZIP_PATH = pathlib.Path(__file__).parent / "zipcodes.us.csv"
 
 _ZIPCODE_COLUMN = 1
 _STATE_COLUMN = 4
 _COUNTY_COLUMN = 5
+_LATITUDE_COLUMN = 9
+_LONGITUDE_COLUMN = 10
+
+NEARBY_COUNTY_KM = 5.0
+"""
+How close (in km) another county's ZIP code must be to count as a candidate.
+
+ZIP codes don't follow county lines. The bundled data lists a single county
+for each ZIP code, so counties whose ZIP codes lie this close to a ZIP code's
+center are treated as candidates too.
+"""
+
+MAX_COUNTIES = 3
+"""The most candidate counties returned for a ZIP code."""
 
 
-def _load_zipcodes():
-    global _ZIP_TO_STATE, _ZIP_TO_COUNTY
-    if not _ZIP_TO_STATE or not _ZIP_TO_COUNTY:
+def _load_zipcodes() -> None:
+    if _ZIP_TO_STATE and _ZIP_TO_COUNTY:
+        return
+    # Many threads may look up ZIP codes at once; only one should load them,
+    # and nobody should see a half-loaded table.
+    with _LOAD_LOCK:
+        if _ZIP_TO_STATE and _ZIP_TO_COUNTY:
+            return
+        zip_to_state: dict[str, str] = {}
+        zip_to_counties: dict[str, list[str]] = {}
+        zip_to_location: dict[str, tuple[float, float]] = {}
         with open(_ZIP_PATH, "r") as f:
             reader = csv.reader(f)
             next(reader)
             for row in reader:
-                _ZIP_TO_STATE[row[_ZIPCODE_COLUMN]] = row[_STATE_COLUMN]
-                _ZIP_TO_COUNTY[row[_ZIPCODE_COLUMN]] = row[_COUNTY_COLUMN]
+                zipcode, state = row[_ZIPCODE_COLUMN], row[_STATE_COLUMN]
+                county = row[_COUNTY_COLUMN]
+                if zipcode not in zip_to_state:
+                    zip_to_state[zipcode] = state
+                # A ZIP code may be listed once for each county it spans.
+                counties = zip_to_counties.setdefault(zipcode, [])
+                if county and county not in counties:
+                    counties.append(county)
+                if row[_LATITUDE_COLUMN] and zipcode not in zip_to_location:
+                    zip_to_location[zipcode] = (
+                        float(row[_LATITUDE_COLUMN]),
+                        float(row[_LONGITUDE_COLUMN]),
+                    )
+        _ZIP_TO_COUNTIES.update((z, tuple(c)) for z, c in zip_to_counties.items())
+        _ZIP_TO_LOCATION.update(zip_to_location)
+        _ZIP_TO_COUNTY.update((z, c[0]) for z, c in zip_to_counties.items() if c)
+        _ZIP_TO_STATE.update(zip_to_state)
 
 
 def _get_zip_to_state() -> dict[str, str]:
@@ -36,11 +82,341 @@ def _get_zip_to_county() -> dict[str, str]:
     return _ZIP_TO_COUNTY
 
 
-def get_state(zipcode: str) -> str | None:
-    """Return the state abbreviation for a given zip code."""
-    return _get_zip_to_state().get(zipcode)
+def get_state(zipcode: str, fallback: bool = False) -> str | None:
+    """
+    Return the state abbreviation for a given zip code.
+
+    With `fallback`, zip codes missing from the bundled data are resolved by
+    `resolve_with_fallback`.
+    """
+    state = _get_zip_to_state().get(zipcode)
+    if state is None and fallback:
+        state, _ = resolve_with_fallback(zipcode)
+    return state
+
+
+def get_states(zipcodes: t.Iterable[str], fallback: bool = False) -> list[str | None]:
+    """Return the state abbreviation for each of many zip codes."""
+    zip_to_state = _get_zip_to_state()
+    if not fallback:
+        return [zip_to_state.get(zipcode) for zipcode in zipcodes]
+    return [get_state(zipcode, fallback=True) for zipcode in zipcodes]
 
 
 def get_county(zipcode: str) -> str | None:
-    """Return the county name for a given zip code."""
+    """Return the (most likely) county name for a given zip code."""
     return _get_zip_to_county().get(zipcode)
+
+
+# -----------------------------------------------------------------------------
+# Resolving many ZIP codes at once
+# -----------------------------------------------------------------------------
+
+_NO_ZIPCODE = 100_000
+"""The lookup table slot for values that aren't ZIP codes."""
+
+_TABLE: tuple[t.Any, t.Any, t.Any] | None = None
+
+
+def _numpy() -> t.Any | None:
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def normalize_zipcode(value: str | int) -> str | None:
+    """
+    Return the five-digit ZIP code for a value, or None if it isn't one.
+
+    Accepts ZIP+4 codes (with or without the dash) and values that lost their
+    leading zeros on the way through a spreadsheet, as strings or ints.
+    """
+    if isinstance(value, str):
+        digits = value.strip().partition("-")[0]
+        if not digits.isdecimal() or len(digits) > 9:
+            return None
+        number, ndigits = int(digits), len(digits)
+    elif isinstance(value, int) and 0 <= value <= 999_999_999:
+        number, ndigits = value, len(str(value))
+    else:
+        return None
+    return f"{number if ndigits <= 5 else number // 10_000:05d}"
+
+
+def _get_table(np: t.Any) -> tuple[t.Any, t.Any, t.Any]:
+    """Return the (zip code -> row, row -> state, row -> county) arrays."""
+    global _TABLE
+    if _TABLE is None:
+        zip_to_state = _get_zip_to_state()
+        with _LOAD_LOCK:
+            if _TABLE is None:
+                zipcodes = list(zip_to_state)
+                # Every possible five-digit ZIP code (and one slot for values
+                # that aren't ZIP codes) gets a row; unknown ones get the last
+                # row, which is empty.
+                rows = np.full(_NO_ZIPCODE + 1, len(zipcodes), dtype=np.int32)
+                rows[np.array(zipcodes, dtype=np.int64)] = np.arange(len(zipcodes))
+                states = np.array([*zip_to_state.values(), None], dtype=object)
+                counties = np.array(
+                    [*(_ZIP_TO_COUNTY.get(z) for z in zipcodes), None], dtype=object
+                )
+                _TABLE = (rows, states, counties)
+    return _TABLE
+
+
+def _zipcode_numbers(np: t.Any, values: t.Any) -> t.Any:
+    """Return the five-digit ZIP code of each value as an int, or `_NO_ZIPCODE`."""
+    if values.dtype.kind in "iu":
+        numbers = values.astype(np.int64)
+        lengths = np.where(numbers > 99_999, 6, 5)
+        valid = (numbers >= 0) & (numbers <= 999_999_999)
+    elif values.dtype.kind == "f":
+        valid = np.isfinite(values) & (values == np.floor(values))
+        valid &= (values >= 0) & (values <= 999_999_999)
+        numbers = np.where(valid, values, 0).astype(np.int64)
+        lengths = np.where(numbers > 99_999, 6, 5)
+    else:
+        text = np.char.strip(values.astype(str))
+        digits = np.char.partition(text, "-")[:, 0]
+        lengths = np.char.str_len(digits)
+        valid = np.char.isdecimal(digits) & (lengths <= 9)
+        numbers = np.where(valid, digits, "0").astype(np.int64)
+    numbers = np.where(lengths <= 5, numbers, numbers // 10_000)
+    return np.where(valid, numbers, _NO_ZIPCODE)
+
+
+def resolve_many(
+    zipcodes: t.Iterable[str | int] | t.Any,
+) -> tuple[t.Sequence[str | None], t.Sequence[str | None]]:
+    """
+    Return the state and (most likely) county for each of many zip codes.
+
+    Accepts any iterable (or NumPy array) of zip code strings or ints, which
+    are normalized as by `normalize_zipcode`. Returns parallel sequences of
+    state abbreviations and county names, with None wherever a value isn't a
+    known zip code.
+
+    With NumPy installed, the whole batch is resolved with a few array
+    operations against a precomputed table, and the results are object
+    arrays; otherwise they're lists.
+    """
+    np = _numpy()
+    if np is None:
+        zip_to_state, zip_to_county = _get_zip_to_state(), _get_zip_to_county()
+        normalized = [normalize_zipcode(value) for value in zipcodes]
+        return (
+            [zip_to_state.get(z) if z else None for z in normalized],
+            [zip_to_county.get(z) if z else None for z in normalized],
+        )
+    if not isinstance(zipcodes, np.ndarray):
+        zipcodes = np.array(list(zipcodes))
+    rows, states, counties = _get_table(np)
+    if zipcodes.dtype == object:
+        # A mix of strings and ints (or Nones); compare them as strings.
+        zipcodes = np.array(
+            [value if isinstance(value, (str, int)) else "" for value in zipcodes],
+            dtype=str,
+        )
+    found = rows[_zipcode_numbers(np, zipcodes.reshape(-1))]
+    return states[found], counties[found]
+
+
+# -----------------------------------------------------------------------------
+# Nearby zip codes
+# -----------------------------------------------------------------------------
+
+Location = tuple[float, float]
+"""A (latitude, longitude) point, in degrees."""
+
+_KM_PER_DEGREE = 111.195
+"""The length of a degree of latitude (or of longitude at the equator), in km."""
+
+
+def distance_km(a: Location, b: Location) -> float:
+    """Return the great-circle distance between two (lat, long) points, in km."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 6371.0 * 2 * math.asin(math.sqrt(h))
+
+
+class _GridIndex:
+    """
+    Zip code centers, bucketed into a grid of `CELL_DEGREES` square cells.
+
+    Finding the zip codes near a point only needs to look at the few cells
+    around it, rather than every zip code in the country.
+    """
+
+    CELL_DEGREES: t.ClassVar[float] = 0.2
+
+    _cells: dict[tuple[int, int], list[tuple[str, Location]]]
+    _max_ring: int
+    _max_latitude: float
+
+    def __init__(self, locations: dict[str, Location]):
+        """Index the given zip code centers."""
+        self._cells = {}
+        for zipcode, location in locations.items():
+            self._cells.setdefault(self._cell(location), []).append((zipcode, location))
+        rows = [row for row, _ in self._cells] or [0]
+        columns = [column for _, column in self._cells] or [0]
+        self._max_ring = max(max(rows) - min(rows), max(columns) - min(columns))
+        self._max_latitude = max(
+            (abs(latitude) for latitude, _ in locations.values()), default=0.0
+        )
+
+    def _cell(self, location: Location) -> tuple[int, int]:
+        latitude, longitude = location
+        return (
+            math.floor(latitude / self.CELL_DEGREES),
+            math.floor(longitude / self.CELL_DEGREES),
+        )
+
+    def _ring(
+        self, center: tuple[int, int], ring: int
+    ) -> t.Iterator[tuple[str, Location]]:
+        """Yield the zip codes in the cells `ring` cells away from `center`."""
+        row, column = center
+        for r in range(row - ring, row + ring + 1):
+            on_edge = abs(r - row) == ring
+            step = 1 if on_edge else 2 * ring
+            for c in range(column - ring, column + ring + 1, step):
+                yield from self._cells.get((r, c), ())
+
+    def _km_per_cell(self, latitude: float) -> float:
+        """Return the narrowest a cell gets, in km, at or poleward of `latitude`."""
+        latitude = min(abs(latitude), self._max_latitude)
+        return self.CELL_DEGREES * _KM_PER_DEGREE * math.cos(math.radians(latitude))
+
+    def within(self, location: Location, km: float) -> t.Iterator[tuple[str, float]]:
+        """Yield each zip code within `km` of a point, with its distance."""
+        degrees = km / _KM_PER_DEGREE
+        rings = math.ceil(km / self._km_per_cell(location[0] + degrees))
+        center = self._cell(location)
+        for ring in range(rings + 1):
+            for zipcode, other in self._ring(center, ring):
+                distance = distance_km(location, other)
+                if distance <= km:
+                    yield zipcode, distance
+
+    def nearest(
+        self, location: Location, accept: t.Callable[[str], bool] = bool
+    ) -> str | None:
+        """Return the accepted zip code nearest a point, if there is one."""
+        center = self._cell(location)
+        best, best_distance = None, math.inf
+        for ring in range(self._max_ring + 1):
+            for zipcode, other in self._ring(center, ring):
+                distance = distance_km(location, other)
+                if distance < best_distance and accept(zipcode):
+                    best, best_distance = zipcode, distance
+            # Anything in a cell further out is at least this far away.
+            degrees = ring * self.CELL_DEGREES
+            if best_distance <= ring * self._km_per_cell(location[0] + degrees):
+                break
+        return best
+
+
+_GRID: _GridIndex | None = None
+_PREFIX_TO_ZIPS: dict[str, list[str]] = {}
+
+
+def _get_grid() -> _GridIndex:
+    """Return the grid of zip code centers, building it the first time."""
+    global _GRID
+    if _GRID is None:
+        _load_zipcodes()
+        with _LOAD_LOCK:
+            if _GRID is None:
+                # Military (APO/FPO) zip codes have no state, and their
+                # locations are all over the world; leave them out.
+                zipcodes = sorted(z for z, state in _ZIP_TO_STATE.items() if state)
+                prefix_to_zips: dict[str, list[str]] = {}
+                for zipcode in zipcodes:
+                    prefix_to_zips.setdefault(zipcode[:3], []).append(zipcode)
+                _PREFIX_TO_ZIPS.update(prefix_to_zips)
+                _GRID = _GridIndex(
+                    {z: _ZIP_TO_LOCATION[z] for z in zipcodes if z in _ZIP_TO_LOCATION}
+                )
+    return _GRID
+
+
+def nearest_zip(location: Location, state: str | None = None) -> str | None:
+    """Return the known zip code nearest a (lat, long) point, optionally in a state."""
+    grid = _get_grid()
+    if state is None:
+        return grid.nearest(location)
+    return grid.nearest(location, lambda zipcode: _ZIP_TO_STATE[zipcode] == state)
+
+
+@functools.lru_cache(maxsize=10_000)
+def get_counties(zipcode: str) -> tuple[str, ...]:
+    """
+    Return the counties a zip code may be in, most likely first.
+
+    The counties listed for the zip code come first, followed by other
+    counties in the same state with a zip code within `NEARBY_COUNTY_KM`,
+    nearest first; at most `MAX_COUNTIES` in all. Zip codes missing from the
+    bundled data are resolved by `resolve_with_fallback`.
+    """
+    _load_zipcodes()
+    state = _ZIP_TO_STATE.get(zipcode)
+    if state is None:
+        return resolve_with_fallback(zipcode)[1]
+    counties = list(_ZIP_TO_COUNTIES.get(zipcode, ()))
+    location = _ZIP_TO_LOCATION.get(zipcode)
+    if location is None:
+        return tuple(counties[:MAX_COUNTIES])
+    nearby: dict[str, float] = {}
+    for other, distance in _get_grid().within(location, NEARBY_COUNTY_KM):
+        if _ZIP_TO_STATE[other] != state:
+            continue
+        for county in _ZIP_TO_COUNTIES[other]:
+            if county not in counties and distance < nearby.get(county, math.inf):
+                nearby[county] = distance
+    counties.extend(sorted(nearby, key=nearby.__getitem__))
+    return tuple(counties[:MAX_COUNTIES])
+
+
+@functools.lru_cache(maxsize=10_000)
+def resolve_with_fallback(zipcode: str) -> tuple[str | None, tuple[str, ...]]:
+    """
+    Return the state and likely counties for a zip code, known or not.
+
+    New and retired zip codes are missing from the bundled data. Zip codes
+    are assigned in ranges, so a missing one is placed between the known zip
+    codes on either side of it that share its three-digit prefix: it takes
+    the state of the closer of them, and the counties around the point
+    halfway between them. Returns `(None, ())` when there's nothing to go on.
+    """
+    normalized = normalize_zipcode(zipcode)
+    if normalized is None:
+        return None, ()
+    _get_grid()
+    if normalized in _ZIP_TO_STATE:
+        return _ZIP_TO_STATE[normalized], get_counties(normalized)
+    candidates = _PREFIX_TO_ZIPS.get(normalized[:3])
+    if not candidates:
+        return None, ()
+    i = bisect.bisect(candidates, normalized)
+    neighbors = candidates[max(i - 1, 0) : i + 1]
+    closest = min(neighbors, key=lambda n: abs(int(n) - int(normalized)))
+    state = _ZIP_TO_STATE[closest]
+    locations = [
+        _ZIP_TO_LOCATION[n]
+        for n in neighbors
+        if _ZIP_TO_STATE[n] == state and n in _ZIP_TO_LOCATION
+    ]
+    anchor = closest
+    if locations:
+        center = (
+            sum(lat for lat, _ in locations) / len(locations),
+            sum(lon for _, lon in locations) / len(locations),
+        )
+        anchor = nearest_zip(center, state) or closest
+    return state, get_counties(anchor)